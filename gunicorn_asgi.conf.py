@@ -0,0 +1,30 @@
+"""
+gunicorn с воркерами uvicorn: каждый воркер — цикл событий,
+который держит много соединений сразу, поэтому медленный клиент
+не занимает воркер целиком, как у синхронного gunicorn.
+
+    pip install ".[asgi]"
+    gunicorn -c gunicorn_asgi.conf.py task_manager.asgi:application
+
+Без gunicorn (один процесс на разработке или за внешним менеджером):
+    uvicorn task_manager.asgi:application --lifespan off --workers 4
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# Асинхронному воркеру не нужен запас на ожидание ввода-вывода:
+# обычно хватает по процессу на ядро
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'uvicorn_worker.UvicornWorker'
+
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+# Перезапуск воркеров против медленного роста памяти
+max_requests = 1000
+max_requests_jitter = 100
+
+accesslog = '-'
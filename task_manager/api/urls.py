@@ -0,0 +1,19 @@
+from django.urls import path
+from . import views
+
+app_name = "api"
+
+urlpatterns = [
+    path("tasks/", views.TaskListApiView.as_view(), name="tasks"),
+    path("tasks/<int:pk>/", views.TaskDetailApiView.as_view(), name="task"),
+    path("statuses/", views.StatusListApiView.as_view(), name="statuses"),
+    path(
+        "statuses/<int:pk>/",
+        views.StatusDetailApiView.as_view(),
+        name="status"
+    ),
+    path("labels/", views.LabelListApiView.as_view(), name="labels"),
+    path("labels/<int:pk>/", views.LabelDetailApiView.as_view(), name="label"),
+    path("users/", views.UserListApiView.as_view(), name="users"),
+    path("users/<int:pk>/", views.UserDetailApiView.as_view(), name="user"),
+]
@@ -0,0 +1,290 @@
+"""
+Версионированный JSON API только для чтения: /api/v1/...
+
+Ответ строится из values() — словарей, а не экземпляров моделей,
+поэтому сериализация страницы — это перекладывание значений без
+создания объектов. Связанные имена подтягиваются JOIN в той же выборке,
+метки задач — одним дополнительным запросом на страницу.
+"""
+import datetime
+
+import django_filters
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.utils.translation import gettext_lazy as _
+from django.views import View
+
+from task_manager.labels.models import Label
+from task_manager.pagination import InvalidCursor, KeysetPaginator
+from task_manager.statuses.models import Status
+from task_manager.tasks.filters import TaskFilter
+from task_manager.tasks.models import Task
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+class ApiJSONEncoder(DjangoJSONEncoder):
+    # Даты с микросекундами, как в выгрузке задач и в курсорах
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _flatten(spec):
+    """Все ORM-пути проекции, включая вложенные объекты."""
+    for lookup in spec.values():
+        if isinstance(lookup, dict):
+            yield from _flatten(lookup)
+        else:
+            yield lookup
+
+
+def _project(row, spec):
+    return {
+        name: _project(row, lookup) if isinstance(lookup, dict) else row[lookup]
+        for name, lookup in spec.items()
+    }
+
+
+class ApiView(View):
+    """
+    Базовое представление ресурса.
+
+    fields — публичное имя -> путь для values() или словарь
+    с такой же структурой (вложенный объект, например статус задачи).
+    ?fields=id,name оставляет в ответе только перечисленные поля.
+    """
+
+    model = None
+    fields = {}
+    login_required = True
+    http_method_names = ['get']
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.login_required and not request.user.is_authenticated:
+            return self.error(
+                _("Вы не авторизованы! Пожалуйста, выполните вход."), 401
+            )
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return self.error(error.message, error.status)
+
+    def error(self, message, status):
+        if not isinstance(message, dict):
+            message = str(message)
+        return JsonResponse(
+            {'error': message},
+            status=status,
+            json_dumps_params={'ensure_ascii': False},
+        )
+
+    def get_queryset(self):
+        return self.model.objects.all()
+
+    def get_fields(self):
+        requested = self.request.GET.get('fields')
+        if not requested:
+            return self.fields
+        names = [name.strip() for name in requested.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(
+                _("Неизвестные поля: %(fields)s") % {'fields': ', '.join(unknown)}
+            )
+        return {name: self.fields[name] for name in names}
+
+    def get_values(self, spec, extra=()):
+        # extra — ключи пагинации, нужные курсору, даже если поле не запрошено
+        return list(dict.fromkeys([*_flatten(spec), *extra]))
+
+    def serialize(self, rows, spec):
+        return [_project(row, spec) for row in rows]
+
+    def respond(self, data):
+        return JsonResponse(
+            data,
+            encoder=ApiJSONEncoder,
+            json_dumps_params={'ensure_ascii': False},
+        )
+
+
+class ApiListView(ApiView):
+    pagination_keys = ('created_at', 'id')
+    per_page = 50
+    max_per_page = 200
+
+    def get_per_page(self):
+        try:
+            per_page = int(self.request.GET.get('limit', self.per_page))
+        except ValueError:
+            per_page = self.per_page
+        return max(1, min(per_page, self.max_per_page))
+
+    def get_pagination_keys(self, queryset):
+        return self.pagination_keys
+
+    def page_url(self, cursor):
+        if cursor is None:
+            return None
+        query = self.request.GET.copy()
+        query['cursor'] = cursor
+        return self.request.build_absolute_uri(
+            f"{self.request.path}?{query.urlencode()}"
+        )
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        keys = self.get_pagination_keys(queryset)
+        spec = self.get_fields()
+        values = self.get_values(spec, [key.lstrip('-') for key in keys])
+        paginator = KeysetPaginator(
+            queryset.values(*values), self.get_per_page(), keys
+        )
+        try:
+            page = paginator.page(request.GET.get('cursor'))
+        except InvalidCursor:
+            raise ApiError(_("Неверный курсор страницы"))
+        return self.respond({
+            'results': self.serialize(page.object_list, spec),
+            'next': self.page_url(page.next_cursor),
+            'previous': self.page_url(page.previous_cursor),
+        })
+
+
+class ApiDetailView(ApiView):
+
+    def get(self, request, pk, *args, **kwargs):
+        spec = self.get_fields()
+        rows = list(
+            self.get_queryset().filter(pk=pk).values(*self.get_values(spec))
+        )
+        if not rows:
+            raise ApiError(_("Объект не найден"), 404)
+        return self.respond(self.serialize(rows, spec)[0])
+
+
+# ---------------------------
+# Задачи
+# ---------------------------
+class TaskApiMixin:
+    model = Task
+    fields = {
+        'id': 'id',
+        'name': 'name',
+        'description': 'description',
+        'status': {'id': 'status_id', 'name': 'status__name'},
+        'author': {'id': 'author_id', 'username': 'author__username'},
+        'executor': {'id': 'executor_id', 'username': 'executor__username'},
+        # Заполняется отдельным запросом, см. serialize()
+        'labels': 'labels',
+        'created_at': 'created_at',
+    }
+
+    def get_values(self, spec, extra=()):
+        values = super().get_values(spec, extra)
+        if 'labels' in values:
+            # M2M в values() размножил бы строки задачи
+            values.remove('labels')
+            values = list(dict.fromkeys([*values, 'id']))
+        return values
+
+    def serialize(self, rows, spec):
+        if 'labels' in spec:
+            labels = {row['id']: [] for row in rows}
+            through = Task.labels.through.objects.filter(
+                task_id__in=labels,
+            ).order_by('label__name').values_list(
+                'task_id', 'label_id', 'label__name'
+            )
+            for task_id, label_id, name in through:
+                labels[task_id].append({'id': label_id, 'name': name})
+            for row in rows:
+                row['labels'] = labels[row['id']]
+        return super().serialize(rows, spec)
+
+
+class TaskApiFilter(TaskFilter):
+    # Форма фильтра только валидирует параметры и не рендерится,
+    # поэтому варианты выпадающих списков ей не нужны
+    form = django_filters.FilterSet.form
+
+
+class TaskListApiView(TaskApiMixin, ApiListView):
+    """Принимает те же параметры фильтра, что и список задач."""
+
+    def get_queryset(self):
+        filterset = TaskApiFilter(
+            self.request.GET,
+            queryset=Task.objects.all(),
+            request=self.request,
+        )
+        if not filterset.is_valid():
+            raise ApiError(filterset.errors.get_json_data())
+        return filterset.qs
+
+    def get_pagination_keys(self, queryset):
+        if 'search_rank' in queryset.query.annotations:
+            return ('-search_rank', *self.pagination_keys)
+        return self.pagination_keys
+
+
+class TaskDetailApiView(TaskApiMixin, ApiDetailView):
+    pass
+
+
+# ---------------------------
+# Статусы, метки, пользователи
+# ---------------------------
+class StatusApiMixin:
+    model = Status
+    fields = {'id': 'id', 'name': 'name', 'created_at': 'created_at'}
+
+
+class StatusListApiView(StatusApiMixin, ApiListView):
+    pass
+
+
+class StatusDetailApiView(StatusApiMixin, ApiDetailView):
+    pass
+
+
+class LabelApiMixin:
+    model = Label
+    fields = {'id': 'id', 'name': 'name', 'created_at': 'created_at'}
+
+
+class LabelListApiView(LabelApiMixin, ApiListView):
+    pass
+
+
+class LabelDetailApiView(LabelApiMixin, ApiDetailView):
+    pass
+
+
+class UserApiMixin:
+    model = User
+    # Список пользователей открыт и в HTML-версии
+    login_required = False
+    fields = {
+        'id': 'id',
+        'username': 'username',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+        'date_joined': 'date_joined',
+    }
+
+
+class UserListApiView(UserApiMixin, ApiListView):
+    pagination_keys = ('date_joined', 'id')
+
+
+class UserDetailApiView(UserApiMixin, ApiDetailView):
+    pass
@@ -3,6 +3,13 @@ ASGI config for task_manager project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Запуск: gunicorn -c gunicorn_asgi.conf.py task_manager.asgi:application
+(или uvicorn task_manager.asgi:application --lifespan off).
+Под ASGI страницы чтения обслуживают асинхронные представления.
+Постоянные соединения с базой по умолчанию выключены: запросы
+выполняются в разных потоках и соединения копились бы; для повторного
+использования соединений включите пул (DB_POOL=True).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -12,5 +19,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
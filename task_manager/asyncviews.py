@@ -0,0 +1,108 @@
+"""
+Асинхронные варианты представлений только для чтения (запуск под ASGI).
+
+Под ASGI асинхронное представление не занимает поток на время ожидания
+базы: сессия, пользователь и строки страницы загружаются асинхронным
+API Django (request.auser(), async for по queryset, aget()).
+Синхронные миксины (LoginRequiredMixin, ConditionalGetMixin, кеш страниц,
+чтение с реплики) остаются в цепочке dispatch: после загрузки пользователя
+они не обращаются к базе, а те, что обрабатывают ответ, проверяют
+view_is_async и ждут корутину обработчика.
+
+Какой вариант попадает в urls, решает settings.ASYNC_VIEWS
+(включается в task_manager/asgi.py).
+"""
+from inspect import isawaitable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404
+from django.utils.translation import gettext_lazy as _
+
+
+async def await_response(response):
+    """
+    Ответ из синхронной части цепочки dispatch (редирект на вход,
+    ответ из кеша) или корутина асинхронного обработчика.
+    """
+    if isawaitable(response):
+        response = await response
+    return response
+
+
+def read_view(sync_view, async_view, **initkwargs):
+    """View для urls: асинхронный вариант, если включён settings.ASYNC_VIEWS."""
+    view_class = async_view if settings.ASYNC_VIEWS else sync_view
+    return view_class.as_view(**initkwargs)
+
+
+class AsyncReadMixin:
+    """
+    Ставится первым среди родителей представления с асинхронным get().
+
+    request.user заменяется пользователем, загруженным через
+    request.auser(): синхронные проверки миксинов читают его из памяти.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        return await await_response(super().dispatch(request, *args, **kwargs))
+
+
+class AsyncListMixin(AsyncReadMixin):
+    """
+    Асинхронный get() для ListView с KeysetPaginationMixin:
+    страница загружается заранее, get_context_data() и шаблон
+    работают с готовым списком.
+    """
+
+    async def aget_object_list(self):
+        return self.get_queryset()
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = await self.aget_object_list()
+        page_size = self.get_paginate_by(self.object_list)
+        if page_size:
+            await self.apaginate_queryset(self.object_list, page_size)
+        else:
+            self.object_list = [obj async for obj in self.object_list]
+        context = self.get_context_data()
+        return self.render_to_response(context)
+
+
+class AsyncFilterListMixin(AsyncListMixin):
+    """То же для FilterView: фильтр применяется как в FilterView.get()."""
+
+    async def aget_object_list(self):
+        self.filterset = self.get_filterset(self.get_filterset_class())
+        if self.filterset.is_bound:
+            # Проверка формы ищет выбранные статус, метку и исполнителя
+            # в базе (ModelChoiceField) — это синхронный код форм Django.
+            # Результат запоминается, filterset.qs её не повторяет
+            valid = await sync_to_async(self.filterset.is_valid)()
+            if not valid and self.get_strict():
+                return self.filterset.queryset.none()
+        return self.filterset.qs
+
+    def get_context_data(self, **kwargs):
+        kwargs.setdefault('filter', self.filterset)
+        return super().get_context_data(**kwargs)
+
+
+class AsyncDetailMixin(AsyncReadMixin):
+    """Асинхронный get() для DetailView: объект по pk через aget()."""
+
+    async def aget_object(self):
+        queryset = self.get_queryset().filter(pk=self.kwargs[self.pk_url_kwarg])
+        try:
+            return await queryset.aget()
+        except queryset.model.DoesNotExist:
+            raise Http404(
+                _("No %(verbose_name)s found matching the query")
+                % {'verbose_name': queryset.model._meta.verbose_name}
+            )
+
+    async def get(self, request, *args, **kwargs):
+        self.object = await self.aget_object()
+        context = self.get_context_data(object=self.object)
+        return self.render_to_response(context)
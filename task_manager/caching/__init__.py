@@ -0,0 +1,3 @@
+from .backends import cache_stats
+
+__all__ = ['cache_stats']
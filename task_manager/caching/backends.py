@@ -0,0 +1,79 @@
+"""
+Кеш-бэкенды Django со счётчиками попаданий и промахов.
+
+Счётчики живут в памяти процесса: при нескольких воркерах
+каждый отдаёт свою статистику, суммирует её система мониторинга.
+"""
+import threading
+
+from django.core.cache import caches
+from django.core.cache.backends import filebased, locmem, memcached, redis
+
+_MISSING = object()
+
+
+class CacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hits, misses):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def as_dict(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else None,
+        }
+
+
+class StatsMixin:
+    """Считает попадания в get() и get_many() (их использует {% cache %})."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = CacheStats()
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version=version)
+        if value is _MISSING:
+            self.stats.record(0, 1)
+            return default
+        self.stats.record(1, 0)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = super().get_many(keys, version=version)
+        self.stats.record(len(found), len(keys) - len(found))
+        return found
+
+
+class LocMemCache(StatsMixin, locmem.LocMemCache):
+    """Кеш в памяти процесса; при переполнении вытесняет давно читанные ключи."""
+
+
+class FileBasedCache(StatsMixin, filebased.FileBasedCache):
+    """Кеш в файлах: общий для воркеров на одной машине."""
+
+
+class PyMemcacheCache(StatsMixin, memcached.PyMemcacheCache):
+    """Общий для всех воркеров кеш; нужен пакет pymemcache."""
+
+
+class RedisCache(StatsMixin, redis.RedisCache):
+    """Общий для всех воркеров кеш; нужен пакет redis."""
+
+
+def cache_stats():
+    """Статистика всех кешей со счётчиками: {alias: {...}}."""
+    return {
+        cache_alias: caches[cache_alias].stats.as_dict()
+        for cache_alias in caches.settings
+        if hasattr(caches[cache_alias], 'stats')
+    }
@@ -0,0 +1,65 @@
+"""
+Настройка кешей одной строкой из окружения, по аналогии с DATABASE_URL:
+
+    locmem://                       память процесса (по умолчанию)
+    file:///var/tmp/task_manager    файлы на диске
+    memcached://host:11211,host2    memcached через pymemcache
+    redis://host:6379/0             redis
+    dummy://                        без кеша
+
+Параметры строки запроса: timeout, key_prefix, max_entries
+(последний — только для locmem и file).
+"""
+from urllib.parse import parse_qs, urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+BACKENDS = {
+    'locmem': 'task_manager.caching.backends.LocMemCache',
+    'file': 'task_manager.caching.backends.FileBasedCache',
+    'memcached': 'task_manager.caching.backends.PyMemcacheCache',
+    'pymemcache': 'task_manager.caching.backends.PyMemcacheCache',
+    'redis': 'task_manager.caching.backends.RedisCache',
+    'rediss': 'task_manager.caching.backends.RedisCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+
+# Бэкенды, которые сами ограничивают число ключей
+CULLING_SCHEMES = {'locmem', 'file'}
+DEFAULT_MAX_ENTRIES = 10000
+
+
+def parse_cache_url(url, name='default', **extra):
+    """
+    Словарь для settings.CACHES[name].
+    name отделяет кеши друг от друга внутри одного хранилища;
+    extra дописывается в словарь как есть (например, KEY_PREFIX).
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in BACKENDS:
+        raise ImproperlyConfigured(
+            f"Неизвестная схема кеша {scheme!r} в {url!r}, "
+            f"допустимы: {', '.join(sorted(BACKENDS))}"
+        )
+    query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+    config = {'BACKEND': BACKENDS[scheme]}
+
+    if scheme == 'locmem':
+        config['LOCATION'] = parts.netloc or name
+    elif scheme == 'file':
+        config['LOCATION'] = f"{parts.path.rstrip('/')}/{name}"
+    elif scheme in ('memcached', 'pymemcache'):
+        config['LOCATION'] = parts.netloc.split(',')
+    elif scheme in ('redis', 'rediss'):
+        config['LOCATION'] = parts._replace(query='').geturl()
+
+    if 'timeout' in query:
+        config['TIMEOUT'] = int(query['timeout'])
+    if 'key_prefix' in query:
+        config['KEY_PREFIX'] = query['key_prefix']
+    if scheme in CULLING_SCHEMES:
+        config['OPTIONS'] = {
+            'MAX_ENTRIES': int(query.get('max_entries', DEFAULT_MAX_ENTRIES)),
+        }
+    return {**config, **extra}
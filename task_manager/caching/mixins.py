@@ -0,0 +1,99 @@
+import hashlib
+import re
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.translation import get_language
+
+from task_manager.asyncviews import await_response
+from task_manager.versioning import get_versions
+
+# В кеше вместо CSRF-токена хранится метка, при выдаче подставляется
+# токен текущего посетителя: одна копия страницы годится для всех
+CSRF_PLACEHOLDER = '__csrf_token__'
+CSRF_INPUT_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+class AnonymousPageCacheMixin:
+    """
+    Кеширует готовый HTML страницы для анонимных посетителей.
+
+    Ключ содержит путь со строкой запроса, язык и версии
+    page_cache_namespaces, поэтому создание, изменение и удаление
+    объектов (см. versioning.track_changes) сразу дают новый ключ.
+    Вошедшие пользователи и запросы с неотданными сообщениями
+    получают обычный рендеринг.
+    """
+
+    page_cache_namespaces = ()
+    page_cache_alias = 'default'
+
+    def get_page_cache_timeout(self):
+        return settings.PAGE_CACHE_TIMEOUT
+
+    def is_page_cacheable(self, request):
+        return (
+            request.method in ('GET', 'HEAD')
+            and not request.user.is_authenticated
+            and not get_messages(request)
+        )
+
+    def get_page_cache_key(self, request):
+        versions = get_versions(self.page_cache_namespaces)
+        parts = [
+            request.get_full_path(),
+            get_language() or '',
+            *(f"{ns}={version}" for ns, version in versions.items()),
+        ]
+        digest = hashlib.md5(
+            '|'.join(parts).encode(), usedforsecurity=False
+        ).hexdigest()
+        return f"page:{type(self).__name__}:{digest}"
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.is_page_cacheable(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        cache = caches[self.page_cache_alias]
+        key = self.get_page_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            content = content.replace(CSRF_PLACEHOLDER, get_token(request))
+            return HttpResponse(content, content_type=content_type)
+
+        response = super().dispatch(request, *args, **kwargs)
+        if self.view_is_async:
+            return self.astore_page(response, cache, key)
+        self.store_page(response, cache, key)
+        return response
+
+    def store_page(self, response, cache, key):
+        if response.status_code != 200 or response.streaming:
+            return
+
+        def store(response):
+            cache.set(
+                key,
+                (self.strip_csrf_token(response), response['Content-Type']),
+                self.get_page_cache_timeout(),
+            )
+        if hasattr(response, 'add_post_render_callback'):
+            response.add_post_render_callback(store)
+        else:
+            store(response)
+
+    async def astore_page(self, response, cache, key):
+        response = await await_response(response)
+        self.store_page(response, cache, key)
+        return response
+
+    def strip_csrf_token(self, response):
+        content = response.content.decode(response.charset)
+        match = CSRF_INPUT_RE.search(content)
+        if match:
+            content = content.replace(match.group(1), CSRF_PLACEHOLDER)
+        return content
@@ -0,0 +1,17 @@
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.http import JsonResponse
+from django.views import View
+
+from .backends import cache_stats
+
+
+class CacheStatsView(UserPassesTestMixin, View):
+    """Доля попаданий в кеши текущего процесса, только для персонала."""
+
+    http_method_names = ['get']
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(cache_stats())
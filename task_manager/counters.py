@@ -0,0 +1,28 @@
+"""
+Денормализованные счётчики задач у статусов и меток.
+
+Модель объявляет usage_counters: {связь: поле} — например, Status.task_count
+считает задачи в статусе. Поле меняется только атомарным
+UPDATE ... SET task_count = task_count + n из кода задач
+(tasks.models.adjust_task_counts), восстанавливается командой
+repair_task_counts, а читается проверкой перед удалением (deletion.py).
+"""
+
+
+class UsageCountersMixin:
+    """
+    Сохранение уже существующего объекта не пишет поля-счётчики.
+
+    Иначе форма изменения или любой save() вернул бы в базу значение,
+    прочитанное вместе с объектом, и затёр бы сдвиги, сделанные другими
+    запросами после его загрузки.
+    """
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            counters = set(self.usage_counters.values())
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in counters
+            ]
+        super().save(*args, **kwargs)
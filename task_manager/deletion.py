@@ -0,0 +1,117 @@
+"""
+Удаление объекта, на который могут ссылаться задачи.
+
+Ссылки ищутся по всем обратным связям модели, которые мешают удалению:
+внешние ключи с PROTECT/RESTRICT и many-to-many (метку задачи нельзя
+удалить, пока она назначена). Каждая связь — один подсчёт по индексу
+внешнего ключа, все подсчёты — одним запросом.
+
+Если модель ведёт денормализованный счётчик ссылок (атрибут
+usage_counters: {связь: поле}), для этой связи читается поле строки.
+"""
+from django.db import transaction
+from django.db.models import (
+    PROTECT,
+    RESTRICT,
+    Count,
+    F,
+    IntegerField,
+    OuterRef,
+    ProtectedError,
+    RestrictedError,
+    Subquery,
+    Value,
+)
+from django.db.models.functions import Coalesce
+
+
+def protecting_relations(model):
+    """(имя связи, queryset ссылающихся строк, поле со ссылкой)."""
+    for rel in model._meta.related_objects:
+        if rel.many_to_many:
+            through = rel.through
+            yield (
+                rel.get_accessor_name(),
+                through._default_manager.all(),
+                rel.field.m2m_reverse_field_name(),
+            )
+        elif rel.on_delete in (PROTECT, RESTRICT):
+            yield (
+                rel.get_accessor_name(),
+                rel.related_model._default_manager.all(),
+                rel.field.name,
+            )
+
+
+def reference_counts(model, exact=False):
+    """
+    Выражения с числом ссылок на строку модели: {связь: выражение}.
+    Для связей из model.usage_counters — поле-счётчик, O(1);
+    с exact=True или без счётчика — подсчёт подзапросом.
+    """
+    counters = {} if exact else getattr(model, 'usage_counters', {})
+    expressions = {}
+    for name, queryset, field in protecting_relations(model):
+        if name in counters:
+            expressions[name] = F(counters[name])
+            continue
+        count = queryset.filter(**{field: OuterRef('pk')}).order_by().values(
+            field
+        ).annotate(n=Count('*')).values('n')
+        expressions[name] = Coalesce(
+            Subquery(count, output_field=IntegerField()), Value(0)
+        )
+    return expressions
+
+
+def usage_counts(obj, exact=False):
+    """Число ссылок на объект по каждой защищающей связи: {связь: n}."""
+    model = type(obj)
+    annotations = {
+        # Префикс: имя связи совпадает с атрибутом модели
+        f'used_{name}': expression
+        for name, expression in reference_counts(model, exact).items()
+    }
+    if not annotations:
+        return {}
+    row = model._default_manager.filter(pk=obj.pk).annotate(
+        **annotations
+    ).values(*annotations).get()
+    return {key.removeprefix('used_'): count for key, count in row.items()}
+
+
+def _used(obj, exact=False):
+    return {
+        name: count
+        for name, count in usage_counts(obj, exact).items() if count
+    }
+
+
+def delete_if_unused(obj):
+    """
+    Удаляет объект, если на него никто не ссылается.
+    Возвращает ненулевые счётчики ссылок; пустой словарь — объект удалён.
+
+    Строка объекта блокируется (select_for_update) до конца транзакции:
+    вставка задачи со ссылкой на неё ждёт, пока не закончится проверка
+    и удаление, поэтому параллельно созданная ссылка не проскочит.
+
+    Занятый объект определяется по счётчикам за O(1). Нулевые счётчики
+    перед удалением сверяются точным подсчётом: разошедшийся счётчик
+    иначе удалил бы метку вместе со связями каскадом.
+    """
+    model = type(obj)
+    try:
+        with transaction.atomic():
+            list(model._default_manager.select_for_update().filter(pk=obj.pk))
+            used = _used(obj)
+            if not used and getattr(model, 'usage_counters', None):
+                used = _used(obj, exact=True)
+            if used:
+                return used
+            obj.delete()
+    except (ProtectedError, RestrictedError):
+        # Без блокировок строк (SQLite) ссылка могла появиться между
+        # проверкой и удалением
+        return _used(obj, exact=True)
+    return {}
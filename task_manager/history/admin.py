@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import HistoryEntry
+
+
+@admin.register(HistoryEntry)
+class HistoryEntryAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'actor', 'action', 'model', 'object_repr')
+    list_filter = ('action', 'model')
+    list_select_related = ('actor',)
+    readonly_fields = [field.name for field in HistoryEntry._meta.fields]
@@ -0,0 +1,127 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.views.generic.edit import BaseDeleteView
+
+from .models import HistoryEntry
+from .writer import record
+
+
+# Значения этих полей в историю не попадают
+EXCLUDED_FIELDS = frozenset({'password'})
+
+
+def tracked_fields(model, names):
+    """Поля модели из списка полей формы (без паролей и полей формы)."""
+    fields = []
+    for name in names or ():
+        if name in EXCLUDED_FIELDS:
+            continue
+        try:
+            fields.append(model._meta.get_field(name))
+        except FieldDoesNotExist:
+            continue
+    return fields
+
+
+def display(value):
+    """Значение поля так, как его видит пользователь (для JSON)."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def field_value(obj, field):
+    value = getattr(obj, field.name)
+    if field.many_to_many:
+        # Для задач метки уже загружены prefetch_related (with_related)
+        return sorted(str(item) for item in value.all())
+    return display(value)
+
+
+def form_value(form, field):
+    value = form.cleaned_data.get(field.name)
+    if field.many_to_many:
+        return sorted(str(item) for item in value or ())
+    return display(value)
+
+
+def diff(model, before, form):
+    """
+    Изменения полей формы: before — значения до сохранения
+    (None при создании), новые значения — из cleaned_data.
+    """
+    changes = {}
+    for field in tracked_fields(model, form._meta.fields):
+        name = field.name
+        new = form_value(form, field)
+        old = before.get(name) if before is not None else None
+        if field.many_to_many:
+            added = sorted(set(new) - set(old or ()))
+            removed = sorted(set(old or ()) - set(new))
+            change = {
+                key: values
+                for key, values in (('added', added), ('removed', removed))
+                if values
+            }
+        elif new == old:
+            change = None
+        elif before is None:
+            change = {'new': new}
+        else:
+            change = {'old': old, 'new': new}
+        if change:
+            changes[name] = change
+    return changes
+
+
+class HistoryMixin:
+    """
+    Записывает в историю (HistoryEntry) создание, изменение и удаление
+    объекта в CreateView/UpdateView/DeleteView. Старые значения берутся
+    из объекта, загруженного get_object(), новые — из формы, поэтому
+    запись не добавляет запросов к базе; вставку делает фоновый поток
+    (history.writer).
+    """
+
+    def get_object(self, queryset=None):
+        obj = super().get_object(queryset)
+        names = getattr(getattr(self.get_form_class(), '_meta', None), 'fields', None)
+        self.history_before = {
+            field.name: field_value(obj, field)
+            for field in tracked_fields(type(obj), names)
+        }
+        return obj
+
+    def record_history(self, action, obj, changes=None, object_id=None):
+        record(self.request.user, action, obj, changes, object_id=object_id)
+
+    def form_valid(self, form):
+        if isinstance(self, BaseDeleteView):
+            pk = self.object.pk
+            response = super().form_valid(form)
+            self.record_history(
+                HistoryEntry.Action.DELETE, self.object, object_id=pk
+            )
+            return response
+
+        before = getattr(self, 'history_before', None)
+        response = super().form_valid(form)
+        changes = diff(type(self.object), before, form)
+        if before is None:
+            self.record_history(HistoryEntry.Action.CREATE, self.object, changes)
+        elif changes:
+            self.record_history(HistoryEntry.Action.UPDATE, self.object, changes)
+        return response
+
+
+def describe(entry, model):
+    """Строки изменений записи для шаблона: [(название поля, изменение)]."""
+    rows = []
+    for name, change in entry.changes.items():
+        try:
+            label = model._meta.get_field(name).verbose_name
+        except FieldDoesNotExist:
+            label = name
+        rows.append((label, change))
+    return rows
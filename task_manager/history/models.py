@@ -0,0 +1,53 @@
+from django.contrib.auth.models import User
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class HistoryEntry(models.Model):
+    """
+    Запись истории изменений объекта.
+
+    changes — {поле: {"old": ..., "new": ...}} для обычных полей
+    и {поле: {"added": [...], "removed": [...]}} для many-to-many;
+    значения хранятся строками, как их видит пользователь. Если старое
+    значение неизвестно (массовые действия), ключа "old" нет.
+    """
+
+    class Action(models.TextChoices):
+        CREATE = 'create', _("Создание")
+        UPDATE = 'update', _("Изменение")
+        DELETE = 'delete', _("Удаление")
+
+    # Удаление пользователя не должно упираться в его историю
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_("Пользователь"),
+    )
+    action = models.CharField(
+        _("Действие"), max_length=10, choices=Action.choices
+    )
+    # app_label.ModelName, например tasks.Task
+    model = models.CharField(_("Модель"), max_length=100)
+    object_id = models.BigIntegerField(_("Объект"))
+    object_repr = models.CharField(_("Название"), max_length=200)
+    changes = models.JSONField(_("Изменения"), default=dict, blank=True)
+    # Время действия, а не вставки: записи пишутся пакетами с задержкой
+    created_at = models.DateTimeField(_("Время"), default=timezone.now)
+
+    class Meta:
+        # История одного объекта: WHERE model = ... AND object_id = ...
+        # ORDER BY created_at DESC
+        indexes = [
+            models.Index(
+                fields=['model', 'object_id', 'created_at'],
+                name='history_object_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id}: {self.action}"
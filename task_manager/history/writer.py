@@ -0,0 +1,162 @@
+"""
+Запись истории изменений без задержки ответа.
+
+record() только кладёт запись в очередь процесса (после коммита
+транзакции запроса: откаченные изменения в историю не попадают).
+С HISTORY_ASYNC = False запись вставляется сразу, в той же транзакции.
+Фоновый поток забирает записи пакетами — до HISTORY_BATCH_SIZE штук
+или то, что накопилось за HISTORY_FLUSH_SECONDS, — и вставляет каждый
+пакет одним bulk_create; если пакет не прошёл по ограничениям базы,
+его записи вставляются по одной и теряются только ошибочные.
+При остановке процесса очередь дописывается.
+
+Записи, не дождавшиеся записи при аварийном завершении процесса,
+теряются: история — журнал для людей, а не источник данных.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import (
+    IntegrityError,
+    close_old_connections,
+    connections,
+    transaction,
+)
+from django.utils import timezone
+
+from .models import HistoryEntry
+
+logger = logging.getLogger("history")
+
+_STOP = object()
+
+
+class HistoryWriter:
+
+    def __init__(self):
+        self.queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+        atexit.register(self.stop)
+
+    def put(self, entries):
+        self.start()
+        for entry in entries:
+            self.queue.put(entry)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self.run, name='history-writer', daemon=True
+                )
+                self._thread.start()
+
+    def stop(self, timeout=5):
+        """Дописывает очередь и останавливает поток."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self.queue.put(_STOP)
+        thread.join(timeout)
+
+    def run(self):
+        try:
+            self.loop()
+        finally:
+            # Соединения потока не переживают его
+            connections.close_all()
+
+    def loop(self):
+        stopping = False
+        while not stopping:
+            entry = self.queue.get()
+            if entry is _STOP:
+                break
+            batch = [entry]
+            deadline = time.monotonic() + settings.HISTORY_FLUSH_SECONDS
+            while len(batch) < settings.HISTORY_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+            self.write(batch)
+            # Соединение потока живёт по тем же правилам CONN_MAX_AGE,
+            # что и соединения запросов
+            close_old_connections()
+
+    def write(self, entries):
+        try:
+            HistoryEntry.objects.bulk_create(entries)
+        except IntegrityError:
+            # Одна плохая запись (например, автор удалён до записи пакета)
+            # не должна уносить с собой остальные: пишем по одной
+            for entry in entries:
+                self.write_one(entry)
+        except Exception:
+            # Поток не должен умирать из-за одного пакета
+            logger.exception(
+                "Не удалось записать историю: %d записей", len(entries)
+            )
+
+    def write_one(self, entry):
+        # bulk_create мог успеть проставить id до ошибки коммита
+        entry.pk = None
+        entry._state.adding = True
+        try:
+            HistoryEntry.objects.bulk_create([entry])
+        except Exception:
+            logger.exception(
+                "Не удалось записать историю: %s %s",
+                entry.model, entry.object_id,
+            )
+
+
+writer = HistoryWriter()
+
+
+def record(actor, action, obj, changes=None, object_id=None):
+    """Запись истории об объекте obj от имени пользователя actor."""
+    record_many(
+        actor, action, type(obj),
+        [(object_id or obj.pk, str(obj))],
+        changes,
+    )
+
+
+def record_many(actor, action, model, objects, changes=None):
+    """Одинаковые изменения объектов [(pk, название)] одной модели."""
+    now = timezone.now()
+    actor_id = actor.pk if actor is not None and actor.is_authenticated else None
+    entries = [
+        HistoryEntry(
+            actor_id=actor_id,
+            action=action,
+            model=model._meta.label,
+            object_id=pk,
+            object_repr=str(name)[:200],
+            changes=changes or {},
+            created_at=now,
+        )
+        for pk, name in objects
+    ]
+    if not entries:
+        return
+    if settings.HISTORY_ASYNC:
+        transaction.on_commit(lambda: writer.put(entries))
+    else:
+        # В той же транзакции, что и само изменение
+        HistoryEntry.objects.bulk_create(entries)
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class LabelsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'task_manager.labels'
+
+    def ready(self):
+        from task_manager.versioning import track_changes
+        from .models import Label
+
+        track_changes(Label, 'labels')
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+# Индекс для поиска меток по префиксу (istartswith) в подсказках.
+# Выражение совпадает с тем, что Django генерирует для istartswith.
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX labels_label_name_prefix_idx ON labels_label '
+            '(UPPER(name::text) text_pattern_ops)'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE INDEX labels_label_name_prefix_idx ON labels_label '
+            '(name COLLATE NOCASE)'
+        )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        schema_editor.execute('DROP INDEX IF EXISTS labels_label_name_prefix_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labels', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
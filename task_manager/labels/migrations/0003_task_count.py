@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:26
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_task_count(apps, schema_editor):
+    Label = apps.get_model('labels', 'Label')
+    Through = apps.get_model('tasks', 'Task').labels.through
+    count = Through.objects.filter(label=OuterRef('pk')).order_by().values(
+        'label'
+    ).annotate(n=Count('*')).values('n')
+    Label.objects.update(task_count=Coalesce(
+        Subquery(count, output_field=IntegerField()), Value(0)
+    ))
+
+
+def restore_prefix_index(apps, schema_editor):
+    # SQLite добавляет столбец пересозданием таблицы и теряет
+    # индекс по выражению из 0002_label_name_prefix_index
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS labels_label_name_prefix_idx '
+            'ON labels_label (name COLLATE NOCASE)'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labels', '0002_label_name_prefix_index'),
+        ('tasks', '0013_task_row_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='label',
+            name='task_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Задач'),
+        ),
+        migrations.RunPython(restore_prefix_index, migrations.RunPython.noop),
+        migrations.RunPython(fill_task_count, migrations.RunPython.noop),
+    ]
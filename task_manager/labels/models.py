@@ -1,10 +1,17 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from task_manager.counters import UsageCountersMixin
 
-class Label(models.Model):
+
+class Label(UsageCountersMixin, models.Model):
     name = models.CharField(_("Имя"), max_length=100)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Число задач с меткой; ведётся вместе с задачами (tasks.signals)
+    task_count = models.IntegerField(_("Задач"), default=0, editable=False)
+
+    # Связь -> поле-счётчик ссылок для task_manager.deletion
+    usage_counters = {'tasks': 'task_count'}
 
     def __str__(self):
         return self.name
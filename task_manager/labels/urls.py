@@ -1,10 +1,16 @@
 from django.urls import path
+
+from task_manager.asyncviews import read_view
 from . import views
 
 app_name = "labels"
 
 urlpatterns = [
-    path("", views.LabelsListView.as_view(), name="labels_list"),
+    path(
+        "",
+        read_view(views.LabelsListView, views.AsyncLabelsListView),
+        name="labels_list"
+    ),
     path("create/", views.LabelCreateView.as_view(), name="labels_create"),
     path('<int:pk>/', views.LabelDetailView.as_view(), name='labels_detail'),
     path(
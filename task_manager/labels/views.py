@@ -14,8 +14,13 @@ from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django_filters.views import FilterView
 
+from task_manager.asyncviews import AsyncFilterListMixin
+from task_manager.history.mixins import HistoryMixin
+from task_manager.history.models import HistoryEntry
+from task_manager.pagination import KeysetPaginationMixin
+from task_manager.versioning import ConditionalGetMixin
 from .models import Label
-from task_manager.tasks.models import Task
+from task_manager.deletion import delete_if_unused
 
 
 logger = logging.getLogger("labels")
@@ -27,21 +32,34 @@ class FormLoggerMixin:
     Используется вместе с CreateView/UpdateView/DeleteView.
     """
 
-    log_message: str = "Object saved: {obj}"
+    log_message: str = "Object saved: %s"
 
     def form_valid(self, form):
         response = super().form_valid(form)
-        logger.info(self.log_message.format(obj=self.object))
+        logger.info(self.log_message, self.object)
         return response
 
 
 # ---------------------------
 # Список меток
 # ---------------------------
-class LabelsListView(LoginRequiredMixin, FilterView, ListView):
+class LabelsListView(
+    LoginRequiredMixin,
+    ConditionalGetMixin,
+    KeysetPaginationMixin,
+    FilterView,
+    ListView
+):
     model = Label
+    # Колонка с числом задач меняется вместе с задачами
+    version_namespaces = ('labels', 'tasks')
     template_name = 'labels/list.html'
     context_object_name = "labels"
+    query_budget = 3
+
+
+class AsyncLabelsListView(AsyncFilterListMixin, LabelsListView):
+    pass
 
 
 # ---------------------------
@@ -58,6 +76,7 @@ class LabelDetailView(LoginRequiredMixin, DetailView):
 # ---------------------------
 class LabelCreateView(
     LoginRequiredMixin,
+    HistoryMixin,
     FormLoggerMixin,
     SuccessMessageMixin,
     CreateView
@@ -68,7 +87,7 @@ class LabelCreateView(
     fields = ['name']
     success_url = reverse_lazy("labels:labels_list")
     success_message = _("Метка успешно создана")
-    log_message = "Создана метка: {obj}"
+    log_message = "Создана метка: %s"
 
     def form_valid(self, form):
         form.instance.author = self.request.user
@@ -80,6 +99,7 @@ class LabelCreateView(
 # ---------------------------
 class LabelUpdateView(
     LoginRequiredMixin,
+    HistoryMixin,
     FormLoggerMixin,
     SuccessMessageMixin,
     UpdateView
@@ -90,13 +110,13 @@ class LabelUpdateView(
     fields = ['name']
     success_url = reverse_lazy("labels:labels_list")
     success_message = _("Метка успешно изменена")
-    log_message = "Изменена метка: {obj}"
+    log_message = "Изменена метка: %s"
 
 
 # ---------------------------
 # Удаление метки
 # ---------------------------
-class LabelDeleteView(LoginRequiredMixin, DeleteView):
+class LabelDeleteView(LoginRequiredMixin, HistoryMixin, DeleteView):
     model = Label
     template_name = "labels/delete.html"
     context_object_name = "label"
@@ -110,20 +130,23 @@ class LabelDeleteView(LoginRequiredMixin, DeleteView):
         self.object = self.get_object()
         label_id = self.object.id
 
-        # Проверяем, есть ли задачи с этой меткой
-        if Task.objects.filter(labels=self.object).exists():
+        # Удаляем, только если метка не назначена ни одной задаче
+        used = delete_if_unused(self.object)
+        if used:
             messages.error(
                 request,
-                "Невозможно удалить метку,"
+                "Невозможно удалить метку, "
                 "потому что она используется в задачах"
             )
             logger.warning(
-                f"Попытка удалить метку {label_id}, связанную с задачами"
+                "Попытка удалить метку %s, связанную с задачами: %s",
+                label_id, used,
             )
             return redirect(self.success_url)
 
-        # Если связей нет — вызываем стандартное удаление
-        response = super().post(request, *args, **kwargs)
+        self.record_history(
+            HistoryEntry.Action.DELETE, self.object, object_id=label_id
+        )
         messages.success(request, "Метка успешно удалена")
-        logger.info(f"Метка {label_id} удалена")
-        return response
+        logger.info("Метка %s удалена", label_id)
+        return redirect(self.success_url)
@@ -0,0 +1,189 @@
+"""
+Журнал без задержки ответа.
+
+Логгеры приложений пишут в QueueHandler: в потоке запроса запись только
+собирается (сообщение из %-аргументов, id запроса и пользователя)
+и кладётся в очередь. Форматирование в JSON и запись в консоль и файл
+делает поток QueueListener, поэтому медленный диск или переполненный
+pipe не задерживают ответ. Подключается через
+LOGGING_CONFIG = "task_manager.logs.configure" (см. settings.LOGGING).
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.config
+import logging.handlers
+import queue
+import re
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+# Чужой id запроса (от балансировщика) берётся, только если похож на id
+REQUEST_ID_RE = re.compile(r'^[\w.-]{1,64}$')
+
+_request = ContextVar('log_request', default=None)
+# Текст исключения для записи в очереди
+_traceback = logging.Formatter()
+
+
+# ---------------------------
+# Контекст запроса в записях журнала
+# ---------------------------
+def request_user_id(request):
+    """
+    id пользователя, если он уже загружен представлением:
+    сам фильтр журнала запросов к базе не делает.
+    """
+    user = getattr(request, '_cached_user', None)
+    if user is None:
+        user = getattr(request, '_acached_user', None)
+    if user is not None and user.is_authenticated:
+        return user.pk
+    return None
+
+
+class RequestContextFilter(logging.Filter):
+    """Добавляет в запись request_id и user_id текущего запроса."""
+
+    def filter(self, record):
+        request = _request.get()
+        record.request_id = getattr(request, 'request_id', None)
+        record.user_id = request_user_id(request) if request else None
+        return True
+
+
+class RequestIdMiddleware:
+    """
+    Присваивает запросу id (или берёт заголовок X-Request-ID)
+    и возвращает его в ответе. Ставится первым в MIDDLEWARE,
+    чтобы id был у всех записей журнала за время запроса.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request.reset(token)
+        response[REQUEST_ID_HEADER] = request.request_id
+        return response
+
+    async def __acall__(self, request):
+        token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request.reset(token)
+        response[REQUEST_ID_HEADER] = request.request_id
+        return response
+
+    def start(self, request):
+        request_id = request.headers.get(REQUEST_ID_HEADER, '')
+        if not REQUEST_ID_RE.match(request_id):
+            request_id = uuid.uuid4().hex
+        request.request_id = request_id
+        return _request.set(request)
+
+
+# ---------------------------
+# Формат и очередь
+# ---------------------------
+class JsonFormatter(logging.Formatter):
+    """Одна строка JSON на запись (JSON Lines)."""
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc)
+            .isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'user_id': getattr(record, 'user_id', None),
+            'process': record.process,
+            'thread': record.threadName,
+        }
+        # django.request и django.server добавляют код ответа
+        status_code = getattr(record, 'status_code', None)
+        if status_code is not None:
+            data['status_code'] = status_code
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exc_info'] = record.exc_text
+        if record.stack_info:
+            data['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    Кладёт записи в очередь процесса; targets — имена обработчиков
+    из того же LOGGING, которые выполняет поток QueueListener.
+    Подключается через "()", а не "class": dictConfig в Python 3.12+
+    по-своему настраивает "class"-наследников QueueHandler.
+    """
+
+    def __init__(self, targets=()):
+        super().__init__(queue.SimpleQueue())
+        self.targets = list(targets)
+        self.listener = None
+
+    def prepare(self, record):
+        # Сообщение собирается здесь: аргументы могут измениться,
+        # пока запись ждёт в очереди. Текст исключения — отдельно
+        # от сообщения, его выводит форматтер обработчика.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = _traceback.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def start(self, handlers):
+        self.stop()
+        self.listener = logging.handlers.QueueListener(
+            self.queue, *handlers, respect_handler_level=True
+        )
+        self.listener.start()
+        # До logging.shutdown(): очередь дописывается в ещё открытые файлы
+        atexit.register(self.stop)
+
+    def stop(self):
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            listener.stop()
+
+    def close(self):
+        # Повторный dictConfig закрывает старые обработчики
+        self.stop()
+        super().close()
+
+
+def configure(config):
+    """
+    LOGGING_CONFIG: dictConfig и запуск QueueListener для каждого
+    QueueHandler с обработчиками, названными в его targets.
+    """
+    configurator = logging.config.dictConfigClass(config)
+    configurator.configure()
+    handlers = configurator.config.get('handlers', {})
+    for handler in handlers.values():
+        if isinstance(handler, QueueHandler):
+            handler.start([handlers[name] for name in handler.targets])
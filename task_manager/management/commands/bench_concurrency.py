@@ -0,0 +1,249 @@
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client, RequestFactory
+
+# режим -> (сервер, переменные окружения для --compare);
+# под ASGI постоянные соединения выключены, как в task_manager/asgi.py
+MODES = {
+    'wsgi': ('wsgi', {'ASYNC_VIEWS': 'False'}),
+    'asgi-sync-views': ('asgi', {'ASYNC_VIEWS': 'False', 'DB_CONN_MAX_AGE': '0'}),
+    'asgi': ('asgi', {'ASYNC_VIEWS': 'True', 'DB_CONN_MAX_AGE': '0'}),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает WSGI и ASGI при одинаковом числе воркеров: "
+        "одновременные клиенты, каждый читает ответ --client-delay мс "
+        "(медленная сеть). WSGI-воркер — поток, занятый до конца отправки, "
+        "как синхронный воркер gunicorn; ASGI-воркер — цикл событий, "
+        "как воркер uvicorn. С --compare запускает все режимы: " + ', '.join(MODES)
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default='/users/',
+            help="Адрес страницы.",
+        )
+        parser.add_argument(
+            '--user',
+            help="Имя пользователя для страниц, требующих входа.",
+        )
+        parser.add_argument(
+            '--server',
+            choices=['wsgi', 'asgi'],
+            default='wsgi',
+        )
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=50,
+            help="Число одновременных клиентов.",
+        )
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument(
+            '--client-delay',
+            type=float,
+            default=50,
+            help="Сколько миллисекунд клиент читает ответ.",
+        )
+        parser.add_argument(
+            '--compare',
+            action='store_true',
+            help="Повторить замер в режимах: " + ', '.join(MODES),
+        )
+
+    def handle(self, *args, **options):
+        for name in ('workers', 'concurrency', 'requests'):
+            if options[name] < 1:
+                raise CommandError(f"--{name} должен быть больше нуля")
+        if options['compare']:
+            return self.compare(options)
+
+        self.path = options['path']
+        self.delay = options['client_delay'] / 1000
+        self.cookie = self.login_cookie(options['user'])
+        self.host = next(
+            (host for host in settings.ALLOWED_HOSTS if host != '*'),
+            'localhost',
+        )
+        run = self.run_wsgi if options['server'] == 'wsgi' else self.run_asgi
+
+        started = time.perf_counter()
+        timings = run(options['workers'], options['concurrency'], options['requests'])
+        elapsed = time.perf_counter() - started
+
+        timings.sort()
+        p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['server']}, ASYNC_VIEWS={settings.ASYNC_VIEWS}, "
+            f"воркеров {options['workers']}, клиентов {options['concurrency']}: "
+            f"{len(timings) / elapsed:.1f} запросов/с, "
+            f"медиана {statistics.median(timings):.1f} мс, p95 {p95:.1f} мс"
+        ))
+
+    def login_cookie(self, username):
+        if not username:
+            return ''
+        try:
+            user = User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f"Пользователь {username} не найден")
+        client = Client()
+        client.force_login(user)
+        return '; '.join(
+            f'{name}={morsel.value}' for name, morsel in client.cookies.items()
+        )
+
+    def check_status(self, status):
+        if not str(status).startswith('200'):
+            raise CommandError(f"{self.path} ответил {status}")
+
+    # ---------------------------
+    # WSGI: поток на запрос до конца отправки ответа
+    # ---------------------------
+    def run_wsgi(self, workers, concurrency, requests):
+        handler = WSGIHandler()
+        environ = RequestFactory().get(
+            self.path, HTTP_HOST=self.host, HTTP_COOKIE=self.cookie
+        ).environ
+
+        def request():
+            status = []
+            response = handler(
+                dict(environ), lambda code, headers: status.append(code)
+            )
+            for _chunk in response:
+                pass
+            # Синхронный воркер занят, пока клиент не дочитает ответ
+            time.sleep(self.delay)
+            response.close()
+            self.check_status(status[0])
+
+        # Клиенты сверх числа воркеров ждут в очереди, как в backlog сокета;
+        # задержка считается от отправки запроса клиентом
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            def client(_index):
+                started = time.perf_counter()
+                pool.submit(request).result()
+                return (time.perf_counter() - started) * 1000
+
+            with ThreadPoolExecutor(max_workers=concurrency) as clients:
+                return list(clients.map(client, range(requests)))
+
+    # ---------------------------
+    # ASGI: цикл событий на воркер
+    # ---------------------------
+    def run_asgi(self, workers, concurrency, requests):
+        handler = ASGIHandler()
+        timings = []
+        lock = threading.Lock()
+
+        def worker(index):
+            share = requests // workers + (index < requests % workers)
+            clients = max(1, concurrency // workers)
+            result = asyncio.run(self.asgi_worker(handler, share, clients))
+            connections.close_all()
+            with lock:
+                timings.extend(result)
+
+        threads = [
+            threading.Thread(target=worker, args=(index,))
+            for index in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if len(timings) != requests:
+            raise CommandError("Не все запросы выполнены, см. ошибки выше")
+        return timings
+
+    async def asgi_worker(self, handler, requests, clients):
+        semaphore = asyncio.Semaphore(clients)
+
+        async def limited():
+            async with semaphore:
+                return await self.asgi_request(handler)
+
+        return await asyncio.gather(*(limited() for _i in range(requests)))
+
+    async def asgi_request(self, handler):
+        url = urlsplit(self.path)
+        headers = [(b'host', self.host.encode())]
+        if self.cookie:
+            headers.append((b'cookie', self.cookie.encode()))
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': url.path,
+            'raw_path': url.path.encode(),
+            'query_string': url.query.encode(),
+            'root_path': '',
+            'headers': headers,
+            'client': ('127.0.0.1', 0),
+            'server': (self.host, 80),
+        }
+        received = False
+        done = asyncio.Event()
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            # Клиент не отключается, пока не получит ответ
+            await done.wait()
+            return {'type': 'http.disconnect'}
+
+        status = []
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+            elif not message.get('more_body'):
+                # Медленный клиент ждёт в цикле событий, поток свободен
+                await asyncio.sleep(self.delay)
+                done.set()
+
+        started = time.perf_counter()
+        await handler(scope, receive, send)
+        self.check_status(status[0])
+        return (time.perf_counter() - started) * 1000
+
+    def compare(self, options):
+        argv = [sys.executable, sys.argv[0], 'bench_concurrency']
+        for name in ('path', 'workers', 'concurrency', 'requests', 'client_delay'):
+            argv += [f"--{name.replace('_', '-')}", str(options[name])]
+        if options['user']:
+            argv += ['--user', options['user']]
+        for mode, (server, env) in MODES.items():
+            self.stdout.write(f"--- {mode}")
+            result = subprocess.run(
+                [*argv, '--server', server],
+                env={**os.environ, **env},
+                capture_output=True,
+                text=True,
+            )
+            self.stdout.write(result.stdout.rstrip())
+            if result.returncode:
+                self.stderr.write(result.stderr.strip().splitlines()[-1])
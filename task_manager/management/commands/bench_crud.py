@@ -0,0 +1,305 @@
+import json
+import platform
+import random
+import statistics
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.urls import reverse
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks import dataset
+from task_manager.tasks.models import Task
+
+SCENARIOS = ('list', 'detail', 'create', 'update', 'delete')
+# Имена задач, созданных замером; удаляются в конце
+RUN_PREFIX = 'bench-run'
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет сценарии работы с задачами через полный цикл Django: "
+        "список с фильтром, карточка, создание, изменение, удаление. "
+        "База дополняется синтетическими данными до --tasks задач. "
+        "Печатает p50/p95/p99 и число запросов к базе, сохраняет их "
+        "в JSON и сравнивает с эталоном (--baseline)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=10000)
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--statuses', type=int, default=8)
+        parser.add_argument('--labels', type=int, default=50)
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help="Зерно генератора данных и выбора фильтров.",
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=50,
+            help="Число замеров на сценарий.",
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=5,
+            help="Запросы перед замером, в статистику не входят.",
+        )
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            choices=SCENARIOS,
+            help="Сценарий; можно указать несколько раз. По умолчанию все.",
+        )
+        parser.add_argument('--output', help="Куда сохранить результаты (JSON).")
+        parser.add_argument(
+            '--baseline',
+            help="Эталонные результаты: регрессия завершает команду с ошибкой.",
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.5,
+            help="Допустимый рост p50 и p95 относительно эталона (доля).",
+        )
+
+    def handle(self, *args, **options):
+        for name in ('users', 'statuses', 'labels', 'requests'):
+            if options[name] < 1:
+                raise CommandError(f"--{name} должен быть больше нуля")
+        if options['warmup'] < 0 or options['tasks'] < 0:
+            raise CommandError("--warmup и --tasks не могут быть отрицательными")
+        baseline = self.read_baseline(options['baseline'])
+
+        started = time.monotonic()
+        created = dataset.generate_dataset(
+            tasks=options['tasks'],
+            users=options['users'],
+            statuses=options['statuses'],
+            labels=options['labels'],
+            seed=options['seed'],
+        )
+        self.stdout.write(
+            f"Создано задач: {created} за {time.monotonic() - started:.1f} с, "
+            f"всего {Task.objects.count()}"
+        )
+
+        self.rng = random.Random(options['seed'])
+        self.user = User.objects.get(username=f'{dataset.PREFIX}_user_0')
+        self.client = Client(HTTP_HOST=next(
+            (host for host in settings.ALLOWED_HOSTS if host != '*'),
+            'localhost',
+        ))
+        self.client.force_login(self.user)
+        self.status_ids = list(Status.objects.values_list('pk', flat=True))
+        self.label_ids = list(Label.objects.values_list('pk', flat=True))
+        self.user_ids = list(User.objects.values_list('pk', flat=True))
+
+        results = {
+            'meta': {
+                'tasks': Task.objects.count(),
+                'requests': options['requests'],
+                'vendor': connection.vendor,
+                'django': django.get_version(),
+                'python': platform.python_version(),
+            },
+            'scenarios': {},
+        }
+        try:
+            for name in options['scenario'] or SCENARIOS:
+                results['scenarios'][name] = self.run_scenario(
+                    name, options['warmup'], options['requests']
+                )
+        finally:
+            self.cleanup()
+
+        for name, stats in results['scenarios'].items():
+            self.stdout.write(
+                f"{name}: p50 {stats['p50_ms']:.1f} мс, "
+                f"p95 {stats['p95_ms']:.1f} мс, p99 {stats['p99_ms']:.1f} мс, "
+                f"запросов к базе {stats['queries']}"
+            )
+        if options['output']:
+            Path(options['output']).write_text(
+                json.dumps(results, ensure_ascii=False, indent=2)
+            )
+            self.stdout.write(f"Результаты сохранены в {options['output']}")
+        if baseline is not None:
+            self.compare(baseline, results, options['tolerance'])
+
+    # ---------------------------
+    # Сценарии
+    # ---------------------------
+    def run_scenario(self, name, warmup, requests):
+        scenario = getattr(self, f'scenario_{name}')
+        calls = scenario(warmup + requests)
+        timings = []
+        queries = []
+        for index, call in enumerate(calls):
+            elapsed, count = self.measure(call)
+            if index >= warmup:
+                timings.append(elapsed)
+                queries.append(count)
+        return {
+            'requests': len(timings),
+            **percentiles(timings),
+            'queries': max(queries),
+        }
+
+    def measure(self, call):
+        count = 0
+
+        def counter(execute, sql, params, many, context):
+            nonlocal count
+            count += 1
+            return execute(sql, params, many, context)
+
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(counter))
+            started = time.perf_counter()
+            response = call()
+            elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code not in (200, 302):
+            raise CommandError(
+                f"{response.request['PATH_INFO']} ответил {response.status_code}"
+            )
+        return elapsed, count
+
+    def scenario_list(self, n):
+        url = reverse('tasks:tasks_list')
+        filters = (
+            lambda: {},
+            lambda: {'status': self.rng.choice(self.status_ids)},
+            lambda: {'executor': self.rng.choice(self.user_ids)},
+            lambda: {'labels': self.rng.choice(self.label_ids)},
+            lambda: {
+                'status': self.rng.choice(self.status_ids),
+                'labels': self.rng.choice(self.label_ids),
+            },
+            lambda: {'own_task': 'on'},
+        )
+        for _i in range(n):
+            data = self.rng.choice(filters)()
+            yield lambda data=data: self.client.get(url, data)
+
+    def scenario_detail(self, n):
+        pks = self.sample_task_ids(n)
+        for i in range(n):
+            url = reverse('tasks:tasks_detail', args=[pks[i % len(pks)]])
+            yield lambda url=url: self.client.get(url)
+
+    def scenario_create(self, n):
+        url = reverse('tasks:tasks_create')
+        for i in range(n):
+            data = self.form_data(f'{RUN_PREFIX} {i}')
+            yield lambda data=data: self.client.post(url, data)
+
+    def scenario_update(self, n):
+        for i, pk in enumerate(self.own_tasks(n)):
+            url = reverse('tasks:tasks_update', args=[pk])
+            data = self.form_data(f'{RUN_PREFIX} {i} изменена')
+            yield lambda url=url, data=data: self.client.post(url, data)
+
+    def scenario_delete(self, n):
+        for pk in self.own_tasks(n):
+            url = reverse('tasks:tasks_delete', args=[pk])
+            yield lambda url=url: self.client.post(url)
+
+    # ---------------------------
+    # Данные сценариев
+    # ---------------------------
+    def form_data(self, name):
+        return {
+            'name': name,
+            'description': ' '.join(self.rng.choices(dataset.WORDS, k=20)),
+            'status': self.rng.choice(self.status_ids),
+            'executor': self.rng.choice(self.user_ids),
+            'labels': self.rng.sample(
+                self.label_ids, k=min(2, len(self.label_ids))
+            ),
+        }
+
+    def sample_task_ids(self, n):
+        """Случайные существующие задачи без ORDER BY random() по всей таблице."""
+        ids = Task.objects.order_by('pk').values_list('pk', flat=True)
+        first, last = ids.first(), ids.last()
+        if first is None:
+            raise CommandError("Нет задач для замера, укажите --tasks")
+        candidates = [self.rng.randint(first, last) for _i in range(n * 2)]
+        found = list(Task.objects.filter(pk__in=candidates).values_list('pk', flat=True))
+        return found or [first]
+
+    def own_tasks(self, n):
+        """Задачи пользователя замера: изменять и удалять может только автор."""
+        rows = [
+            Task(
+                name=f'{RUN_PREFIX} {i}',
+                description='',
+                status_id=self.rng.choice(self.status_ids),
+                author_id=self.user.pk,
+            )
+            for i in range(n)
+        ]
+        dataset.create_batch(rows, [[] for _row in rows])
+        return [task.pk for task in rows]
+
+    def cleanup(self):
+        # По одной: Task.delete() поддерживает счётчики задач
+        for task in Task.objects.filter(
+            author=self.user, name__startswith=RUN_PREFIX
+        ):
+            task.delete()
+
+    # ---------------------------
+    # Сравнение с эталоном
+    # ---------------------------
+    def read_baseline(self, path):
+        if not path:
+            return None
+        try:
+            return json.loads(Path(path).read_text())['scenarios']
+        except FileNotFoundError:
+            raise CommandError(f"Файл {path} не найден")
+        except (ValueError, KeyError, TypeError):
+            raise CommandError(f"{path}: не результаты bench_crud")
+
+    def compare(self, baseline, results, tolerance):
+        regressions = []
+        for name, stats in results['scenarios'].items():
+            expected = baseline.get(name)
+            if expected is None:
+                continue
+            if stats['queries'] > expected['queries']:
+                regressions.append(
+                    f"{name}: запросов к базе {stats['queries']} "
+                    f"вместо {expected['queries']}"
+                )
+            for key in ('p50_ms', 'p95_ms'):
+                if stats[key] > expected[key] * (1 + tolerance):
+                    regressions.append(
+                        f"{name}: {key} {stats[key]:.1f} "
+                        f"при эталоне {expected[key]:.1f}"
+                    )
+        if regressions:
+            raise CommandError("Регрессии:\n" + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS("Регрессий нет"))
+
+
+def percentiles(timings):
+    if len(timings) == 1:
+        value = timings[0]
+        return {'p50_ms': value, 'p95_ms': value, 'p99_ms': value}
+    cuts = statistics.quantiles(timings, n=100, method='inclusive')
+    return {'p50_ms': cuts[49], 'p95_ms': cuts[94], 'p99_ms': cuts[98]}
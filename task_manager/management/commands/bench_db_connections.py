@@ -0,0 +1,136 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+
+# режим -> переменные окружения для --compare
+MODES = {
+    'new': {'DB_CONN_MAX_AGE': '0', 'DB_POOL': 'False'},
+    'persistent': {'DB_CONN_MAX_AGE': '600', 'DB_POOL': 'False'},
+    'pool': {'DB_CONN_MAX_AGE': '0', 'DB_POOL': 'True'},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет задержку запросов через полный WSGI-цикл Django "
+        "(с закрытием соединений в конце запроса, как под gunicorn) "
+        "и считает новые подключения к базе. С --compare запускает замер "
+        "без постоянных соединений, с постоянными и с пулом."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default='/api/v1/users/?limit=20',
+            help="Адрес страницы; должна быть доступна без входа.",
+        )
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=10,
+            help="Запросы перед замером, в статистику не входят.",
+        )
+        parser.add_argument(
+            '--compare',
+            action='store_true',
+            help="Повторить замер в режимах: " + ', '.join(MODES),
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError("--requests должен быть больше нуля")
+        if options['compare']:
+            return self.compare(options)
+
+        database = settings.DATABASES['default']
+        pool = database.get('OPTIONS', {}).get('pool')
+        self.stdout.write(
+            f"{connection.vendor}: CONN_MAX_AGE={database['CONN_MAX_AGE']}, "
+            f"health checks={database.get('CONN_HEALTH_CHECKS')}, "
+            f"pool={'да' if pool else 'нет'}"
+        )
+
+        handler = WSGIHandler()
+        environ = self.build_environ(options['path'])
+        for _i in range(options['warmup']):
+            self.request(handler, environ)
+
+        opened = []
+
+        def on_connect(sender, connection, **kwargs):
+            opened.append(connection.alias)
+
+        connection_created.connect(on_connect)
+        try:
+            timings = [
+                self.request(handler, environ)
+                for _i in range(options['requests'])
+            ]
+        finally:
+            connection_created.disconnect(on_connect)
+
+        timings.sort()
+        p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+        self.stdout.write(self.style.SUCCESS(
+            f"Запросов: {len(timings)}, "
+            f"среднее {statistics.mean(timings):.2f} мс, "
+            f"медиана {statistics.median(timings):.2f} мс, "
+            f"p95 {p95:.2f} мс, "
+            f"новых соединений: {len(opened)}"
+        ))
+
+    def build_environ(self, path):
+        host = next(
+            (host for host in settings.ALLOWED_HOSTS if host != '*'),
+            'localhost',
+        )
+        return RequestFactory().get(path, HTTP_HOST=host).environ
+
+    def request(self, handler, environ):
+        started = time.perf_counter()
+        status = []
+        response = handler(
+            dict(environ), lambda code, headers: status.append(code)
+        )
+        for _chunk in response:
+            pass
+        # close() посылает request_finished: здесь Django закрывает
+        # соединение или, при CONN_MAX_AGE > 0, оставляет открытым
+        response.close()
+        elapsed = (time.perf_counter() - started) * 1000
+        if not status[0].startswith('200'):
+            raise CommandError(f"{environ['PATH_INFO']} ответил {status[0]}")
+        return elapsed
+
+    def compare(self, options):
+        if connection.vendor != 'postgresql':
+            self.stderr.write(
+                "Режимы различаются только для PostgreSQL: задайте DATABASE_URL"
+            )
+        argv = [
+            sys.executable, sys.argv[0], 'bench_db_connections',
+            '--path', options['path'],
+            '--requests', str(options['requests']),
+            '--warmup', str(options['warmup']),
+        ]
+        for mode, env in MODES.items():
+            self.stdout.write(f"--- {mode}")
+            result = subprocess.run(
+                argv,
+                env={**os.environ, **env},
+                capture_output=True,
+                text=True,
+            )
+            self.stdout.write(result.stdout.rstrip())
+            if result.returncode:
+                self.stderr.write(result.stderr.strip().splitlines()[-1])
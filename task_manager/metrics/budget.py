@@ -0,0 +1,118 @@
+"""
+Бюджет запросов к базе для представления.
+
+Представление объявляет наибольшее число запросов на один HTTP-запрос:
+атрибутом класса query_budget или декоратором @query_budget(n) для
+функций. RequestMetricsMiddleware считает запросы вместе с рендерингом
+шаблона — там и появляются N+1 вроде {{ task.labels.all }} в строке
+таблицы — и при превышении действует по settings.QUERY_BUDGET:
+
+* 'off' — ничего не проверять (по умолчанию без DEBUG);
+* 'warn' — предупреждение в лог со стеками повторяющихся запросов;
+* 'raise' — исключение QueryBudgetExceeded (тесты, см. tests/conftest.py).
+"""
+import logging
+import os
+import sys
+import traceback
+from collections import defaultdict
+
+from django.conf import settings
+from django.template.base import Node
+
+logger = logging.getLogger("metrics")
+
+OFF, WARN, RAISE = 'off', 'warn', 'raise'
+# Сколько кадров стека показывать у повторяющегося запроса
+STACK_DEPTH = 8
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(limit):
+    """Бюджет для функции-представления (для классов — атрибут query_budget)."""
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+def get_query_budget(view_func):
+    view_class = getattr(view_func, 'view_class', None)
+    return getattr(view_class or view_func, 'query_budget', None)
+
+
+def enabled():
+    return settings.QUERY_BUDGET in (WARN, RAISE)
+
+
+def capture_stack():
+    """
+    Кадры кода проекта и строки шаблонов, которые рендерились
+    в момент запроса: библиотеки и сам замер не интересны.
+    """
+    root = str(settings.BASE_DIR)
+    here = os.path.dirname(__file__)
+    stack = []
+    frame = sys._getframe(1)
+    while frame is not None:
+        code = frame.f_code
+        if code is Node.render_annotated.__code__:
+            node = frame.f_locals['self']
+            origin, token = getattr(node, 'origin', None), getattr(node, 'token', None)
+            if origin and token and origin.name.startswith(root):
+                stack.append(traceback.FrameSummary(
+                    origin.name, token.lineno, type(node).__name__,
+                ))
+        elif (
+            code.co_filename.startswith(root)
+            and 'site-packages' not in code.co_filename
+            and not code.co_filename.startswith(here)
+        ):
+            stack.append(traceback.FrameSummary(
+                code.co_filename, frame.f_lineno, code.co_name,
+            ))
+        frame = frame.f_back
+    stack.reverse()
+    return stack[-STACK_DEPTH:]
+
+
+def duplicates(queries):
+    """
+    Запросы с одинаковым SQL: [(sql, число, стек последнего)], частые первыми.
+    Первый из повторов часто не из цикла (например, загрузка
+    request.user перед авторами задач), последний — из него.
+    """
+    groups = defaultdict(list)
+    for sql, stack in queries:
+        groups[sql].append(stack)
+    return sorted(
+        (
+            (sql, len(stacks), stacks[-1])
+            for sql, stacks in groups.items()
+            if len(stacks) > 1
+        ),
+        key=lambda item: -item[1],
+    )
+
+
+def report(view, metrics):
+    lines = [
+        f"{view}: {metrics.db_queries} запросов к базе "
+        f"при бюджете {metrics.budget}"
+    ]
+    for sql, count, stack in duplicates(metrics.queries):
+        lines.append(f"\n{count} раз: {sql}")
+        lines.extend(line.rstrip() for line in traceback.format_list(stack))
+    return '\n'.join(lines)
+
+
+def check_budget(view, metrics):
+    if metrics.budget is None or metrics.db_queries <= metrics.budget:
+        return
+    message = report(view, metrics)
+    if settings.QUERY_BUDGET == RAISE:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
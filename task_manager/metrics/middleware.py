@@ -0,0 +1,159 @@
+"""
+Замер каждого запроса: общее время, число и время запросов к базе,
+время рендеринга шаблона и размер ответа.
+
+Показатели текущего запроса лежат в ContextVar: его копируют потоки
+sync_to_async под ASGI, поэтому запросы к базе из синхронного кода
+попадают в нужный замер. Обёртка выполнения SQL ставится на каждое
+соединение один раз (connection.execute_wrappers) и ничего не делает
+вне замера — например, в командах manage.py.
+
+Здесь же проверяется бюджет запросов представления (budget.py).
+"""
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .budget import capture_stack, check_budget, enabled, get_query_budget
+from .registry import RequestMetrics, registry
+
+UNRESOLVED = '<unresolved>'
+
+_current = ContextVar('request_metrics', default=None)
+
+
+def time_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - started
+        metrics.db_queries += 1
+        if metrics.queries is not None:
+            metrics.queries.append((sql, capture_stack()))
+
+
+def install_query_timer(connection, **kwargs):
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else UNRESOLVED
+
+
+def server_timing(metrics, duration):
+    return ', '.join([
+        f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.db_queries} queries"',
+        f'tpl;dur={metrics.template_time * 1000:.1f}',
+        f'total;dur={duration * 1000:.1f}',
+    ])
+
+
+def timed_render(response):
+    """
+    response.render() внутри представления (routers.ReplicaReadMixin):
+    время засчитывается в замер запроса, как при рендеринге после
+    представления в process_template_response.
+    """
+    metrics = _current.get()
+    started = time.perf_counter()
+    try:
+        return response.render()
+    finally:
+        if metrics is not None:
+            metrics.template_time += time.perf_counter() - started
+
+
+class RequestMetricsMiddleware:
+    """
+    Ставится первым в MIDDLEWARE, чтобы время включало остальные.
+    Показатели собираются в registry по имени маршрута
+    (tasks:tasks_list и т. п.) и отдаются заголовком Server-Timing,
+    если включён settings.METRICS_SERVER_TIMING.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        # Новые соединения получают обёртку при открытии,
+        # уже открытые в этом потоке — сразу
+        connection_created.connect(
+            install_query_timer, dispatch_uid='task_manager.metrics'
+        )
+        for connection in connections.all(initialized_only=True):
+            install_query_timer(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics, token, started = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    async def __acall__(self, request):
+        metrics, token, started = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, started)
+
+    def start(self):
+        metrics = RequestMetrics()
+        # Соединение могло открыться до подключения сигнала
+        for connection in connections.all(initialized_only=True):
+            install_query_timer(connection)
+        return metrics, _current.set(metrics), time.perf_counter()
+
+    def finish(self, request, response, metrics, started):
+        duration = time.perf_counter() - started
+        check_budget(view_name(request), metrics)
+        # Размер потокового ответа известен только после отправки
+        size = None if response.streaming else len(response.content)
+        registry.observe(
+            view_name(request),
+            request.method,
+            response.status_code,
+            duration,
+            metrics,
+            size,
+        )
+        if settings.METRICS_SERVER_TIMING:
+            response['Server-Timing'] = server_timing(metrics, duration)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _current.get()
+        budget = get_query_budget(view_func)
+        if metrics is not None and budget is not None and enabled():
+            metrics.budget = budget
+            metrics.queries = []
+
+    def process_template_response(self, request, response):
+        metrics = _current.get()
+        # Представление могло отрендерить ответ само (timed_render)
+        if metrics is None or response.is_rendered:
+            return response
+        started = time.perf_counter()
+
+        def rendered(response):
+            metrics.template_time += time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
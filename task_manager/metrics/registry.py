@@ -0,0 +1,162 @@
+"""
+Гистограммы запросов в памяти процесса и их вывод в текстовом
+формате Prometheus.
+
+Как и счётчики кешей (caching.backends), значения живут в процессе:
+при нескольких воркерах каждый отдаёт свои, суммирует их Prometheus.
+"""
+import threading
+from bisect import bisect_left
+
+PREFIX = 'task_manager'
+
+# Границы корзин: секунды, число запросов к базе, байты
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, name, description, buckets, labelnames=('view',)):
+        self.name = f'{PREFIX}_{name}'
+        self.description = description
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        # labels -> [счётчики корзин..., сумма, число наблюдений]
+        self.series = {}
+
+    def observe(self, labels, value):
+        series = self.series.setdefault(
+            labels, [0] * len(self.buckets) + [0, 0]
+        )
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self):
+        yield f'# HELP {self.name} {self.description}'
+        yield f'# TYPE {self.name} histogram'
+        for labels, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = (('le', _number(bound)),)
+                yield f'{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}'
+            inf = (('le', '+Inf'),)
+            yield f'{self.name}_bucket{_labels(self.labelnames, labels, inf)} {series[-1]}'
+            yield f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-2])}'
+            yield f'{self.name}_count{_labels(self.labelnames, labels)} {series[-1]}'
+
+
+class Counter:
+    def __init__(self, name, description, labelnames):
+        self.name = f'{PREFIX}_{name}'
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self.series = {}
+
+    def inc(self, labels, value=1):
+        self.series[labels] = self.series.get(labels, 0) + value
+
+    def render(self):
+        yield f'# HELP {self.name} {self.description}'
+        yield f'# TYPE {self.name} counter'
+        for labels, value in sorted(self.series.items()):
+            yield f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}'
+
+
+class RequestMetrics:
+    """Показатели одного запроса, их заполняет RequestMetricsMiddleware."""
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        # Бюджет представления и [(sql, стек)], если его проверяют (budget.py)
+        self.budget = None
+        self.queries = None
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.responses = Counter(
+                'http_responses_total',
+                "Ответы по представлению, методу и коду.",
+                ('view', 'method', 'status'),
+            )
+            self.histograms = {
+                'duration': Histogram(
+                    'request_duration_seconds',
+                    "Время обработки запроса.",
+                    DURATION_BUCKETS,
+                ),
+                'db_time': Histogram(
+                    'db_duration_seconds',
+                    "Время запросов к базе за один HTTP-запрос.",
+                    DURATION_BUCKETS,
+                ),
+                'db_queries': Histogram(
+                    'db_queries',
+                    "Число запросов к базе за один HTTP-запрос.",
+                    QUERY_BUCKETS,
+                ),
+                'template_time': Histogram(
+                    'template_duration_seconds',
+                    "Время рендеринга шаблона.",
+                    DURATION_BUCKETS,
+                ),
+                'response_size': Histogram(
+                    'response_size_bytes',
+                    "Размер тела ответа (без потоковых ответов).",
+                    SIZE_BUCKETS,
+                ),
+            }
+
+    def observe(self, view, method, status, duration, metrics, size=None):
+        labels = (view,)
+        with self._lock:
+            self.responses.inc((view, method, str(status)))
+            self.histograms['duration'].observe(labels, duration)
+            self.histograms['db_time'].observe(labels, metrics.db_time)
+            self.histograms['db_queries'].observe(labels, metrics.db_queries)
+            self.histograms['template_time'].observe(labels, metrics.template_time)
+            if size is not None:
+                self.histograms['response_size'].observe(labels, size)
+
+    def render(self, extra=()):
+        """Текст для Prometheus; extra — дополнительные метрики с render()."""
+        with self._lock:
+            lines = [
+                line
+                for metric in (self.responses, *self.histograms.values(), *extra)
+                for line in metric.render()
+            ]
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views import View
+
+from ..caching import cache_stats
+from .registry import Counter, registry
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def cache_counters():
+    hits = Counter('cache_hits_total', "Попадания в кеш.", ('cache',))
+    misses = Counter('cache_misses_total', "Промахи кеша.", ('cache',))
+    for alias, stats in cache_stats().items():
+        hits.inc((alias,), stats['hits'])
+        misses.inc((alias,), stats['misses'])
+    return hits, misses
+
+
+class MetricsView(View):
+    """
+    Гистограммы запросов текущего процесса в формате Prometheus.
+    Доступ — персоналу или с заголовком
+    Authorization: Bearer <settings.METRICS_TOKEN>.
+    """
+
+    http_method_names = ['get']
+
+    def has_access(self, request):
+        token = settings.METRICS_TOKEN
+        header = request.headers.get('Authorization', '')
+        if token and constant_time_compare(header, f'Bearer {token}'):
+            return True
+        return request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        if not self.has_access(request):
+            return HttpResponseForbidden()
+        return HttpResponse(
+            registry.render(extra=cache_counters()),
+            content_type=CONTENT_TYPE,
+        )
@@ -0,0 +1,212 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.http import Http404
+from django.utils.translation import gettext_lazy as _
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def _split_key(key):
+    """'-created_at' -> ('created_at', True)"""
+    if key.startswith('-'):
+        return key[1:], True
+    return key, False
+
+
+def _serialize(value):
+    # isoformat() сохраняет микросекунды, в отличие от DjangoJSONEncoder,
+    # иначе сравнение на равенство по created_at даст неверную страницу
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Курсорная (keyset) пагинация.
+
+    Вместо OFFSET страница выбирается условием
+    «строго после последней строки предыдущей страницы» по ключам сортировки,
+    поэтому глубокие страницы стоят столько же, сколько первая,
+    а вставка новых строк не сдвигает уже выданные страницы.
+    Последний ключ должен быть уникальным (обычно id).
+    """
+
+    def __init__(self, queryset, per_page, keys=('created_at', 'id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.keys = [_split_key(key) for key in keys]
+
+    def _ordering(self, reverse=False):
+        return [
+            f"{'-' if desc != reverse else ''}{field}"
+            for field, desc in self.keys
+        ]
+
+    def _values(self, row):
+        if isinstance(row, dict):
+            return [_serialize(row[field]) for field, _desc in self.keys]
+        return [_serialize(getattr(row, field)) for field, _desc in self.keys]
+
+    def _seek(self, values, reverse=False):
+        """
+        Лексикографическое сравнение кортежа ключей:
+        (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...
+        """
+        condition = Q()
+        for index, (field, desc) in enumerate(self.keys):
+            lookup = 'lt' if desc != reverse else 'gt'
+            term = Q(**{f'{field}__{lookup}': values[index]})
+            for prev_index, (prev_field, _desc) in enumerate(self.keys[:index]):
+                term &= Q(**{prev_field: values[prev_index]})
+            condition |= term
+        return condition
+
+    def encode_cursor(self, row, direction):
+        payload = json.dumps({'d': direction, 'v': self._values(row)})
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            direction, values = payload['d'], payload['v']
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise InvalidCursor(cursor)
+        if direction not in ('next', 'prev') or not isinstance(values, list):
+            raise InvalidCursor(cursor)
+        if len(values) != len(self.keys):
+            raise InvalidCursor(cursor)
+        # Курсор приходит от клиента: значения ключей приводятся к типам
+        # полей здесь, иначе подделанное значение уронит запрос при фильтрации
+        try:
+            values = [
+                self._to_python(field, value)
+                for (field, _desc), value in zip(self.keys, values)
+            ]
+        except (ValidationError, ValueError, TypeError):
+            raise InvalidCursor(cursor)
+        return direction, values
+
+    def _to_python(self, name, value):
+        if value is None:
+            raise ValueError(name)
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            field = annotation.output_field
+        else:
+            try:
+                field = self.queryset.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                return value
+        return field.to_python(value)
+
+    def _page_queryset(self, cursor):
+        queryset = self.queryset
+        backwards = False
+        if cursor:
+            direction, values = self.decode_cursor(cursor)
+            backwards = direction == 'prev'
+            queryset = queryset.filter(self._seek(values, reverse=backwards))
+
+        # Берём на одну строку больше, чтобы узнать, есть ли следующая страница
+        queryset = queryset.order_by(
+            *self._ordering(reverse=backwards)
+        )[:self.per_page + 1]
+        return queryset, backwards
+
+    def _make_page(self, rows, cursor, backwards):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+
+        has_next = has_more if not backwards else True
+        has_previous = has_more if backwards else bool(cursor)
+        if not rows:
+            return KeysetPage(rows)
+        return KeysetPage(
+            rows,
+            next_cursor=self.encode_cursor(rows[-1], 'next') if has_next else None,
+            previous_cursor=(
+                self.encode_cursor(rows[0], 'prev') if has_previous else None
+            ),
+        )
+
+    def page(self, cursor=None):
+        queryset, backwards = self._page_queryset(cursor)
+        return self._make_page(list(queryset), cursor, backwards)
+
+    async def apage(self, cursor=None):
+        """То же, что page(), через асинхронный ORM."""
+        queryset, backwards = self._page_queryset(cursor)
+        rows = [row async for row in queryset]
+        return self._make_page(rows, cursor, backwards)
+
+
+class KeysetPaginationMixin:
+    """
+    Подменяет стандартную постраничную разбивку ListView/FilterView
+    на курсорную. Параметры фильтра сохраняются в ссылках на страницы
+    шаблоном pagination.html.
+    """
+
+    paginate_by = 50
+    pagination_keys = ('created_at', 'id')
+    cursor_kwarg = 'cursor'
+
+    def get_pagination_keys(self):
+        return self.pagination_keys
+
+    def get_keyset_paginator(self, queryset, page_size):
+        return KeysetPaginator(queryset, page_size, self.get_pagination_keys())
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = self.get_keyset_paginator(queryset, page_size)
+        page = getattr(self, 'keyset_page', None)
+        if page is None:
+            try:
+                page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+            except InvalidCursor:
+                raise Http404(_("Неверный курсор страницы"))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    async def apaginate_queryset(self, queryset, page_size):
+        """
+        Загружает страницу асинхронным ORM заранее (см. asyncviews):
+        paginate_queryset() из get_context_data() берёт её готовой.
+        """
+        paginator = self.get_keyset_paginator(queryset, page_size)
+        try:
+            self.keyset_page = await paginator.apage(
+                self.request.GET.get(self.cursor_kwarg)
+            )
+        except InvalidCursor:
+            raise Http404(_("Неверный курсор страницы"))
@@ -0,0 +1,156 @@
+"""
+Чтение с реплик PostgreSQL для страниц, которые только показывают данные.
+
+Запросы идут на реплику, только если представление с ReplicaReadMixin
+это разрешило, поэтому записи и все остальные чтения остаются
+на основной базе. Реплика отстаёт от основной базы, поэтому
+после записи чтения какое-то время тоже идут на основную базу:
+- всему сеансу, который сам отправил POST (ReplicaPinningMiddleware);
+- всем, если данные страницы менялись недавно (по версиям из versioning).
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from task_manager.asyncviews import await_response
+from task_manager.metrics.middleware import timed_render
+from task_manager.versioning import get_versions
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PINNED_SESSION_KEY = 'replica_pinned_until'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def replica_reads():
+    """Чтения внутри блока уходят на случайную реплику."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and settings.DATABASE_REPLICAS:
+            return random.choice(settings.DATABASE_REPLICAS)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def is_pinned(request):
+    session = getattr(request, 'session', None)
+    if session is None:
+        return False
+    return session.get(PINNED_SESSION_KEY, 0) > time.time()
+
+
+class ReplicaPinningMiddleware:
+    """
+    После POST/PUT/DELETE сеанс читает с основной базы
+    DATABASE_REPLICA_PIN_SECONDS секунд: редирект на success_url
+    покажет только что сохранённые данные.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Под ASGI цепочка middleware остаётся асинхронной
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if self.should_pin(request):
+            request.session[PINNED_SESSION_KEY] = self.pinned_until()
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self.should_pin(request):
+            await request.session.aset(PINNED_SESSION_KEY, self.pinned_until())
+        return response
+
+    def should_pin(self, request):
+        return (
+            settings.DATABASE_REPLICAS
+            and request.method not in SAFE_METHODS
+            and hasattr(request, 'session')
+        )
+
+    def pinned_until(self):
+        return time.time() + settings.DATABASE_REPLICA_PIN_SECONDS
+
+
+class ReplicaReadMixin:
+    """
+    Чтения представления идут на реплику, если:
+    запрос безопасный, сеанс не закреплён за основной базой и данные
+    из replica_namespaces не менялись последние
+    DATABASE_REPLICA_PIN_SECONDS секунд. Последнее условие важно для
+    ETag и кешей страниц: их ключ — версия из кеша, и страница,
+    прочитанная с отстающей реплики, закрепилась бы под новой версией.
+    """
+
+    replica_namespaces = None
+
+    def get_replica_namespaces(self):
+        if self.replica_namespaces is not None:
+            return self.replica_namespaces
+        return (
+            *getattr(self, 'version_namespaces', ()),
+            *getattr(self, 'page_cache_namespaces', ()),
+        )
+
+    def use_replica(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return False
+        if request.method not in SAFE_METHODS or is_pinned(request):
+            return False
+        lag_ns = settings.DATABASE_REPLICA_PIN_SECONDS * 1e9
+        now = time.time_ns()
+        versions = get_versions(self.get_replica_namespaces())
+        return all(now - version > lag_ns for version in versions.values())
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.use_replica(request):
+            return super().dispatch(request, *args, **kwargs)
+        if self.view_is_async:
+            return self.adispatch_replica(request, *args, **kwargs)
+        with replica_reads():
+            response = super().dispatch(request, *args, **kwargs)
+            # Шаблон рендерится позже, уже вне блока: рендерим здесь
+            if hasattr(response, 'render'):
+                timed_render(response)
+        return response
+
+    async def adispatch_replica(self, request, *args, **kwargs):
+        # ContextVar видна и в потоках sync_to_async, где выполняются запросы
+        with replica_reads():
+            response = await await_response(
+                super().dispatch(request, *args, **kwargs)
+            )
+            if hasattr(response, 'render'):
+                await sync_to_async(timed_render)(response)
+        return response
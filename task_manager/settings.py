@@ -16,6 +16,8 @@ import dj_database_url
 from pathlib import Path
 from dotenv import load_dotenv
 
+from task_manager.caching.config import parse_cache_url
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -63,12 +65,18 @@ INSTALLED_APPS = [
     "task_manager.statuses",
     "task_manager.tasks",
     "task_manager.labels",
+    "task_manager.history",
     "django_filters",
 ]
 
 MIDDLEWARE = [
+    # Первым: id запроса есть у всех записей журнала, в том числе от замера
+    "task_manager.logs.RequestIdMiddleware",
+    # Замер включает остальные middleware
+    "task_manager.metrics.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
+    "task_manager.routers.ReplicaPinningMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
@@ -98,12 +106,43 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "task_manager.wsgi.application"
 
+# Асинхронные варианты страниц чтения (task_manager/asyncviews.py);
+# task_manager/asgi.py включает их по умолчанию
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "False").lower() == "true"
+
 
 # ---------- База данных ----------
 # Используем SQLite для теста, позже можно подключить PostgreSQL
+# Сколько секунд держать соединение открытым между запросами (0 — закрывать)
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", 600))
+# Проверять постоянное соединение перед первым запросом в новом HTTP-запросе
+DB_CONN_HEALTH_CHECKS = os.getenv("DB_CONN_HEALTH_CHECKS", "True").lower() == "true"
+# Пул соединений psycopg (нужен psycopg 3: pip install ".[pool]")
+DB_POOL = os.getenv("DB_POOL", "False").lower() == "true"
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 2))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 10))
+# Сколько секунд ждать свободное соединение из пула
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+
 if os.getenv("DATABASE_URL"):
     # Для Render/Prod с PostgreSQL
-    DATABASES = {"default": dj_database_url.parse(os.getenv("DATABASE_URL"))}
+    DATABASES = {
+        "default": dj_database_url.parse(
+            os.getenv("DATABASE_URL"),
+            conn_max_age=DB_CONN_MAX_AGE,
+            conn_health_checks=DB_CONN_HEALTH_CHECKS,
+        )
+    }
+    if DB_POOL:
+        # Пул сам держит соединения открытыми: Django требует CONN_MAX_AGE = 0.
+        # Проверку соединения при выдаче из пула (check) Django включает
+        # сам по CONN_HEALTH_CHECKS — в опциях пула её задавать нельзя
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+            "min_size": DB_POOL_MIN_SIZE,
+            "max_size": DB_POOL_MAX_SIZE,
+            "timeout": DB_POOL_TIMEOUT,
+        }
 else:
     # Локальная SQLite
     DATABASES = {
@@ -113,6 +152,66 @@ else:
         }
     }
 
+# Реплики только для чтения через запятую: алиасы replica, replica_2, ...
+# Страницы с ReplicaReadMixin читают с них (см. task_manager/routers.py)
+DATABASE_REPLICAS = []
+for _index, _url in enumerate(
+    url.strip()
+    for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+    if url.strip()
+):
+    _alias = "replica" if _index == 0 else f"replica_{_index + 1}"
+    DATABASES[_alias] = dj_database_url.parse(
+        _url,
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=DB_CONN_HEALTH_CHECKS,
+    )
+    # В тестах реплика — та же база, что и основная
+    DATABASES[_alias]["TEST"] = {"MIRROR": "default"}
+    DATABASE_REPLICAS.append(_alias)
+
+# Сколько секунд после записи читать с основной базы (запас на отставание реплик)
+DATABASE_REPLICA_PIN_SECONDS = float(os.getenv("DATABASE_REPLICA_PIN_SECONDS", 5))
+
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ["task_manager.routers.ReplicaRouter"]
+
+# ---------- Кеш ----------
+# Хранилище задаётся строкой CACHE_URL (см. task_manager/caching/config.py).
+# По умолчанию — память процесса с вытеснением давно читанных ключей;
+# при нескольких воркерах нужен общий кеш: redis://, memcached:// или file://.
+CACHE_URL = os.getenv("CACHE_URL", "locmem://")
+
+CACHES = {
+    "default": parse_cache_url(CACHE_URL, "default"),
+    # Отрендеренные строки таблицы задач ({% cache ... using=... %})
+    "template_fragments": parse_cache_url(
+        os.getenv("FRAGMENT_CACHE_URL", CACHE_URL),
+        "template_fragments",
+        KEY_PREFIX="fragments",
+    ),
+}
+
+# Время жизни страниц для анонимных посетителей (AnonymousPageCacheMixin)
+PAGE_CACHE_TIMEOUT = int(os.getenv("PAGE_CACHE_TIMEOUT", 600))
+
+# ---------- Метрики ----------
+# Гистограммы запросов (task_manager/metrics) отдаются на /metrics персоналу
+# или по заголовку "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+# Заголовок Server-Timing с временем базы, шаблона и запроса целиком
+METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "True").lower() == "true"
+# Бюджет запросов представлений (task_manager/metrics/budget.py): off, warn, raise
+QUERY_BUDGET = os.getenv("QUERY_BUDGET", "warn" if DEBUG else "off")
+
+# ---------- История изменений ----------
+# Записи истории пишет фоновый поток пакетами (task_manager/history/writer.py):
+# до HISTORY_BATCH_SIZE записей или раз в HISTORY_FLUSH_SECONDS.
+# С False запись идёт сразу в запросе (тесты, команды manage.py)
+HISTORY_ASYNC = os.getenv("HISTORY_ASYNC", "True").lower() == "true"
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", 200))
+HISTORY_FLUSH_SECONDS = float(os.getenv("HISTORY_FLUSH_SECONDS", 1))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -150,45 +249,73 @@ DJANGO_BOOTSTRAP5 = {
     "javascript_url": "https://stackpath.bootstrapcdn.com/bootstrap/5.0.0-alpha1/js/bootstrap.bundle.min.js",
 }
 
+# Поля формы и фильтра задач, которые вместо полного списка <option>
+# подгружают варианты через JSON-подсказки, например "executor,labels"
+TASK_AUTOCOMPLETE_FIELDS = [
+    name.strip()
+    for name in os.environ.get("TASK_AUTOCOMPLETE_FIELDS", "").split(",")
+    if name.strip()
+]
+
 LOGIN_REDIRECT_URL = "/"
 LOGOUT_REDIRECT_URL = "/"
 LOGIN_URL = "/login/"
 
-#  Логируем ошибки внимание к БД
+#  Журнал: JSON Lines с id запроса и пользователя. Обработчики консоли
+#  и файла работают в потоке QueueListener (task_manager/logs.py),
+#  запрос только ставит запись в очередь.
+LOGGING_CONFIG = "task_manager.logs.configure"
+LOG_FILE = os.getenv("LOG_FILE", BASE_DIR / "user_actions.log")
+LOG_FILE_MAX_BYTES = int(os.getenv("LOG_FILE_MAX_BYTES", 10 * 1024 * 1024))
+LOG_FILE_BACKUP_COUNT = int(os.getenv("LOG_FILE_BACKUP_COUNT", 5))
 
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": {
-        "verbose": {
-            "format": "{levelname} {asctime} {module} {process:d} {thread:d} {message}",
-            "style": "{",
+        "json": {
+            "()": "task_manager.logs.JsonFormatter",
+        },
+    },
+    "filters": {
+        "request_context": {
+            "()": "task_manager.logs.RequestContextFilter",
         },
     },
     "handlers": {
         "console": {
             "level": "DEBUG",
             "class": "logging.StreamHandler",
-            "formatter": "verbose",
+            "formatter": "json",
         },
         "file": {
             "level": "INFO",
-            "class": "logging.FileHandler",
-            "filename": BASE_DIR / "user_actions.log",
-            "formatter": "verbose",
+            "class": "logging.handlers.RotatingFileHandler",
+            "filename": LOG_FILE,
+            "maxBytes": LOG_FILE_MAX_BYTES,
+            "backupCount": LOG_FILE_BACKUP_COUNT,
+            "encoding": "utf-8",
+            "delay": True,
+            "formatter": "json",
         },
+        "queue": {
+            "()": "task_manager.logs.QueueHandler",
+            "targets": ["console", "file"],
+            "filters": ["request_context"],
+        },
+    },
+    "root": {
+        "handlers": ["queue"],
+        "level": "INFO",
     },
     "loggers": {
+        # Записи django уходят в очередь через корневой логгер
         "django": {
-            "handlers": ["console"],
             "level": "INFO",
-            "propagate": True,
         },
-
-        "users": {
-            "handlers": ["file"],
-            "level": "INFO",
-            "propagate": True,
+        # Превышения бюджета запросов (task_manager/metrics/budget.py)
+        "metrics": {
+            "level": "WARNING",
         },
     },
 }
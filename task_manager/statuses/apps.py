@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class StatusesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'task_manager.statuses'
+
+    def ready(self):
+        from task_manager.versioning import track_changes
+        from .models import Status
+
+        track_changes(Status, 'statuses')
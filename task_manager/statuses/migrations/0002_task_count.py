@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:26
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_task_count(apps, schema_editor):
+    Status = apps.get_model('statuses', 'Status')
+    Task = apps.get_model('tasks', 'Task')
+    count = Task.objects.filter(status=OuterRef('pk')).order_by().values(
+        'status'
+    ).annotate(n=Count('*')).values('n')
+    Status.objects.update(task_count=Coalesce(
+        Subquery(count, output_field=IntegerField()), Value(0)
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statuses', '0001_initial'),
+        ('tasks', '0013_task_row_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='status',
+            name='task_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Задач'),
+        ),
+        migrations.RunPython(fill_task_count, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,18 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from task_manager.counters import UsageCountersMixin
+
 
 # Создаем модель Status
-class Status(models.Model):
+class Status(UsageCountersMixin, models.Model):
     name = models.CharField(_("Имя"), max_length=100)
     created_at = models.DateTimeField(_("Дата создания"), auto_now_add=True)
+    # Число задач в статусе; ведётся вместе с задачами (tasks.models)
+    task_count = models.IntegerField(_("Задач"), default=0, editable=False)
+
+    # Связь -> поле-счётчик ссылок для task_manager.deletion
+    usage_counters = {'task_set': 'task_count'}
 
     def __str__(self):
         return self.name
@@ -1,6 +1,8 @@
 from django.urls import path
 
+from task_manager.asyncviews import read_view
 from .views import (
+    AsyncStatusListView,
     StatusListView,
     StatusCreateView,
     StatusUpdateView,
@@ -12,7 +14,7 @@ app_name = "statuses"
 urlpatterns = [
     path(
         "",
-        StatusListView.as_view(),
+        read_view(StatusListView, AsyncStatusListView),
         name="statuses_list"
     ),
     path(
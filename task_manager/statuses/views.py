@@ -7,8 +7,13 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy
 
+from task_manager.asyncviews import AsyncListMixin
+from task_manager.history.mixins import HistoryMixin
+from task_manager.history.models import HistoryEntry
+from task_manager.pagination import KeysetPaginationMixin
+from task_manager.versioning import ConditionalGetMixin
 from .models import Status
-from task_manager.tasks.models import Task
+from task_manager.deletion import delete_if_unused
 from .forms import StatusForm
 
 logger = logging.getLogger("statuses")
@@ -20,21 +25,33 @@ class FormLoggerMixin:
     в CreateView/UpdateView/DeleteView.
     """
 
-    log_message = "Создан объект: {obj}"
+    log_message = "Создан объект: %s"
 
     def form_valid(self, form):
         response = super().form_valid(form)
-        logger.info(self.log_message.format(obj=self.object))
+        logger.info(self.log_message, self.object)
         return response
 
 
 # ---------------------------
 # Список статусов
 # ---------------------------
-class StatusListView(LoginRequiredMixin, ListView):
+class StatusListView(
+    LoginRequiredMixin,
+    ConditionalGetMixin,
+    KeysetPaginationMixin,
+    ListView
+):
     model = Status
+    # Колонка с числом задач меняется вместе с задачами
+    version_namespaces = ('statuses', 'tasks')
     template_name = "statuses/list.html"
     context_object_name = "statuses"
+    query_budget = 3
+
+
+class AsyncStatusListView(AsyncListMixin, StatusListView):
+    pass
 
 
 # ---------------------------
@@ -42,6 +59,7 @@ class StatusListView(LoginRequiredMixin, ListView):
 # ---------------------------
 class StatusCreateView(
     LoginRequiredMixin,
+    HistoryMixin,
     FormLoggerMixin,
     SuccessMessageMixin,
     CreateView
@@ -51,7 +69,7 @@ class StatusCreateView(
     template_name = "statuses/create.html"
     success_url = reverse_lazy("statuses:statuses_list")
     success_message = _("Статус успешно создан")
-    log_message = "Создан статус: {obj}"
+    log_message = "Создан статус: %s"
 
 
 # ---------------------------
@@ -59,6 +77,7 @@ class StatusCreateView(
 # ---------------------------
 class StatusUpdateView(
     LoginRequiredMixin,
+    HistoryMixin,
     FormLoggerMixin,
     SuccessMessageMixin,
     UpdateView
@@ -68,13 +87,18 @@ class StatusUpdateView(
     template_name = "statuses/update.html"
     success_url = reverse_lazy("statuses:statuses_list")
     success_message = _("Статус успешно изменен")
-    log_message = "Статус обновлён: {obj}"
+    log_message = "Статус обновлён: %s"
 
 
 # ---------------------------
 # Удаление статуса
 # ---------------------------
-class StatusDeleteView(SuccessMessageMixin, LoginRequiredMixin, DeleteView):
+class StatusDeleteView(
+    SuccessMessageMixin,
+    LoginRequiredMixin,
+    HistoryMixin,
+    DeleteView
+):
     model = Status
     template_name = "statuses/delete.html"
     success_url = reverse_lazy("statuses:statuses_list")
@@ -84,17 +108,21 @@ class StatusDeleteView(SuccessMessageMixin, LoginRequiredMixin, DeleteView):
         self.object = self.get_object()
         status_id = self.object.id
 
-        if Task.objects.filter(status=self.object).exists():
+        used = delete_if_unused(self.object)
+        if used:
             messages.error(
                 request,
                 _("Невозможно удалить статус, потому что он используется")
             )
             logger.warning(
-                f"Попытка удалить статус {status_id}, который используется"
+                "Попытка удалить статус %s, который используется: %s",
+                status_id, used,
             )
             return redirect("statuses:statuses_list")
 
-        response = super().delete(request, *args, **kwargs)
+        self.record_history(
+            HistoryEntry.Action.DELETE, self.object, object_id=status_id
+        )
         messages.success(request, self.success_message)
-        logger.info(f"Статус {status_id} удален")
-        return response
+        logger.info("Статус %s удален", status_id)
+        return redirect(self.get_success_url())
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.admin import DateFieldListFilter, RelatedOnlyFieldListFilter
 
-from .models import Task
+from .models import Task, TaskCounter
 
 
 @admin.register(Task)
@@ -14,9 +14,14 @@ class TaskAdmin(admin.ModelAdmin):
         'status',
         'created_at',
     )
-    search_fields = ['name', 'body']
+    search_fields = ['name', 'description']
     list_filter = (
         ('created_at', DateFieldListFilter),
         ('executor', RelatedOnlyFieldListFilter),
         ('author', RelatedOnlyFieldListFilter),
     )
+
+    def delete_queryset(self, request, queryset):
+        # Массовое удаление обходит Task.delete(), счётчики — вручную
+        with TaskCounter.objects.track(queryset):
+            super().delete_queryset(request, queryset)
@@ -4,3 +4,21 @@ from django.apps import AppConfig
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'task_manager.tasks'
+
+    def ready(self):
+        from django.contrib.auth.models import User
+        from django.db.models.signals import m2m_changed, post_save, pre_save
+
+        from task_manager.statuses.models import Status
+        from task_manager.versioning import track_changes
+        from . import signals
+        from .models import Task
+
+        track_changes(Task, 'tasks')
+        pre_save.connect(signals.check_status_change, sender=Status)
+        post_save.connect(signals.touch_status_tasks, sender=Status)
+        pre_save.connect(signals.check_user_change, sender=User)
+        post_save.connect(signals.touch_user_tasks, sender=User)
+        m2m_changed.connect(
+            signals.count_label_tasks, sender=Task.labels.through
+        )
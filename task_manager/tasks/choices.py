@@ -0,0 +1,99 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.versioning import get_version
+
+# Время жизни списка; актуальность обеспечивает версия, а не таймаут
+CHOICES_TIMEOUT = 60 * 60 * 24
+
+
+def _rows(model, fields, pks=None):
+    queryset = model.objects.order_by('pk')
+    if pks is not None:
+        queryset = queryset.filter(pk__in=pks)
+    return queryset.values_list('pk', *fields)
+
+
+def _statuses(pks=None):
+    return list(_rows(Status, ['name'], pks))
+
+
+def _labels(pks=None):
+    return list(_rows(Label, ['name'], pks))
+
+
+def _executors(pks=None):
+    # То же, что User.get_full_name(), но без загрузки моделей целиком
+    return [
+        (pk, f"{first_name} {last_name}".strip())
+        for pk, first_name, last_name in _rows(
+            User, ['first_name', 'last_name'], pks
+        )
+    ]
+
+
+# источник -> (загрузчик, namespace версии)
+CHOICE_SOURCES = {
+    'statuses': (_statuses, 'statuses'),
+    'labels': (_labels, 'labels'),
+    'executors': (_executors, 'users'),
+}
+
+# источник -> url JSON-подсказок
+AUTOCOMPLETE_URLS = {
+    'labels': 'tasks:autocomplete_labels',
+    'executors': 'tasks:autocomplete_executors',
+}
+
+
+def get_choices(source):
+    """
+    Список (pk, подпись) для выпадающего списка.
+    Ключ кеша содержит версию таблицы, поэтому после изменения
+    статуса, метки или пользователя старый список просто не читается.
+    """
+    loader, namespace = CHOICE_SOURCES[source]
+    key = f"choices:{source}:{get_version(namespace)}"
+    choices = cache.get(key)
+    if choices is None:
+        choices = loader()
+        cache.set(key, choices, CHOICES_TIMEOUT)
+    return choices
+
+
+def _selected_pks(bound_field):
+    value = bound_field.value()
+    if not isinstance(value, (list, tuple)):
+        value = [value]
+    # Мусор из GET/POST отбрасываем: его всё равно не пропустит валидация
+    return [pk for pk in value if str(pk).isdigit()]
+
+
+def apply_cached_choices(form, sources):
+    """
+    Подставляет варианты в виджеты полей формы.
+
+    Обычно это закешированный список целиком. Для полей из
+    settings.TASK_AUTOCOMPLETE_FIELDS рендерятся только выбранные значения,
+    а остальные подгружает скрипт tasks/autocomplete.html.
+    Queryset поля не меняется и при валидации проверяет
+    только присланные pk.
+    """
+    for name, source in sources.items():
+        field = form.fields[name]
+        if name in settings.TASK_AUTOCOMPLETE_FIELDS and source in AUTOCOMPLETE_URLS:
+            loader, _namespace = CHOICE_SOURCES[source]
+            pks = _selected_pks(form[name])
+            choices = loader(pks) if pks else []
+            field.widget.attrs['data-autocomplete-url'] = reverse(
+                AUTOCOMPLETE_URLS[source]
+            )
+        else:
+            choices = list(get_choices(source))
+        if getattr(field, 'empty_label', None) is not None:
+            choices.insert(0, ('', field.empty_label))
+        field.widget.choices = choices
@@ -0,0 +1,211 @@
+"""
+Синтетические данные для замеров: пользователи, статусы, метки и задачи.
+
+Данные дополняются до заданного объёма: повторный запуск с теми же
+параметрами ничего не создаёт, с большими — досоздаёт недостающее.
+Одинаковые параметры и seed на пустой базе дают одинаковые данные.
+
+Распределения приближены к рабочей базе: исполнители, авторы, статусы
+и метки выбираются по закону Ципфа (несколько «популярных» получают
+большую часть задач), у задачи в среднем три метки, длина описания —
+с длинным хвостом.
+
+Задачи пишутся пакетами через bulk_create, связи с метками — одним
+executemany на пакет, в обход ORM. Счётчики (TaskCounter, task_count)
+не сдвигаются на каждый пакет, а пересчитываются один раз в конце.
+"""
+import random
+from collections import Counter
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+
+from task_manager.deletion import reference_counts
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.versioning import mark_changed
+
+from .models import Task, TaskCounter, adjust_task_counts, count_task_rows
+
+PREFIX = 'bench'
+# Пароль всех созданных пользователей
+PASSWORD = 'bench-password'  # NOSONAR
+
+WORDS = (
+    'отчёт', 'сервер', 'релиз', 'клиент', 'база', 'страница', 'ошибка',
+    'договор', 'дизайн', 'тест', 'миграция', 'счёт', 'встреча', 'план',
+    'документация', 'интеграция', 'оплата', 'доступ', 'резервная', 'копия',
+    'настройка', 'обновление', 'проверка', 'заказ', 'поставщик', 'склад',
+    'отпуск', 'бюджет', 'презентация', 'аналитика', 'уведомление', 'почта',
+)
+
+# Доля задач без исполнителя
+UNASSIGNED = 0.2
+# Показатели закона Ципфа: чем больше, тем сильнее перекос
+EXECUTOR_SKEW = 1.2
+AUTHOR_SKEW = 0.8
+STATUS_SKEW = 1.0
+LABEL_SKEW = 1.1
+# Среднее и наибольшее число меток у задачи
+LABELS_MEAN = 3
+LABELS_MAX = 10
+# Описание: 20 слов и больше, хвост до DESCRIPTION_MAX_WORDS
+DESCRIPTION_MIN_WORDS = 20
+DESCRIPTION_MAX_WORDS = 600
+
+
+def zipf_picker(rng, values, skew):
+    """Выбор из values с весом 1 / rank ** skew."""
+    cum_weights = list(accumulate(
+        1 / rank ** skew for rank in range(1, len(values) + 1)
+    ))
+    return lambda k=1: rng.choices(values, cum_weights=cum_weights, k=k)
+
+
+def _ensure(model, field, names, build, batch_size):
+    """pk объектов с именами names в том же порядке; недостающие создаются."""
+    existing = dict(model.objects.filter(
+        **{f'{field}__in': names}
+    ).values_list(field, 'pk'))
+    missing = [build(name) for name in names if name not in existing]
+    if missing:
+        model.objects.bulk_create(missing, batch_size=batch_size)
+        existing = dict(model.objects.filter(
+            **{f'{field}__in': names}
+        ).values_list(field, 'pk'))
+    return [existing[name] for name in names]
+
+
+def ensure_users(count, batch_size=1000):
+    # Хеш пароля считается один раз: PBKDF2 на каждого занял бы минуты
+    password = make_password(PASSWORD)
+    return _ensure(
+        User,
+        'username',
+        [f'{PREFIX}_user_{i}' for i in range(count)],
+        lambda name: User(username=name, first_name=name, password=password),
+        batch_size,
+    )
+
+
+def ensure_named(model, kind, count, batch_size=1000):
+    return _ensure(
+        model,
+        'name',
+        [f'{PREFIX}-{kind}-{i}' for i in range(count)],
+        lambda name: model(name=name),
+        batch_size,
+    )
+
+
+def generate_dataset(tasks, users, statuses, labels, seed=0, batch_size=5000,
+                     progress=None):
+    """
+    Дополняет базу до tasks задач; справочники создаются с префиксом
+    PREFIX. Возвращает число созданных задач.
+    progress(done, total) вызывается после каждого пакета.
+    """
+    rng = random.Random(seed)
+    user_ids = ensure_users(users)
+    status_ids = ensure_named(Status, 'status', statuses)
+    label_ids = ensure_named(Label, 'label', labels)
+    for namespace in ('users', 'statuses', 'labels'):
+        mark_changed(namespace)
+
+    pick_author = zipf_picker(rng, user_ids, AUTHOR_SKEW)
+    pick_executor = zipf_picker(rng, user_ids, EXECUTOR_SKEW)
+    pick_status = zipf_picker(rng, status_ids, STATUS_SKEW)
+    pick_labels = zipf_picker(rng, label_ids, LABEL_SKEW)
+
+    def description():
+        words = DESCRIPTION_MIN_WORDS * rng.paretovariate(1.5)
+        words = min(int(words), DESCRIPTION_MAX_WORDS)
+        return ' '.join(rng.choices(WORDS, k=words)).capitalize() + '.'
+
+    def task_labels():
+        n = min(round(rng.expovariate(1 / LABELS_MEAN)), LABELS_MAX)
+        # Повторы отбрасываются: популярные метки выпадают чаще
+        return list(dict.fromkeys(pick_labels(n))) if n else []
+
+    start = Task.objects.count()
+    total = max(0, tasks - start)
+    created = 0
+    while created < total:
+        size = min(batch_size, total - created)
+        rows = []
+        links = []
+        for i in range(start + created, start + created + size):
+            rows.append(Task(
+                name=f'{rng.choice(WORDS)} {i}'.capitalize(),
+                description=description(),
+                status_id=pick_status()[0],
+                author_id=pick_author()[0],
+                executor_id=(
+                    None if rng.random() < UNASSIGNED else pick_executor()[0]
+                ),
+            ))
+            links.append(task_labels())
+        with transaction.atomic():
+            # PostgreSQL и SQLite >= 3.35 возвращают id созданных строк
+            Task.objects.bulk_create(rows)
+            insert_links(
+                (task.pk, label_id)
+                for task, ids in zip(rows, links)
+                for label_id in ids
+            )
+        created += size
+        if progress:
+            progress(created, total)
+
+    if created:
+        recount_task_counts()
+        mark_changed('tasks')
+    return created
+
+
+def insert_links(pairs):
+    """Строки таблицы задача–метка (task_id, label_id) одним executemany."""
+    Through = Task.labels.through
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}, {}) VALUES (%s, %s)'.format(
+        quote(Through._meta.db_table),
+        quote(Through._meta.get_field('task').column),
+        quote(Through._meta.get_field('label').column),
+    )
+    pairs = list(pairs)
+    if pairs:
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, pairs)
+
+
+def recount_task_counts():
+    """task_count статусов и меток и TaskCounter — по таблице задач."""
+    with transaction.atomic():
+        for model in (Status, Label):
+            exact = reference_counts(model, exact=True)
+            model.objects.update(**{
+                field: exact[relation]
+                for relation, field in model.usage_counters.items()
+            })
+        TaskCounter.objects.rebuild()
+
+
+def create_batch(tasks, task_labels):
+    """
+    Небольшой пакет задач с точным обновлением счётчиков,
+    как при импорте: для данных, которые создаются на ходу.
+    """
+    with transaction.atomic():
+        Task.objects.bulk_create(tasks)
+        insert_links(
+            (task.pk, label_id)
+            for task, ids in zip(tasks, task_labels)
+            for label_id in ids
+        )
+        count_task_rows(added=[task.counter_row() for task in tasks])
+        adjust_task_counts(Label, Counter(
+            label_id for ids in task_labels for label_id in ids
+        ))
+        mark_changed('tasks')
@@ -0,0 +1,92 @@
+"""
+Построчная выгрузка задач в CSV и JSON Lines.
+
+Генераторы отдают строку за строкой, поэтому выгрузку можно передать
+в StreamingHttpResponse: память не зависит от числа задач.
+Асинхронные варианты читают строки из async-итератора (aiterator()).
+Тот же формат читает команда import_tasks.
+"""
+import csv
+import json
+
+
+COLUMNS = (
+    'id',
+    'name',
+    'description',
+    'status',
+    'author',
+    'executor',
+    'labels',
+    'created_at',
+)
+
+# Разделитель меток в одной ячейке CSV
+LABELS_SEPARATOR = ';'
+
+
+def task_to_row(task):
+    """Задача с подгруженными связями (Task.objects.with_related())."""
+    return {
+        'id': task.id,
+        'name': task.name,
+        'description': task.description,
+        'status': task.status.name,
+        'author': task.author.username,
+        'executor': task.executor.username if task.executor else '',
+        'labels': [label.name for label in task.labels.all()],
+        'created_at': task.created_at.isoformat(),
+    }
+
+
+class _Echo:
+    """Псевдофайл для csv.writer: возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_line(writer, row):
+    row = dict(row, labels=LABELS_SEPARATOR.join(row['labels']))
+    return writer.writerow([row[column] for column in COLUMNS])
+
+
+def _jsonl_line(row):
+    return json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COLUMNS)
+    for row in rows:
+        yield _csv_line(writer, row)
+
+
+def stream_jsonl(rows):
+    for row in rows:
+        yield _jsonl_line(row)
+
+
+async def astream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COLUMNS)
+    async for row in rows:
+        yield _csv_line(writer, row)
+
+
+async def astream_jsonl(rows):
+    async for row in rows:
+        yield _jsonl_line(row)
+
+
+# формат -> (генератор, content type)
+FORMATS = {
+    'csv': (stream_csv, 'text/csv; charset=utf-8'),
+    'jsonl': (stream_jsonl, 'application/jsonl; charset=utf-8'),
+}
+
+# формат -> генератор для асинхронного итератора строк (под ASGI)
+ASYNC_STREAMS = {
+    'csv': astream_csv,
+    'jsonl': astream_jsonl,
+}
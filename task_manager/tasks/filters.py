@@ -3,7 +3,10 @@ from django import forms
 from django.contrib.auth.models import User
 from django.utils.translation import gettext_lazy as _
 
+from .choices import apply_cached_choices
+from .forms import CHOICE_FIELDS
 from .models import Task
+from .search import search_tasks
 from task_manager.statuses.models import Status
 from task_manager.labels.models import Label
 
@@ -31,6 +34,11 @@ class TaskFilter(django_filters.FilterSet):
         widget=forms.CheckboxInput()
     )
 
+    q = django_filters.CharFilter(
+        label=_('Поиск'),
+        method='search_filter',
+    )
+
     def own_tasks_filter(self, queryset, name, value):
         """
         Фильтрует задачи, 
@@ -40,12 +48,21 @@ class TaskFilter(django_filters.FilterSet):
             return queryset.filter(author=self.request.user)
         return queryset
 
+    def search_filter(self, queryset, name, value):
+        """
+        Полнотекстовый поиск по имени и описанию,
+        аннотирует search_rank для сортировки по релевантности.
+        """
+        return search_tasks(queryset, value)
+
     class Meta:
         model = Task
-        fields = ['status', 'executor', 'labels', 'own_task']
+        fields = ['status', 'executor', 'labels', 'own_task', 'q']
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.filters['executor'].field.label_from_instance = (
-            lambda obj: obj.get_full_name()
-        )
+    @property
+    def form(self):
+        if not hasattr(self, '_form'):
+            # Поля формы копируются при её создании,
+            # поэтому варианты подставляем в уже готовую форму
+            apply_cached_choices(super().form, CHOICE_FIELDS)
+        return self._form
@@ -1,9 +1,20 @@
 from django import forms
-
-from .models import Task
 from django.contrib.auth.models import User
-from task_manager.statuses.models import Status
+from django.utils.translation import gettext_lazy as _
+
 from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+
+from .choices import apply_cached_choices
+from .models import Task
+
+
+# поле формы -> источник закешированных вариантов
+CHOICE_FIELDS = {
+    'status': 'statuses',
+    'executor': 'executors',
+    'labels': 'labels',
+}
 
 
 class TaskForm(forms.ModelForm):
@@ -13,11 +24,77 @@ class TaskForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Querysets
-        self.fields['executor'].queryset = User.objects.all()
-        self.fields['status'].queryset = Status.objects.all()
-        self.fields['labels'].queryset = Label.objects.all()
-        # label для select по исполнителю
-        self.fields['executor'].label_from_instance = (
-            lambda obj: obj.get_full_name()
-        )
+        # Варианты для select берём из кеша, а не из Status/User/Label
+        apply_cached_choices(self, CHOICE_FIELDS)
+
+
+class TaskIdsField(forms.MultipleChoiceField):
+    """
+    Список id задач из чекбоксов списка.
+    Существование не проверяется: массовые действия работают
+    одним UPDATE/DELETE ... WHERE id IN (...) и просто пропускают чужие id.
+    """
+
+    widget = forms.MultipleHiddenInput
+
+    def valid_value(self, value):
+        return str(value).isdigit()
+
+    def clean(self, value):
+        return [int(pk) for pk in super().clean(value)]
+
+
+class TaskBulkForm(forms.Form):
+    SET_STATUS = 'set_status'
+    SET_EXECUTOR = 'set_executor'
+    ADD_LABEL = 'add_label'
+    REMOVE_LABEL = 'remove_label'
+    DELETE = 'delete'
+
+    ACTIONS = [
+        (SET_STATUS, _("Сменить статус")),
+        (SET_EXECUTOR, _("Назначить исполнителя")),
+        (ADD_LABEL, _("Добавить метку")),
+        (REMOVE_LABEL, _("Снять метку")),
+        (DELETE, _("Удалить свои задачи")),
+    ]
+
+    # действие -> обязательное поле
+    REQUIRED_FIELDS = {
+        SET_STATUS: 'status',
+        ADD_LABEL: 'label',
+        REMOVE_LABEL: 'label',
+    }
+
+    tasks = TaskIdsField()
+    action = forms.ChoiceField(label=_("Действие"), choices=ACTIONS)
+    status = forms.ModelChoiceField(
+        label=_("Статус"),
+        queryset=Status.objects.all(),
+        required=False,
+    )
+    executor = forms.ModelChoiceField(
+        label=_("Исполнитель"),
+        queryset=User.objects.all(),
+        required=False,
+    )
+    label = forms.ModelChoiceField(
+        label=_("Метка"),
+        queryset=Label.objects.all(),
+        required=False,
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        apply_cached_choices(self, {
+            'status': 'statuses',
+            'executor': 'executors',
+            'label': 'labels',
+        })
+
+    def clean(self):
+        cleaned_data = super().clean()
+        field = self.REQUIRED_FIELDS.get(cleaned_data.get('action'))
+        if field and not cleaned_data.get(field):
+            self.add_error(field, _("Обязательное поле."))
+        return cleaned_data
@@ -0,0 +1,132 @@
+import re
+from itertools import combinations
+from types import SimpleNamespace
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.filters import TaskFilter
+from task_manager.tasks.models import Task
+
+
+FILTER_NAMES = ('status', 'executor', 'labels', 'own_task')
+
+# Признаки использования индекса и полного просмотра таблицы в плане
+PLAN_PATTERNS = {
+    'sqlite': {
+        'index': re.compile(r'USING (?:COVERING )?INDEX (\w+)'),
+        'scan': re.compile(r'SCAN (?:TABLE )?(\w+)\b(?! USING)'),
+    },
+    'postgresql': {
+        'index': re.compile(r'(?:Index Scan|Index Only Scan) using (\w+)'
+                            r'|Bitmap Index Scan on (\w+)'),
+        'scan': re.compile(r'Seq Scan on (\w+)'),
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Выполняет EXPLAIN для каждой комбинации фильтров TaskFilter "
+        "и сообщает, используется ли индекс."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help="Алиас базы данных.",
+        )
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help="Обновить статистику планировщика (ANALYZE) перед проверкой.",
+        )
+        parser.add_argument(
+            '--show-plan',
+            action='store_true',
+            help="Печатать полный план запроса.",
+        )
+        parser.add_argument(
+            '--fail-on-scan',
+            action='store_true',
+            help="Завершиться с ошибкой, если хотя бы одна комбинация "
+                 "читает таблицу задач полным просмотром.",
+        )
+
+    def handle(self, *args, **options):
+        database = options['database']
+        vendor = connections[database].vendor
+        patterns = PLAN_PATTERNS.get(vendor)
+        if patterns is None:
+            raise CommandError(f"СУБД {vendor} не поддерживается")
+
+        if options['analyze']:
+            with connections[database].cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        data, author = self.sample_data(database)
+        request = SimpleNamespace(user=author)
+        scans = []
+
+        for size in range(len(data) + 1):
+            for names in combinations(data, size):
+                filterset = TaskFilter(
+                    {name: data[name] for name in names},
+                    queryset=Task.objects.using(database),
+                    request=request,
+                )
+                if not filterset.is_valid():
+                    raise CommandError(
+                        f"Некорректные значения фильтра: {filterset.errors}"
+                    )
+                queryset = filterset.qs.order_by('created_at', 'id')[:50]
+                plan = queryset.explain()
+
+                indexes = sorted({
+                    name
+                    for match in patterns['index'].findall(plan)
+                    for name in (match if isinstance(match, tuple) else (match,))
+                    if name
+                })
+                full_scan = Task._meta.db_table in patterns['scan'].findall(plan)
+                title = '+'.join(names) or 'без фильтров'
+
+                if full_scan:
+                    scans.append(title)
+                    verdict = self.style.WARNING("полный просмотр tasks_task")
+                else:
+                    verdict = self.style.SUCCESS("индекс")
+                self.stdout.write(
+                    f"{title}: {verdict}"
+                    f" ({', '.join(indexes) or 'индексы не используются'})"
+                )
+                if options['show_plan']:
+                    self.stdout.write(plan)
+
+        if scans and options['fail_on_scan']:
+            raise CommandError(
+                f"Без индекса выполняются: {', '.join(scans)}"
+            )
+
+    def sample_data(self, database):
+        """
+        Берёт существующие значения для каждого фильтра:
+        ModelChoiceFilter не пропустит несуществующий id.
+        """
+        status = Status.objects.using(database).first()
+        executor = User.objects.using(database).first()
+        label = Label.objects.using(database).first()
+        if status is None or executor is None:
+            raise CommandError(
+                "Нужны хотя бы один статус и один пользователь"
+            )
+
+        data = {'status': status.pk, 'executor': executor.pk}
+        if label is not None:
+            data['labels'] = label.pk
+        data['own_task'] = 'on'
+        return {name: data[name] for name in FILTER_NAMES if name in data}, executor
@@ -0,0 +1,226 @@
+import csv
+import json
+import time
+from collections import Counter
+from itertools import islice
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.export import LABELS_SEPARATOR
+from task_manager.tasks.models import (
+    Task,
+    adjust_task_counts,
+    count_task_rows,
+)
+from task_manager.versioning import mark_changed
+
+
+class Command(BaseCommand):
+    help = (
+        "Импортирует задачи из CSV или JSON Lines (формат выгрузки "
+        "/tasks/export/) пакетами через bulk_create. "
+        "После сбоя повторный запуск продолжает с последнего пакета."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Файл .csv или .jsonl")
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'jsonl'],
+            help="Формат файла; по умолчанию определяется по расширению.",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help="Число задач в одной транзакции.",
+        )
+        parser.add_argument(
+            '--author',
+            help="Имя пользователя-автора для строк без колонки author.",
+        )
+        parser.add_argument(
+            '--create-missing',
+            action='store_true',
+            help="Создавать отсутствующие статусы и метки.",
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help="Файл прогресса; по умолчанию <path>.checkpoint.",
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help="Игнорировать сохранённый прогресс и начать сначала.",
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f"Файл {path} не найден")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size должен быть больше нуля")
+
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in ('csv', 'jsonl'):
+            raise CommandError("Укажите --format csv или --format jsonl")
+
+        checkpoint = Path(options['checkpoint'] or f"{path}.checkpoint")
+        done = 0 if options['restart'] else self.read_checkpoint(checkpoint)
+        if done:
+            self.stdout.write(f"Продолжаем после строки {done}")
+
+        self.create_missing = options['create_missing']
+        self.default_author = options['author']
+        self.load_lookups()
+
+        started = time.monotonic()
+        imported = 0
+        with path.open(encoding='utf-8', newline='') as source:
+            rows = self.read_rows(source, file_format)
+            rows = islice(rows, done, None)
+            while True:
+                batch = list(islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                batch_started = time.monotonic()
+                self.import_batch(batch, first_line=done + 1)
+                done += len(batch)
+                imported += len(batch)
+                self.write_checkpoint(checkpoint, done)
+                if options['verbosity'] >= 2:
+                    elapsed = time.monotonic() - batch_started
+                    self.stdout.write(
+                        f"{done} строк, пакет {len(batch)} за {elapsed:.2f} с"
+                    )
+
+        checkpoint.unlink(missing_ok=True)
+        elapsed = time.monotonic() - started
+        rate = imported / elapsed if elapsed else imported
+        self.stdout.write(self.style.SUCCESS(
+            f"Импортировано задач: {imported} за {elapsed:.2f} с "
+            f"({rate:.0f} строк/с)"
+        ))
+
+    # ---------------------------
+    # Чтение файла
+    # ---------------------------
+    def read_rows(self, source, file_format):
+        """Отдаёт строки в едином виде: метки всегда списком."""
+        if file_format == 'csv':
+            for row in csv.DictReader(source):
+                labels = row.get('labels') or ''
+                row['labels'] = [
+                    name for name in labels.split(LABELS_SEPARATOR) if name
+                ]
+                yield row
+        else:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+
+    # ---------------------------
+    # Справочники в памяти: имя -> pk
+    # ---------------------------
+    def load_lookups(self):
+        self.statuses = dict(Status.objects.values_list('name', 'pk'))
+        self.labels = dict(Label.objects.values_list('name', 'pk'))
+        self.users = dict(User.objects.values_list('username', 'pk'))
+
+    def resolve(self, lookup, name, line, what, model=None):
+        """
+        Ищет pk по имени; с --create-missing создаёт статус или метку.
+        Пользователей не создаём никогда.
+        """
+        if name in lookup:
+            return lookup[name]
+        if not (self.create_missing and model and name):
+            raise CommandError(f"Строка {line}: не найдено: {what} «{name}»")
+        lookup[name] = model.objects.create(name=name).pk
+        return lookup[name]
+
+    def build_task(self, row, line):
+        name = (row.get('name') or '').strip()
+        if not name:
+            raise CommandError(f"Строка {line}: пустое имя задачи")
+        if len(name) > Task._meta.get_field('name').max_length:
+            raise CommandError(f"Строка {line}: слишком длинное имя задачи")
+
+        author = row.get('author') or self.default_author
+        if not author:
+            raise CommandError(f"Строка {line}: не указан автор (--author)")
+        executor = row.get('executor')
+        return Task(
+            name=name,
+            description=row.get('description') or '',
+            status_id=self.resolve(
+                self.statuses, row.get('status'), line, "статус", Status
+            ),
+            author_id=self.resolve(self.users, author, line, "пользователь"),
+            executor_id=(
+                self.resolve(self.users, executor, line, "пользователь")
+                if executor else None
+            ),
+        )
+
+    # ---------------------------
+    # Запись пакета
+    # ---------------------------
+    def import_batch(self, batch, first_line):
+        # Статусы и метки с --create-missing создаются в транзакции пакета:
+        # если строка пакета ошибочна, они откатываются вместе с задачами
+        lookups = dict(self.statuses), dict(self.labels)
+        try:
+            with transaction.atomic():
+                self.write_batch(batch, first_line)
+        except Exception:
+            # pk откаченных строк не должны остаться в справочниках
+            self.statuses, self.labels = lookups
+            raise
+
+    def write_batch(self, batch, first_line):
+        tasks = []
+        label_ids = []
+        for line, row in enumerate(batch, start=first_line):
+            tasks.append(self.build_task(row, line))
+            label_ids.append([
+                self.resolve(self.labels, name, line, "метка", Label)
+                for name in row.get('labels') or []
+            ])
+
+        Through = Task.labels.through
+        # PostgreSQL и SQLite >= 3.35 возвращают id созданных строк
+        Task.objects.bulk_create(tasks)
+        Through.objects.bulk_create([
+            Through(task_id=task.pk, label_id=label_id)
+            for task, ids in zip(tasks, label_ids)
+            for label_id in dict.fromkeys(ids)
+        ])
+        count_task_rows(added=[task.counter_row() for task in tasks])
+        adjust_task_counts(Label, Counter(
+            label_id for ids in label_ids for label_id in set(ids)
+        ))
+        mark_changed('tasks')
+
+    # ---------------------------
+    # Прогресс между запусками
+    # ---------------------------
+    def read_checkpoint(self, checkpoint):
+        if not checkpoint.exists():
+            return 0
+        try:
+            return int(json.loads(checkpoint.read_text())['rows'])
+        except (ValueError, KeyError, TypeError):
+            raise CommandError(
+                f"Повреждён файл прогресса {checkpoint}, запустите с --restart"
+            )
+
+    def write_checkpoint(self, checkpoint, rows):
+        # Прогресс пишется после коммита пакета: при сбое между коммитом
+        # и записью файла последний пакет будет импортирован повторно
+        checkpoint.write_text(json.dumps({'rows': rows}))
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from task_manager.deletion import reference_counts
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import TaskCounter
+from task_manager.versioning import mark_changed
+
+
+# Модели с денормализованным числом задач и namespace их версий
+COUNTED_MODELS = (
+    (Status, 'statuses'),
+    (Label, 'labels'),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает task_count статусов и меток и счётчики TaskCounter "
+        "по таблице задач. Каждый счётчик — один UPDATE с подзапросом."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Только показать число расхождений, ничего не менять.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            for model, namespace in COUNTED_MODELS:
+                self.repair(model, namespace, options['dry_run'])
+            if not options['dry_run']:
+                TaskCounter.objects.rebuild()
+                self.stdout.write("Счётчики TaskCounter пересчитаны")
+
+    def repair(self, model, namespace, dry_run):
+        exact = reference_counts(model, exact=True)
+        queryset = model.objects.all()
+        for relation, field in model.usage_counters.items():
+            drifted = queryset.alias(actual=exact[relation]).exclude(
+                **{field: F('actual')}
+            ).count()
+            self.stdout.write(
+                f"{model._meta.label}.{field}: расхождений {drifted}"
+            )
+            if drifted and not dry_run:
+                queryset.update(**{field: exact[relation]})
+                mark_changed(namespace)
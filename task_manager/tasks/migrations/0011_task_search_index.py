@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from task_manager.tasks.search import install_search_index, remove_search_index
+
+
+def create_search_index(apps, schema_editor):
+    install_search_index(schema_editor, apps.get_model('tasks', 'Task'))
+
+
+def drop_search_index(apps, schema_editor):
+    remove_search_index(schema_editor, apps.get_model('tasks', 'Task'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_task_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
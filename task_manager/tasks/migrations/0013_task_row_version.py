@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:09
+
+import task_manager.tasks.models
+from django.db import migrations, models
+
+from task_manager.tasks.search import install_search_index
+
+
+def restore_search_index(apps, schema_editor):
+    # SQLite добавляет столбец пересозданием таблицы, а вместе
+    # со старой таблицей удаляются триггеры полнотекстового индекса
+    if schema_editor.connection.vendor == 'sqlite':
+        install_search_index(schema_editor, apps.get_model('tasks', 'Task'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0012_task_counter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='row_version',
+            field=models.BigIntegerField(default=task_manager.tasks.models.next_row_version, editable=False),
+        ),
+        migrations.RunPython(restore_search_index, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,40 @@
-from django.db import models
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.db import models, transaction
+from django.db.models import Count, F
 from django.contrib.auth.models import User
 from django.utils.translation import gettext_lazy as _
 from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+
+
+def next_row_version():
+    # Метка времени в наносекундах, как версии в task_manager.versioning:
+    # новое значение не требует чтения старого
+    return time.time_ns()
+
+
+class TaskQuerySet(models.QuerySet):
+
+    def with_related(self):
+        """
+        Проекция для списка и карточки задачи: статус, автор и исполнитель
+        подтягиваются одним JOIN, метки — одним дополнительным запросом,
+        поэтому число запросов не зависит от количества задач.
+        """
+        return self.select_related(
+            'status', 'author', 'executor'
+        ).prefetch_related('labels')
+
+    def deletable_by(self, user):
+        """Задачу может удалить только её автор."""
+        return self.filter(author=user)
+
+    def touch(self):
+        """Новая версия строк для массовых изменений в обход save()."""
+        return self.update(row_version=next_row_version())
 
 
 class Task(models.Model):
@@ -41,6 +74,296 @@ class Task(models.Model):
         verbose_name=_("Дата создания"),
         auto_now_add=True
     )
+    # Меняется при каждом сохранении задачи и при переименовании
+    # её статуса, автора или исполнителя; входит в ключ кеша строки списка
+    row_version = models.BigIntegerField(
+        default=next_row_version,
+        editable=False,
+    )
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        # Индексы повторяют пути доступа TaskFilter: фильтр по одной связи
+        # плюс курсорная сортировка по (created_at, id) из пагинации.
+        indexes = [
+            models.Index(
+                fields=['created_at', 'id'],
+                name='task_created_idx',
+            ),
+            models.Index(
+                fields=['status', 'created_at', 'id'],
+                name='task_status_created_idx',
+            ),
+            models.Index(
+                fields=['executor', 'created_at', 'id'],
+                name='task_executor_created_idx',
+            ),
+            models.Index(
+                fields=['author', 'created_at', 'id'],
+                name='task_author_created_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not update_fields:
+            return super().save(*args, **kwargs)
+        self.row_version = next_row_version()
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'row_version'}
+        if update_fields is not None and not (
+            COUNTED_FIELDS & {
+                self._meta.get_field(name).attname for name in update_fields
+            }
+        ):
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            removed = self._stored_rows() if self.pk is not None else []
+            super().save(*args, **kwargs)
+            count_task_rows(removed=removed, added=[self.counter_row()])
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            removed = self._stored_rows()
+            # Строки связи с метками удаляются каскадом без m2m_changed
+            labels = Counter(Task.labels.through.objects.filter(
+                task_id=self.pk
+            ).values_list('label_id', flat=True))
+            result = super().delete(*args, **kwargs)
+            count_task_rows(removed=removed)
+            adjust_task_counts(Label, {pk: -n for pk, n in labels.items()})
+        return result
+
+    def counter_row(self):
+        return self.author_id, self.executor_id, self.status_id, 1
+
+    def _stored_rows(self):
+        # Берём значения из базы, а не из экземпляра: поля могли
+        # изменить в памяти. Строка блокируется до конца транзакции.
+        return [
+            (*values, 1) for values in Task.objects.filter(
+                pk=self.pk
+            ).select_for_update().values_list(*COUNTED_FIELDS_ORDER)
+        ]
+
+    def is_deletable_by(self, user):
+        return self.author_id == user.pk
+
+
+# Поля задачи, от которых зависят счётчики TaskCounter и Status.task_count
+COUNTED_FIELDS_ORDER = ('author_id', 'executor_id', 'status_id')
+COUNTED_FIELDS = frozenset(COUNTED_FIELDS_ORDER)
+
+
+def adjust_task_counts(model, deltas):
+    """
+    Сдвигает task_count статусов или меток: {pk: delta}.
+    UPDATE ... SET task_count = task_count + delta не читает старое
+    значение, поэтому параллельные изменения не теряются;
+    строки с одинаковым сдвигом обновляются одним запросом.
+    Строки сначала блокируются по возрастанию pk: иначе две транзакции
+    (s1 -> s2 и s2 -> s1) захватывают их в разном порядке и
+    PostgreSQL прерывает одну из них взаимной блокировкой.
+    """
+    groups = defaultdict(list)
+    for pk, delta in deltas.items():
+        if delta:
+            groups[delta].append(pk)
+    if not groups:
+        return
+    pks = sorted(pk for group in groups.values() for pk in group)
+    list(
+        model.objects.filter(pk__in=pks).order_by('pk')
+        .select_for_update().values_list('pk', flat=True)
+    )
+    for delta, pks in groups.items():
+        model.objects.filter(pk__in=pks).update(
+            task_count=F('task_count') + delta
+        )
+
+
+def count_task_rows(removed=(), added=()):
+    """
+    Обновляет TaskCounter и Status.task_count по строкам
+    (author_id, executor_id, status_id, n) до и после изменения задач.
+    """
+    removed, added = list(removed), list(added)
+    deltas = TaskCounter.objects.deltas(removed, -1)
+    deltas.update(TaskCounter.objects.deltas(added))
+    TaskCounter.objects.apply(deltas)
+
+    statuses = Counter()
+    for _author_id, _executor_id, status_id, n in removed:
+        statuses[status_id] -= n
+    for _author_id, _executor_id, status_id, n in added:
+        statuses[status_id] += n
+    adjust_task_counts(Status, statuses)
+
+
+def label_rows(task_ids):
+    """Число задач из task_ids у каждой метки: {label_id: n}."""
+    return Counter(dict(
+        Task.labels.through.objects.filter(task_id__in=task_ids).order_by(
+        ).values_list('label_id').annotate(n=Count('*'))
+    ))
+
+
+class TaskCounterQuerySet(models.QuerySet):
+
+    @staticmethod
+    def deltas(rows, sign=1):
+        """
+        Изменения счётчиков для строк (author_id, executor_id, status_id, n):
+        {(user_id, status_id, role): +-n}.
+        """
+        deltas = Counter()
+        for author_id, executor_id, status_id, n in rows:
+            deltas[(author_id, status_id, TaskCounter.Role.AUTHOR)] += sign * n
+            if executor_id is not None:
+                key = (executor_id, status_id, TaskCounter.Role.EXECUTOR)
+                deltas[key] += sign * n
+        return deltas
+
+    @staticmethod
+    def task_rows(queryset):
+        """Число задач в группах (author_id, executor_id, status_id)."""
+        return queryset.order_by().values_list(
+            *COUNTED_FIELDS_ORDER
+        ).annotate(n=Count('pk'))
+
+    def _update(self, deltas):
+        """
+        Сдвигает существующие счётчики, возвращает ключи без строки.
+        Ключи обходятся по порядку, чтобы параллельные транзакции
+        блокировали строки счётчиков в одном и том же порядке.
+        """
+        missing = []
+        for (user_id, status_id, role), delta in sorted(deltas.items()):
+            updated = self.filter(
+                user_id=user_id, status_id=status_id, role=role,
+            ).update(count=F('count') + delta)
+            if not updated:
+                missing.append((user_id, status_id, role))
+        return missing
+
+    def apply(self, deltas):
+        """
+        Применяет изменения: UPDATE count = count + delta.
+        Недостающие строки создаются с нулём (конфликт при параллельной
+        вставке игнорируется) и сдвигаются повторно.
+        """
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        missing = self._update(deltas)
+        if missing:
+            self.bulk_create(
+                [
+                    TaskCounter(user_id=user_id, status_id=status_id, role=role)
+                    for user_id, status_id, role in missing
+                ],
+                ignore_conflicts=True,
+            )
+            self._update({key: deltas[key] for key in missing})
+
+    @contextmanager
+    def track(self, queryset):
+        """
+        Для массовых update()/delete() и изменений таблицы меток в обход
+        Task.save() и m2m_changed: TaskCounter, Status.task_count
+        и Label.task_count пересчитываются по разнице групп
+        до и после операции. Отдаёт заблокированные задачи [(pk, name)]
+        (для истории изменений).
+        """
+        with transaction.atomic():
+            # Задачи блокируются по возрастанию pk, как и счётчики
+            tasks = list(
+                queryset.select_for_update().order_by('pk')
+                .values_list('pk', 'name')
+            )
+            ids = [pk for pk, _name in tasks]
+            affected = Task.objects.filter(pk__in=ids)
+            removed = list(self.task_rows(affected))
+            labels = label_rows(ids)
+            yield tasks
+            count_task_rows(removed=removed, added=self.task_rows(affected))
+            labels.subtract(label_rows(ids))
+            adjust_task_counts(Label, {pk: -n for pk, n in labels.items()})
+
+    def rebuild(self):
+        """Пересчитывает все счётчики TaskCounter по таблице задач."""
+        # Таблица пуста после удаления: строки вставляются сразу
+        # с итоговыми значениями, без UPDATE на каждый ключ
+        with transaction.atomic():
+            self.all().delete()
+            deltas = self.deltas(self.task_rows(Task.objects.all()))
+            self.bulk_create(
+                [
+                    TaskCounter(
+                        user_id=user_id, status_id=status_id, role=role, count=n,
+                    )
+                    for (user_id, status_id, role), n in deltas.items()
+                    if n
+                ],
+                batch_size=1000,
+            )
+
+    def dashboard(self, user):
+        """
+        Сводка для главной страницы: по строке на статус
+        с числом созданных и назначенных пользователю задач.
+        """
+        rows = {}
+        counters = self.filter(user=user, count__gt=0).order_by(
+            'status__name'
+        ).values_list('status_id', 'status__name', 'role', 'count')
+        for status_id, status_name, role, count in counters:
+            row = rows.setdefault(status_id, {
+                'status_id': status_id,
+                'status': status_name,
+                TaskCounter.Role.AUTHOR: 0,
+                TaskCounter.Role.EXECUTOR: 0,
+            })
+            row[role] = count
+        return list(rows.values())
+
+
+class TaskCounter(models.Model):
+    """
+    Денормализованное число задач пользователя в каждом статусе:
+    отдельно как автора и как исполнителя. Обновляется в той же
+    транзакции, что и задача, поэтому главная страница читает
+    O(статусов) строк вместо COUNT(*) по задачам.
+    """
+
+    class Role(models.TextChoices):
+        AUTHOR = 'author', _("Автор")
+        EXECUTOR = 'executor', _("Исполнитель")
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='task_counters',
+    )
+    status = models.ForeignKey(
+        'statuses.Status',
+        on_delete=models.CASCADE,
+        related_name='task_counters',
+    )
+    role = models.CharField(max_length=10, choices=Role.choices)
+    count = models.IntegerField(default=0)
+
+    objects = TaskCounterQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'role', 'status'],
+                name='task_counter_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} / {self.status} / {self.role}: {self.count}"
@@ -0,0 +1,125 @@
+"""
+Полнотекстовый поиск по имени и описанию задачи.
+
+PostgreSQL: SearchVector/SearchQuery с GIN-индексом по тому же выражению.
+SQLite (локальный запуск): внешняя таблица FTS5, которую синхронизируют триггеры.
+Обе ветки аннотируют search_rank: чем больше, тем релевантнее.
+"""
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.functions import Cast
+from django.db.models.expressions import RawSQL
+
+
+SEARCH_CONFIG = 'russian'
+SEARCH_INDEX_NAME = 'task_search_idx'
+FTS_TABLE = 'tasks_task_fts'
+
+
+def search_vector():
+    from django.contrib.postgres.search import SearchVector
+
+    # Имя весит больше описания. Выражение должно совпадать
+    # с выражением GIN-индекса, иначе планировщик индекс не возьмёт.
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+    )
+
+
+def search_tasks(queryset, text):
+    words = text.split()
+    if not words:
+        return queryset
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        return _search_postgresql(queryset, text)
+    if vendor == 'sqlite':
+        return _search_sqlite(queryset, words)
+    # Прочие СУБД: без индекса и ранжирования, но с тем же интерфейсом
+    for word in words:
+        queryset = queryset.filter(
+            Q(name__icontains=word) | Q(description__icontains=word)
+        )
+    return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def _search_postgresql(queryset, text):
+    from django.contrib.postgres.search import SearchQuery, SearchRank
+
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+    return queryset.alias(
+        search_document=search_vector(),
+    ).annotate(
+        # ts_rank() возвращает real: в курсоре значение сохраняется как
+        # double и уже не равно себе на следующей странице, и задачи
+        # с одинаковым рангом повторяются или пропускаются. В double
+        # precision ранг проходит через курсор без потерь.
+        search_rank=Cast(SearchRank(search_vector(), query), FloatField()),
+    ).filter(search_document=query)
+
+
+def _search_sqlite(queryset, words):
+    # Каждое слово — фраза-префикс FTS5; кавычки экранируются удвоением
+    match = ' '.join('"%s"*' % word.replace('"', '""') for word in words)
+    return queryset.filter(
+        id__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            [match],
+        )
+    ).annotate(
+        # bm25 тем меньше, чем релевантнее; имя весит в 10 раз больше
+        search_rank=RawSQL(
+            f'SELECT -bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = tasks_task.id',
+            [match],
+        )
+    )
+
+
+def install_search_index(schema_editor, model):
+    """
+    Создаёт индекс полнотекстового поиска для текущей СУБД.
+    Вызывается из миграций; на SQLite безопасно вызывать повторно
+    (например, после пересоздания таблицы задач, которое сносит триггеры).
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        from django.contrib.postgres.indexes import GinIndex
+
+        schema_editor.add_index(
+            model, GinIndex(search_vector(), name=SEARCH_INDEX_NAME)
+        )
+    elif vendor == 'sqlite':
+        for statement in SQLITE_FTS_SQL:
+            schema_editor.execute(statement)
+
+
+def remove_search_index(schema_editor, model):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {SEARCH_INDEX_NAME}')
+    elif vendor == 'sqlite':
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+SQLITE_FTS_SQL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "name, description, content='tasks_task', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON tasks_task BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON tasks_task BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au "
+    "AFTER UPDATE OF name, description ON tasks_task BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) "
+    "VALUES ('delete', old.id, old.name, old.description); "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
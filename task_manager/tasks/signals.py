@@ -0,0 +1,80 @@
+"""
+Переименование статуса или пользователя меняет текст строк в списке
+задач, поэтому у связанных задач обновляется row_version. Метки в строках
+списка не выводятся, их сохранение задачи не трогает.
+
+Изменение меток задачи через Task.labels (форма, add/remove/set/clear
+с любой стороны связи) сдвигает Label.task_count.
+"""
+from collections import Counter
+
+from django.db.models import Q
+
+from task_manager.labels.models import Label
+
+from .models import Task, adjust_task_counts
+
+# Поля, которые выводятся в строках списка задач
+STATUS_FIELDS = ('name',)
+USER_FIELDS = ('first_name', 'last_name')
+
+
+def displayed_changed(instance, fields, update_fields):
+    """
+    Меняет ли сохранение instance выведенные в списке поля: сравнение
+    с сохранёнными значениями (один SELECT), если update_fields их не
+    исключает. Смена пароля или вход запросов к задачам не делают.
+    """
+    if instance._state.adding or instance.pk is None:
+        return False
+    if update_fields is not None and not set(fields) & set(update_fields):
+        return False
+    stored = (
+        type(instance)._default_manager
+        .filter(pk=instance.pk).values(*fields).first()
+    )
+    return stored is not None and any(
+        stored[field] != getattr(instance, field) for field in fields
+    )
+
+
+def check_status_change(sender, instance, update_fields=None, **kwargs):
+    instance._touch_tasks = displayed_changed(
+        instance, STATUS_FIELDS, update_fields
+    )
+
+
+def check_user_change(sender, instance, update_fields=None, **kwargs):
+    instance._touch_tasks = displayed_changed(
+        instance, USER_FIELDS, update_fields
+    )
+
+
+def touch_status_tasks(sender, instance, created=False, **kwargs):
+    if not created and getattr(instance, '_touch_tasks', False):
+        Task.objects.filter(status=instance).touch()
+
+
+def touch_user_tasks(sender, instance, created=False, **kwargs):
+    if not created and getattr(instance, '_touch_tasks', False):
+        Task.objects.filter(Q(author=instance) | Q(executor=instance)).touch()
+
+
+def count_label_tasks(sender, instance, action, reverse, pk_set, **kwargs):
+    # В post_add pk_set содержит только реально добавленные строки связи,
+    # в pre_remove — запрошенные, поэтому удаляемые строки считаем сами
+    if action == 'post_add':
+        if reverse:
+            deltas = {instance.pk: len(pk_set)}
+        else:
+            deltas = dict.fromkeys(pk_set, 1)
+    elif action in ('pre_remove', 'pre_clear'):
+        source, target = ('label_id', 'task_id') if reverse else ('task_id', 'label_id')
+        links = sender.objects.filter(**{source: instance.pk})
+        if action == 'pre_remove':
+            links = links.filter(**{f'{target}__in': pk_set})
+        deltas = Counter(links.values_list('label_id', flat=True))
+        deltas = {pk: -n for pk, n in deltas.items()}
+    else:
+        return
+    adjust_task_counts(Label, deltas)
@@ -1,4 +1,6 @@
 from django.urls import path
+
+from task_manager.asyncviews import read_view
 from . import views
 
 app_name = "tasks"
@@ -6,7 +8,7 @@ app_name = "tasks"
 urlpatterns = [
     path(
         "",
-        views.TaskListView.as_view(),
+        read_view(views.TaskListView, views.AsyncTaskListView),
         name="tasks_list"
     ),
     path(
@@ -14,11 +16,26 @@ urlpatterns = [
         views.TaskCreateView.as_view(),
         name="tasks_create"
     ),
+    path(
+        "bulk/",
+        views.TaskBulkView.as_view(),
+        name="tasks_bulk"
+    ),
+    path(
+        "export/",
+        read_view(views.TaskExportView, views.AsyncTaskExportView),
+        name="tasks_export"
+    ),
     path(
         '<int:pk>/',
-        views.TaskDetailView.as_view(),
+        read_view(views.TaskDetailView, views.AsyncTaskDetailView),
         name='tasks_detail'
     ),
+    path(
+        "<int:pk>/history/",
+        views.TaskHistoryView.as_view(),
+        name="tasks_history"
+    ),
     path(
         "<int:pk>/update/",
         views.TaskUpdateView.as_view(),
@@ -29,4 +46,14 @@ urlpatterns = [
         views.TaskDeleteView.as_view(),
         name="tasks_delete"
     ),
+    path(
+        "autocomplete/executors/",
+        views.ExecutorAutocompleteView.as_view(),
+        name="autocomplete_executors"
+    ),
+    path(
+        "autocomplete/labels/",
+        views.LabelAutocompleteView.as_view(),
+        name="autocomplete_labels"
+    ),
 ]
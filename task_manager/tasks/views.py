@@ -1,20 +1,55 @@
 import logging
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.http import (
+    Http404,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import redirect
-from django.views.generic import CreateView, UpdateView, DeleteView, DetailView
+from django.views import View
+from django.views.generic import (
+    CreateView,
+    DeleteView,
+    DetailView,
+    ListView,
+    UpdateView,
+)
 from django.contrib.messages.views import SuccessMessageMixin
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse_lazy
+from django.utils.http import url_has_allowed_host_and_scheme
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django_filters.views import FilterView
 
+from task_manager.asyncviews import (
+    AsyncDetailMixin,
+    AsyncFilterListMixin,
+    AsyncReadMixin,
+)
+from task_manager.history.mixins import HistoryMixin, describe, display
+from task_manager.history.models import HistoryEntry
+from task_manager.history.writer import record_many
+from task_manager.labels.models import Label
+from task_manager.pagination import KeysetPaginationMixin
+from task_manager.routers import ReplicaReadMixin
+from task_manager.versioning import ConditionalGetMixin, mark_changed
+
+from . import export
 from .filters import TaskFilter
-from .models import Task
-from .forms import TaskForm
+from .models import Task, TaskCounter, next_row_version
+from .forms import TaskBulkForm, TaskForm
 
 
 logger = logging.getLogger("tasks")
 
+# Страницы задач показывают имена статусов, меток и пользователей
+TASK_PAGE_NAMESPACES = ('tasks', 'statuses', 'labels', 'users')
+
 
 class FormLoggerMixin:
     """
@@ -22,31 +57,294 @@ class FormLoggerMixin:
     Используется вместе с CreateView/UpdateView/DeleteView.
     """
 
-    log_message: str = "Object saved: {obj}"
+    log_message: str = "Object saved: %s"
 
     def form_valid(self, form):
         response = super().form_valid(form)
-        logger.info(self.log_message.format(obj=self.object))
+        logger.info(self.log_message, self.object)
         return response
 
 
 # ---------------------------
 # Список задач
 # ---------------------------
-class TaskListView(LoginRequiredMixin, FilterView):
+class TaskListView(
+    LoginRequiredMixin,
+    ConditionalGetMixin,
+    ReplicaReadMixin,
+    KeysetPaginationMixin,
+    FilterView
+):
     model = Task
+    queryset = Task.objects.with_related()
     template_name = 'tasks/list.html'
     context_object_name = 'tasks'
     filterset_class = TaskFilter
+    version_namespaces = TASK_PAGE_NAMESPACES
+    bulk_form = None
+    # Не зависит от числа задач на странице (task_manager/metrics/budget.py)
+    query_budget = 8
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['bulk_form'] = self.bulk_form or TaskBulkForm()
+        return context
+
+    def get_pagination_keys(self):
+        # При поиске сначала самые релевантные задачи
+        if 'search_rank' in self.object_list.query.annotations:
+            return ('-search_rank', *self.pagination_keys)
+        return self.pagination_keys
+
+
+class AsyncTaskListView(AsyncFilterListMixin, TaskListView):
+
+    async def aget_object_list(self):
+        # Варианты выпадающих списков формы берутся из кеша,
+        # при промахе — из базы
+        self.bulk_form = await sync_to_async(TaskBulkForm)()
+        return await super().aget_object_list()
+
+
+# ---------------------------
+# Массовые действия над выбранными задачами
+# ---------------------------
+class TaskBulkView(LoginRequiredMixin, View):
+    """
+    Каждое действие — один UPDATE/DELETE ... WHERE id IN (...)
+    или одна пакетная вставка в таблицу меток, без обхода задач по одной.
+    Удаляются только задачи, автор которых — текущий пользователь.
+    """
+
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        form = TaskBulkForm(request.POST)
+        if not form.is_valid():
+            messages.error(request, _("Выберите задачи и заполните действие"))
+            return self.redirect_back()
+
+        action = form.cleaned_data['action']
+        ids = form.cleaned_data['tasks']
+        queryset = Task.objects.filter(pk__in=ids)
+        with transaction.atomic():
+            count = getattr(self, f'bulk_{action}')(queryset, form.cleaned_data)
+            # update() и пакетная вставка меток не вызывают сигналы модели
+            mark_changed('tasks')
+
+        logger.info(
+            "Массовое действие %s: задач %d из %d, пользователь %s",
+            action, count, len(ids), request.user,
+        )
+        messages.success(request, _("Обработано задач: %(count)d") % {
+            'count': count,
+        })
+        if action == TaskBulkForm.DELETE and count < len(ids):
+            messages.error(request, _("Задачу может удалить только ее автор"))
+        return self.redirect_back()
+
+    def redirect_back(self):
+        url = self.request.POST.get('next')
+        if url and url_has_allowed_host_and_scheme(
+            url, allowed_hosts={self.request.get_host()}
+        ):
+            return redirect(url)
+        return redirect('tasks:tasks_list')
+
+    def record_history(self, action, tasks, changes=None):
+        record_many(self.request.user, action, Task, tasks, changes)
+
+    def bulk_set_status(self, queryset, data):
+        with TaskCounter.objects.track(queryset) as tasks:
+            count = queryset.update(
+                status=data['status'], row_version=next_row_version()
+            )
+        self.record_history(
+            HistoryEntry.Action.UPDATE, tasks,
+            {'status': {'new': display(data['status'])}},
+        )
+        return count
+
+    def bulk_set_executor(self, queryset, data):
+        with TaskCounter.objects.track(queryset) as tasks:
+            count = queryset.update(
+                executor=data['executor'], row_version=next_row_version()
+            )
+        self.record_history(
+            HistoryEntry.Action.UPDATE, tasks,
+            {'executor': {'new': display(data['executor'])}},
+        )
+        return count
+
+    def bulk_add_label(self, queryset, data):
+        Through = Task.labels.through
+        label = data['label']
+        with TaskCounter.objects.track(queryset) as tasks:
+            labelled = set(
+                Through.objects.filter(
+                    task_id__in=[pk for pk, _name in tasks], label=label
+                ).values_list('task_id', flat=True)
+            )
+            Through.objects.bulk_create(
+                [Through(task_id=pk, label=label) for pk, _name in tasks],
+                ignore_conflicts=True,
+            )
+        self.record_history(
+            HistoryEntry.Action.UPDATE,
+            [task for task in tasks if task[0] not in labelled],
+            {'labels': {'added': [str(label)]}},
+        )
+        return len(tasks)
+
+    def bulk_remove_label(self, queryset, data):
+        Through = Task.labels.through
+        label = data['label']
+        with TaskCounter.objects.track(queryset) as tasks:
+            links = Through.objects.filter(task__in=queryset, label=label)
+            labelled = set(links.values_list('task_id', flat=True))
+            deleted, _rows = links.delete()
+        self.record_history(
+            HistoryEntry.Action.UPDATE,
+            [task for task in tasks if task[0] in labelled],
+            {'labels': {'removed': [str(label)]}},
+        )
+        return deleted
+
+    def bulk_delete(self, queryset, data):
+        own = queryset.deletable_by(self.request.user)
+        with TaskCounter.objects.track(own) as tasks:
+            _deleted, rows = own.delete()
+        self.record_history(HistoryEntry.Action.DELETE, tasks)
+        return rows.get(Task._meta.label, 0)
+
+
+# ---------------------------
+# Выгрузка отфильтрованных задач
+# ---------------------------
+class TaskExportView(LoginRequiredMixin, View):
+    """
+    Потоковая выгрузка задач с теми же фильтрами, что и у списка:
+    /tasks/export/?format=csv|jsonl&status=...
+    Строки читаются с сервера порциями через iterator(chunk_size),
+    поэтому первые байты уходят сразу, а память не растёт с числом задач.
+    """
+
+    chunk_size = 2000
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('format', 'csv')
+        if export_format not in export.FORMATS:
+            return HttpResponseBadRequest(_("Неизвестный формат выгрузки"))
+
+        filterset = TaskFilter(
+            request.GET,
+            queryset=Task.objects.with_related(),
+            request=request,
+        )
+        if not filterset.is_valid():
+            return HttpResponseBadRequest(filterset.errors.as_text())
+
+        queryset = filterset.qs.order_by('created_at', 'id')
+        rows = (
+            export.task_to_row(task)
+            for task in queryset.iterator(chunk_size=self.chunk_size)
+        )
+        stream, content_type = export.FORMATS[export_format]
+        response = StreamingHttpResponse(stream(rows), content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="tasks.{export_format}"'
+        )
+        logger.info("Выгрузка задач в %s", export_format)
+        return response
+
+
+class AsyncTaskExportView(AsyncReadMixin, TaskExportView):
+    """
+    Выгрузка через aiterator(): пока медленный клиент читает ответ,
+    поток не занят, строки читаются из базы по мере отправки.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('format', 'csv')
+        if export_format not in export.FORMATS:
+            return HttpResponseBadRequest(_("Неизвестный формат выгрузки"))
+
+        filterset = TaskFilter(
+            request.GET,
+            queryset=Task.objects.with_related(),
+            request=request,
+        )
+        if not await sync_to_async(filterset.is_valid)():
+            return HttpResponseBadRequest(filterset.errors.as_text())
+
+        queryset = filterset.qs.order_by('created_at', 'id')
+        rows = (
+            export.task_to_row(task)
+            async for task in queryset.aiterator(chunk_size=self.chunk_size)
+        )
+        response = StreamingHttpResponse(
+            export.ASYNC_STREAMS[export_format](rows),
+            content_type=export.FORMATS[export_format][1],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="tasks.{export_format}"'
+        )
+        logger.info("Выгрузка задач в %s", export_format)
+        return response
 
 
 # ---------------------------
 # Вывод конкретной задачи
 # ---------------------------
-class TaskDetailView(LoginRequiredMixin, DetailView):
+class TaskDetailView(
+    LoginRequiredMixin,
+    ConditionalGetMixin,
+    ReplicaReadMixin,
+    DetailView
+):
     model = Task
+    version_namespaces = TASK_PAGE_NAMESPACES
+    queryset = Task.objects.with_related()
     template_name = 'tasks/detail.html'
     context_object_name = "task"
+    query_budget = 4
+
+
+class AsyncTaskDetailView(AsyncDetailMixin, TaskDetailView):
+    pass
+
+
+# ---------------------------
+# История изменений задачи
+# ---------------------------
+class TaskHistoryView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
+    """
+    Записи HistoryEntry задачи, новые первыми. Страница читается
+    по индексу (model, object_id, created_at); история удалённой
+    задачи тоже доступна.
+    """
+
+    template_name = 'tasks/history.html'
+    context_object_name = 'entries'
+    pagination_keys = ('-created_at', '-id')
+    query_budget = 4
+
+    def get_queryset(self):
+        return HistoryEntry.objects.filter(
+            model=Task._meta.label, object_id=self.kwargs['pk'],
+        ).select_related('actor')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        entries = context['entries']
+        task = Task.objects.filter(pk=self.kwargs['pk']).first()
+        if task is None and not entries:
+            raise Http404(_("Задача не найдена"))
+        for entry in entries:
+            entry.rows = describe(entry, Task)
+        context['task'] = task
+        context['title'] = task.name if task else entries[0].object_repr
+        return context
 
 
 # ---------------------------
@@ -54,6 +352,7 @@ class TaskDetailView(LoginRequiredMixin, DetailView):
 # ---------------------------
 class TaskCreateView(
     LoginRequiredMixin,
+    HistoryMixin,
     FormLoggerMixin,
     SuccessMessageMixin,
     CreateView
@@ -64,7 +363,7 @@ class TaskCreateView(
     context_object_name = "task"
     success_url = reverse_lazy("tasks:tasks_list")
     success_message = _("Задача успешно создана")
-    log_message = "Создана задача: {obj}"
+    log_message = "Создана задача: %s"
 
     def form_valid(self, form):
         form.instance.author = self.request.user
@@ -76,17 +375,19 @@ class TaskCreateView(
 # ---------------------------
 class TaskUpdateView(
     LoginRequiredMixin,
+    HistoryMixin,
     FormLoggerMixin,
     SuccessMessageMixin,
     UpdateView
 ):
     model = Task
+    queryset = Task.objects.with_related()
     context_object_name = "task"
     form_class = TaskForm
     template_name = 'tasks/update.html'
     success_url = reverse_lazy("tasks:tasks_list")
     success_message = _("Задача успешно изменена")
-    log_message = "Изменена задача: {obj}"
+    log_message = "Изменена задача: %s"
 
 
 # ---------------------------
@@ -95,10 +396,12 @@ class TaskUpdateView(
 class TaskDeleteView(
     UserPassesTestMixin,
     LoginRequiredMixin,
+    HistoryMixin,
     SuccessMessageMixin,
     DeleteView
 ):
     model = Task
+    queryset = Task.objects.with_related()
     template_name = "tasks/delete.html"
     context_object_name = "task"
     success_url = reverse_lazy("tasks:tasks_list")
@@ -106,7 +409,7 @@ class TaskDeleteView(
 
     def test_func(self):
         obj = self.get_object()
-        return obj.author == self.request.user
+        return obj.is_deletable_by(self.request.user)
 
     def handle_no_permission(self):
         messages.error(
@@ -115,8 +418,78 @@ class TaskDeleteView(
         )
         return redirect('tasks:tasks_list')
 
-    def delete(self, request, *args, **kwargs):
-        self.object = self.get_object()
-        logger.info(f"Задача удалена: {self.object}")
-        messages.success(request, _("Задача успешно удалена"))
-        return super().delete(request, *args, **kwargs)
+    def form_valid(self, form):
+        # DeleteView удаляет в form_valid(), delete() для POST не вызывается
+        response = super().form_valid(form)
+        logger.info("Задача удалена: %s", self.object)
+        return response
+
+
+# ---------------------------
+# JSON-подсказки для исполнителя и меток
+# ---------------------------
+class AutocompleteView(View):
+    """
+    Асинхронный поиск по префиксу: ?q=<начало слова>&limit=<N>.
+    Каждое слово запроса должно быть началом одного из search_fields,
+    поэтому «Ив Пет» находит «Иван Петров».
+    Текст варианта по умолчанию — первое поле из values.
+    """
+
+    model = None
+    search_fields = ()
+    values = ()
+    ordering = ()
+    limit = 10
+    max_limit = 50
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.GET.get('limit', self.limit))
+        except ValueError:
+            limit = self.limit
+        return max(1, min(limit, self.max_limit))
+
+    def get_queryset(self):
+        queryset = self.model.objects.order_by(*self.ordering)
+        for word in self.request.GET.get('q', '').split():
+            condition = Q()
+            for field in self.search_fields:
+                condition |= Q(**{f'{field}__istartswith': word})
+            queryset = queryset.filter(condition)
+        return queryset.values('pk', *self.values)[:self.get_limit()]
+
+    def to_result(self, row):
+        return {'id': row['pk'], 'text': str(row[self.values[0]])}
+
+    async def get(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return JsonResponse(
+                {'error': _("Вы не авторизованы! Пожалуйста, выполните вход.")},
+                status=401,
+            )
+        results = [self.to_result(row) async for row in self.get_queryset()]
+        return JsonResponse({'results': results})
+
+
+class ExecutorAutocompleteView(AutocompleteView):
+    model = User
+    search_fields = ('first_name', 'last_name', 'username')
+    values = ('first_name', 'last_name', 'username')
+    ordering = ('username',)
+
+    def to_result(self, row):
+        full_name = f"{row['first_name']} {row['last_name']}".strip()
+        return {
+            'id': row['pk'],
+            'text': full_name or row['username'],
+            'username': row['username'],
+        }
+
+
+class LabelAutocompleteView(AutocompleteView):
+    model = Label
+    search_fields = ('name',)
+    values = ('name',)
+    ordering = ('name',)
@@ -17,6 +17,8 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from .caching.views import CacheStatsView
+from .metrics.views import MetricsView
 from .views import HomePageView, CustomLoginView, CustomLogoutView
 
 
@@ -34,6 +36,9 @@ urlpatterns = [
     path("statuses/", include("task_manager.statuses.urls")),
     path("tasks/", include("task_manager.tasks.urls")),
     path("labels/", include("task_manager.labels.urls")),
+    path("api/v1/", include("task_manager.api.urls")),
+    path("cache/stats/", CacheStatsView.as_view(), name="cache_stats"),
+    path("metrics", MetricsView.as_view(), name="metrics"),
     path("admin/", admin.site.urls),
     path("i18n/", include("django.conf.urls.i18n")),
 ]
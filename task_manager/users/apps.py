@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'task_manager.users'
+
+    def ready(self):
+        from django.contrib.auth.models import User
+        from task_manager.versioning import track_changes
+
+        # Вход пользователя сохраняет только last_login — это не изменение
+        track_changes(User, 'users', ignore_fields=['last_login'])
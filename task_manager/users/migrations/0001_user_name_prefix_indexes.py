@@ -0,0 +1,42 @@
+from django.db import migrations
+
+
+# Индексы для поиска по префиксу (istartswith) в подсказках исполнителя.
+# Выражение индекса совпадает с тем, что Django генерирует для istartswith:
+# UPPER(col::text) LIKE ... в PostgreSQL и col LIKE ... в SQLite.
+INDEXES = [
+    ('auth_user_username_prefix_idx', 'username'),
+    ('auth_user_first_name_prefix_idx', 'first_name'),
+    ('auth_user_last_name_prefix_idx', 'last_name'),
+]
+
+
+def create_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for name, column in INDEXES:
+        if vendor == 'postgresql':
+            schema_editor.execute(
+                f'CREATE INDEX {name} ON auth_user '
+                f'(UPPER({column}::text) text_pattern_ops)'
+            )
+        elif vendor == 'sqlite':
+            schema_editor.execute(
+                f'CREATE INDEX {name} ON auth_user ({column} COLLATE NOCASE)'
+            )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        for name, _column in INDEXES:
+            schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -1,6 +1,8 @@
 from django.urls import path
 
+from task_manager.asyncviews import read_view
 from .views import (
+    AsyncUsersListView,
     UsersListView,
     UsersCreateView,
     UsersUpdateView,
@@ -12,7 +14,7 @@ app_name = "users"
 urlpatterns = [
     path(
         "",
-        UsersListView.as_view(),
+        read_view(UsersListView, AsyncUsersListView),
         name="users_list"
     ),
     path(
@@ -8,8 +8,15 @@ from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.models import User
 from django.urls import reverse_lazy
 
+from task_manager.asyncviews import AsyncListMixin
+from task_manager.caching.mixins import AnonymousPageCacheMixin
+from task_manager.history.mixins import HistoryMixin
+from task_manager.history.models import HistoryEntry
+from task_manager.history.writer import record
+from task_manager.pagination import KeysetPaginationMixin
+from task_manager.routers import ReplicaReadMixin
 from .forms import RegisterForm, CustomUserChangeForm
-from task_manager.tasks.models import Task
+from task_manager.deletion import delete_if_unused
 
 logger = logging.getLogger("users")
 
@@ -20,11 +27,11 @@ class FormLoggerMixin:
     Используется вместе с CreateView/UpdateView/DeleteView.
     """
 
-    log_message: str = "Object saved: {obj}"
+    log_message: str = "Object saved: %s"
 
     def form_valid(self, form):
         response = super().form_valid(form)
-        logger.info(self.log_message.format(obj=self.object))
+        logger.info(self.log_message, self.object)
         return response
 
 
@@ -55,22 +62,40 @@ class UserPermissionTestMixin(UserPassesTestMixin):
         return self.request.user.pk == user.pk or self.request.user.is_superuser
 
 
-class UsersListView(ListView):
+class UsersListView(
+    AnonymousPageCacheMixin,
+    ReplicaReadMixin,
+    KeysetPaginationMixin,
+    ListView
+):
     model = User
+    page_cache_namespaces = ('users',)
     template_name = "users/list.html"
     context_object_name = "users"
+    pagination_keys = ("date_joined", "id")
+    query_budget = 3
+
 
+class AsyncUsersListView(AsyncListMixin, UsersListView):
+    pass
 
-class UsersCreateView(FormLoggerMixin, SuccessMessageMixin, CreateView):
+
+class UsersCreateView(
+    HistoryMixin,
+    FormLoggerMixin,
+    SuccessMessageMixin,
+    CreateView
+):
     form_class = RegisterForm
     template_name = "users/create.html"
     success_url = "/login/"
     success_message = _("Пользователь успешно зарегистрирован")
-    log_message = "Создать пользователя: {obj.username}"
+    log_message = "Создать пользователя: %s"
 
 
 class UsersUpdateView(
     PermissionMessageMixin,
+    HistoryMixin,
     FormLoggerMixin,
     SuccessMessageMixin,
     LoginRequiredMixin,
@@ -82,7 +107,7 @@ class UsersUpdateView(
     template_name = "users/update.html"
     success_url = reverse_lazy("users:users_list")
     success_message = _("Пользователь успешно изменен")
-    log_message = "Пользователь обновлен: {obj.username}"
+    log_message = "Пользователь обновлен: %s"
 
 
 class UsersDeleteView(
@@ -104,20 +129,24 @@ class UsersDeleteView(
         self.object = self.get_object()  # объект берется по pk из URL
         user_id = self.object.id
 
-        # Проверяем, есть ли задачи, автором которых является пользователь
-        if Task.objects.filter(author=self.object).exists():
+        # Удаляем, только если пользователь не автор и не исполнитель задач
+        used = delete_if_unused(self.object)
+        if used:
             messages.error(
                 request,
                 _("Невозможно удалить пользователя, потому что он используется")
             )
             logger.warning(
-                f"Попытка удалить пользователя {user_id},"
-                f"который является автором задач"
+                "Попытка удалить пользователя %s, "
+                "который используется в задачах: %s",
+                user_id, used,
             )
             return redirect("users:users_list")
 
-        # Если связей нет — вызываем стандартное удаление
-        response = super().delete(request, *args, **kwargs)
+        # Пользователь удаляет сам себя — ссылаться в записи не на кого;
+        # суперпользователь, удаливший другого, остаётся автором записи
+        actor = request.user if request.user.pk != user_id else None
+        record(actor, HistoryEntry.Action.DELETE, self.object, object_id=user_id)
         messages.success(request, _("Пользователь успешно удален"))
-        logger.info(f"Пользователь {user_id} удалён")
-        return response
+        logger.info("Пользователь %s удалён", user_id)
+        return redirect(self.get_success_url())
@@ -0,0 +1,139 @@
+import datetime
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils.translation import get_language
+from django.views.decorators.http import condition
+
+
+def version_key(namespace):
+    return f"version:{namespace}"
+
+
+def get_version(namespace):
+    """
+    Текущая версия набора данных (например, таблицы статусов).
+    Версия — метка времени в наносекундах, поэтому потеря ключа
+    при вытеснении из кеша даёт новую версию, а не повтор старой.
+    """
+    key = version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key, time.time_ns())
+    return version
+
+
+def get_versions(namespaces):
+    """Версии нескольких namespace одним обращением к кешу."""
+    keys = {version_key(namespace): namespace for namespace in namespaces}
+    found = cache.get_many(keys)
+    return {
+        namespace: found[key] if key in found else get_version(namespace)
+        for key, namespace in keys.items()
+    }
+
+
+def bump_version(namespace):
+    cache.set(version_key(namespace), time.time_ns(), timeout=None)
+
+
+def mark_changed(namespace):
+    """
+    Меняет версию сразу и ещё раз после коммита: иначе параллельный
+    запрос может успеть закешировать данные, прочитанные до коммита.
+    Для массовых операций, которые не вызывают сигналы моделей.
+    """
+    bump_version(namespace)
+    transaction.on_commit(lambda: bump_version(namespace))
+
+
+def track_changes(model, namespace, ignore_fields=()):
+    """
+    Меняет версию namespace при сохранении и удалении объектов модели,
+    а также при изменении её связей many-to-many.
+    Сохранения, затрагивающие только ignore_fields, версию не меняют.
+    """
+    ignore_fields = frozenset(ignore_fields)
+
+    def on_change(sender, update_fields=None, **kwargs):
+        if update_fields and frozenset(update_fields) <= ignore_fields:
+            return
+        mark_changed(namespace)
+
+    def on_m2m_change(sender, action, **kwargs):
+        if action.startswith('post_'):
+            mark_changed(namespace)
+
+    uid = f"versioning:{model._meta.label}:{namespace}"
+    post_save.connect(on_change, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(on_change, sender=model, weak=False, dispatch_uid=uid)
+    for field in model._meta.local_many_to_many:
+        m2m_changed.connect(
+            on_m2m_change,
+            sender=field.remote_field.through,
+            weak=False,
+            dispatch_uid=f"{uid}:{field.name}",
+        )
+
+
+class ConditionalGetMixin:
+    """
+    ETag и Last-Modified для GET/HEAD по версиям таблиц из version_namespaces.
+
+    Проверка стоит одного обращения к кешу: при совпадении ETag
+    ответ 304 уходит без запросов к базе и без рендеринга шаблона.
+    Ставится после LoginRequiredMixin, чтобы анонимный запрос
+    получил редирект, а не 304.
+
+    Страница зависит не только от данных, поэтому в ETag входят
+    пользователь, CSRF-cookie (токен формы в шаблоне), язык и строка
+    запроса. Если для пользователя есть неотданные сообщения,
+    проверка пропускается: их нужно показать.
+    """
+
+    version_namespaces = ()
+
+    def get_versions(self):
+        if not hasattr(self, '_versions'):
+            self._versions = get_versions(self.version_namespaces)
+        return self._versions
+
+    def get_etag(self, request, *args, **kwargs):
+        parts = [
+            *(f"{ns}={version}" for ns, version in self.get_versions().items()),
+            str(request.user.pk),
+            request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+            get_language() or '',
+            request.get_full_path(),
+        ]
+        return hashlib.md5(
+            '|'.join(parts).encode(), usedforsecurity=False
+        ).hexdigest()
+
+    def get_last_modified(self, request, *args, **kwargs):
+        latest = max(self.get_versions().values())
+        return datetime.datetime.fromtimestamp(
+            latest / 1e9, tz=datetime.timezone.utc
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        parent = super().dispatch
+        if request.method not in ('GET', 'HEAD') or get_messages(request):
+            return parent(request, *args, **kwargs)
+        if self.view_is_async:
+            # condition() ждёт ответ только у функции-корутины
+            sync_parent = parent
+
+            async def parent(request, *args, **kwargs):
+                return await sync_parent(request, *args, **kwargs)
+        view = condition(
+            etag_func=self.get_etag,
+            last_modified_func=self.get_last_modified,
+        )(parent)
+        return view(request, *args, **kwargs)
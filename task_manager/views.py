@@ -4,9 +4,13 @@ from django.contrib.messages.views import SuccessMessageMixin
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import TemplateView
 
+from task_manager.caching.mixins import AnonymousPageCacheMixin
+from task_manager.tasks.models import TaskCounter
 
-class HomePageView(TemplateView):
+
+class HomePageView(AnonymousPageCacheMixin, TemplateView):
     template_name = 'index.html'
+    query_budget = 3
 
     GREETING = _('Првиетсвуем в Хекслет!')
     HEADING = _('Практические курсы программирования')
@@ -15,6 +19,10 @@ class HomePageView(TemplateView):
         context = super().get_context_data(**kwargs)
         context['greeting'] = self.GREETING
         context['heading'] = self.HEADING
+        if self.request.user.is_authenticated:
+            context['dashboard'] = TaskCounter.objects.dashboard(
+                self.request.user
+            )
         return context
 
 
@@ -1,6 +1,7 @@
 # tests/conftest.py
 import pytest
 from django.conf import settings
+from django.core.cache import caches
 
 
 # Автоматически задаём SECRET_KEY для всех тестов
@@ -9,3 +10,24 @@ def set_secret_key():
     settings.SECRET_KEY = 'django-insecure-test-key'
 
 
+# Кеш процесса общий для всех тестов, а база после каждого
+# теста откатывается — сбрасываем кеш, чтобы не видеть чужие данные
+@pytest.fixture(autouse=True)
+def clear_cache():
+    yield
+    for cache in caches.all():
+        cache.clear()
+
+
+# Бюджеты запросов представлений (query_budget) проверяются во всех
+# тестах: превышение — исключение QueryBudgetExceeded вместо записи в лог
+@pytest.fixture(autouse=True)
+def query_budgets(settings):
+    settings.QUERY_BUDGET = "raise"
+
+
+# История изменений пишется сразу, в транзакции теста: фоновая запись
+# после коммита (HISTORY_ASYNC) внутри откатываемого теста не произойдёт
+@pytest.fixture(autouse=True)
+def history_sync(settings):
+    settings.HISTORY_ASYNC = False
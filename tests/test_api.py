@@ -0,0 +1,146 @@
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Task
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(
+        username="user1",
+        first_name="Иван",
+        # NOSONAR
+        password="Password123"
+    )
+
+
+@pytest.fixture
+def status(db):
+    return Status.objects.create(name="Новый")
+
+
+@pytest.fixture
+def client_logged(client, user):
+    client.login(
+        username=user.username,
+        # NOSONAR
+        password="Password123"
+    )
+    return client
+
+
+def make_tasks(n, user, status):
+    label = Label.objects.create(name=f"Метка {n}")
+    for i in range(n):
+        task = Task.objects.create(
+            name=f"Задача {i}",
+            description="Описание",
+            author=user,
+            executor=user,
+            status=status
+        )
+        task.labels.add(label)
+
+
+@pytest.mark.django_db
+class TestTaskApi:
+
+    # Без входа API отвечает 401 в JSON, а не редиректом.
+    def test_requires_login(self, client):
+        response = client.get(reverse("api:tasks"))
+        assert response.status_code == 401
+        assert "error" in response.json()
+
+    def test_list(self, client_logged, user, status):
+        make_tasks(1, user, status)
+        data = client_logged.get(reverse("api:tasks")).json()
+        task = Task.objects.get()
+        assert data["next"] is None
+        assert data["results"] == [{
+            "id": task.pk,
+            "name": "Задача 0",
+            "description": "Описание",
+            "status": {"id": status.pk, "name": "Новый"},
+            "author": {"id": user.pk, "username": "user1"},
+            "executor": {"id": user.pk, "username": "user1"},
+            "labels": [{"id": task.labels.get().pk, "name": "Метка 1"}],
+            "created_at": task.created_at.isoformat(),
+        }]
+
+    # Число запросов не зависит от размера страницы.
+    def test_query_count_flat(self, client_logged, user, status):
+        url = reverse("api:tasks")
+        make_tasks(1, user, status)
+        client_logged.get(url)
+        with CaptureQueriesContext(connection) as small:
+            client_logged.get(url)
+        make_tasks(30, user, status)
+        with CaptureQueriesContext(connection) as large:
+            client_logged.get(url)
+        assert len(large.captured_queries) == len(small.captured_queries)
+
+    # Курсор обходит все задачи без повторов.
+    def test_cursor_pagination(self, client_logged, user, status):
+        make_tasks(5, user, status)
+        url = reverse("api:tasks") + "?limit=2&fields=id"
+        seen = []
+        while url:
+            data = client_logged.get(url).json()
+            seen += [row["id"] for row in data["results"]]
+            url = data["next"]
+        assert seen == list(Task.objects.order_by("created_at", "id")
+                            .values_list("pk", flat=True))
+
+    def test_sparse_fields(self, client_logged, user, status):
+        make_tasks(1, user, status)
+        data = client_logged.get(reverse("api:tasks"), {"fields": "id,status"})
+        assert set(data.json()["results"][0]) == {"id", "status"}
+
+    def test_unknown_field(self, client_logged):
+        response = client_logged.get(reverse("api:tasks"), {"fields": "secret"})
+        assert response.status_code == 400
+
+    # Фильтры те же, что у списка задач.
+    def test_filter(self, client_logged, user, status):
+        make_tasks(2, user, status)
+        other = Status.objects.create(name="Готово")
+        response = client_logged.get(reverse("api:tasks"), {"status": other.pk})
+        assert response.json()["results"] == []
+
+    def test_detail(self, client_logged, user, status):
+        make_tasks(1, user, status)
+        task = Task.objects.get()
+        url = reverse("api:task", args=[task.pk])
+        assert client_logged.get(url, {"fields": "name"}).json() == {
+            "name": "Задача 0",
+        }
+        missing = reverse("api:task", args=[task.pk + 1])
+        assert client_logged.get(missing).status_code == 404
+
+
+@pytest.mark.django_db
+class TestDictionaryApi:
+
+    def test_statuses(self, client_logged, status):
+        data = client_logged.get(reverse("api:statuses"), {"fields": "name"})
+        assert data.json()["results"] == [{"name": "Новый"}]
+
+    def test_labels(self, client_logged):
+        label = Label.objects.create(name="Срочно")
+        url = reverse("api:label", args=[label.pk])
+        assert client_logged.get(url).json()["name"] == "Срочно"
+
+    # Список пользователей открыт, как и HTML-страница.
+    def test_users_public(self, client, user):
+        data = client.get(reverse("api:users")).json()
+        assert data["results"][0]["first_name"] == "Иван"
+        assert "password" not in data["results"][0]
+
+    def test_invalid_cursor(self, client_logged):
+        response = client_logged.get(reverse("api:statuses"), {"cursor": "xx"})
+        assert response.status_code == 400
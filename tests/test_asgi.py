@@ -0,0 +1,195 @@
+import importlib
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, resolve, reverse
+
+from task_manager import routers
+from task_manager.labels.models import Label
+from task_manager.routers import ReplicaReadMixin
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Task
+from task_manager.tasks.views import AsyncTaskListView
+
+URL_MODULES = (
+    "task_manager.tasks.urls",
+    "task_manager.statuses.urls",
+    "task_manager.labels.urls",
+    "task_manager.users.urls",
+    # Корневой модуль последним: его include() кешируют списки путей
+    "task_manager.urls",
+)
+
+
+def reload_urls():
+    for module in URL_MODULES:
+        importlib.reload(importlib.import_module(module))
+    clear_url_caches()
+
+
+# urls выбирают вариант представления при импорте
+@pytest.fixture
+def async_views(settings):
+    original = settings.ASYNC_VIEWS
+    settings.ASYNC_VIEWS = True
+    reload_urls()
+    yield
+    settings.ASYNC_VIEWS = original
+    reload_urls()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(
+        username="user1",
+        first_name="Иван",
+        # NOSONAR
+        password="Password123"
+    )
+
+
+@pytest.fixture
+def aclient(async_views, user):
+    client = AsyncClient()
+    client.force_login(user)
+    return client
+
+
+@pytest.fixture
+def tasks(user):
+    status = Status.objects.create(name="Новый")
+    label = Label.objects.create(name="Срочно")
+    for i in range(3):
+        task = Task.objects.create(
+            name=f"Задача {i}", description="", author=user, status=status
+        )
+        task.labels.add(label)
+    return list(Task.objects.order_by("created_at", "id"))
+
+
+def get(client, url, **kwargs):
+    return async_to_sync(client.get)(url, **kwargs)
+
+
+def content(response):
+    if not response.streaming:
+        return response.content.decode()
+
+    async def collect():
+        return b"".join([chunk async for chunk in response.streaming_content])
+    return async_to_sync(collect)().decode()
+
+
+@pytest.mark.django_db
+class TestAsyncViews:
+
+    # Под ASGI страницы чтения обслуживают асинхронные представления.
+    def test_urls_use_async_views(self, async_views):
+        match = resolve(reverse("tasks:tasks_list"))
+        assert match.func.view_class is AsyncTaskListView
+        for name in ("tasks:tasks_list", "statuses:statuses_list",
+                     "labels:labels_list", "users:users_list",
+                     "tasks:tasks_export"):
+            assert iscoroutinefunction(resolve(reverse(name)).func), name
+        assert not iscoroutinefunction(
+            resolve(reverse("tasks:tasks_create")).func
+        )
+
+    def test_task_list_with_filter_and_pages(self, aclient, tasks):
+        response = get(aclient, reverse("tasks:tasks_list"))
+        assert response.status_code == 200
+        assert all(task.name in content(response) for task in tasks)
+
+        url = reverse("tasks:tasks_list")
+        response = get(aclient, url, data={"status": tasks[0].status_id})
+        assert len(response.context["tasks"]) == 3
+
+        # Курсорная страница загружается через async for
+        view = AsyncTaskListView
+        original = view.paginate_by
+        view.paginate_by = 2
+        try:
+            first = get(aclient, url)
+            cursor = first.context["page_obj"].next_cursor
+            second = get(aclient, url, data={"cursor": cursor})
+        finally:
+            view.paginate_by = original
+        assert list(first.context["tasks"]) == tasks[:2]
+        assert list(second.context["tasks"]) == tasks[2:]
+
+    def test_invalid_filter_and_cursor(self, aclient, tasks):
+        url = reverse("tasks:tasks_list")
+        response = get(aclient, url, data={"status": "999"})
+        assert list(response.context["tasks"]) == []
+        assert get(aclient, url, data={"cursor": "bad"}).status_code == 404
+
+    def test_detail(self, aclient, tasks):
+        response = get(aclient, reverse("tasks:tasks_detail", args=[tasks[0].pk]))
+        assert response.status_code == 200
+        assert "Срочно" in content(response)
+        missing = reverse("tasks:tasks_detail", args=[tasks[-1].pk + 1])
+        assert get(aclient, missing).status_code == 404
+
+    def test_status_and_label_lists(self, aclient, tasks):
+        response = get(aclient, reverse("statuses:statuses_list"))
+        assert "Новый" in content(response)
+        response = get(aclient, reverse("labels:labels_list"))
+        assert "Срочно" in content(response)
+
+    # Проверка входа работает с пользователем из request.auser().
+    def test_login_required(self, async_views, tasks):
+        response = get(AsyncClient(), reverse("tasks:tasks_list"))
+        assert response.status_code == 302
+        assert response.url.startswith(reverse("login"))
+
+    # ETag: повторный запрос получает 304 без запросов к базе задач.
+    def test_not_modified(self, aclient, tasks):
+        url = reverse("statuses:statuses_list")
+        get(aclient, url)
+        etag = get(aclient, url)["ETag"]
+        with CaptureQueriesContext(connection) as ctx:
+            response = get(aclient, url, headers={"if-none-match": etag})
+        assert response.status_code == 304
+        assert not any("statuses_status" in q["sql"] for q in ctx.captured_queries)
+
+    # Кеш страницы для анонимов: второй запрос без обращений к базе.
+    def test_anonymous_page_cache(self, async_views, user):
+        client = AsyncClient()
+        url = reverse("users:users_list")
+        assert "user1" in content(get(client, url))
+        with CaptureQueriesContext(connection) as ctx:
+            response = get(client, url)
+        assert "user1" in content(response)
+        assert len(ctx.captured_queries) == 0
+
+    # Выгрузка отдаёт асинхронный поток строк.
+    def test_export(self, aclient, tasks):
+        response = get(aclient, reverse("tasks:tasks_export"), data={
+            "format": "jsonl", "status": tasks[0].status_id,
+        })
+        assert response.streaming
+        lines = content(response).splitlines()
+        assert len(lines) == 3
+        assert '"labels": ["Срочно"]' in lines[0]
+        response = get(aclient, reverse("tasks:tasks_export"), data={
+            "format": "xml",
+        })
+        assert response.status_code == 400
+
+    # Чтения выполняются внутри блока реплики и после await.
+    def test_replica_block(self, aclient, tasks, monkeypatch):
+        monkeypatch.setattr(ReplicaReadMixin, "use_replica", lambda self, r: True)
+        seen = []
+
+        def spy(execute, sql, params, many, context):
+            if "tasks_task" in sql:
+                seen.append(routers._replica_reads.get())
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(spy):
+            get(aclient, reverse("tasks:tasks_detail", args=[tasks[0].pk]))
+        assert seen and all(seen)
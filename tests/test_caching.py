@@ -0,0 +1,40 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from task_manager.caching.config import parse_cache_url
+
+
+class TestParseCacheUrl:
+
+    # По умолчанию у каждого кеша своя область памяти процесса.
+    def test_locmem(self):
+        assert parse_cache_url("locmem://", "fragments") == {
+            "BACKEND": "task_manager.caching.backends.LocMemCache",
+            "LOCATION": "fragments",
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+
+    def test_file(self):
+        config = parse_cache_url("file:///var/tmp/tm?max_entries=50", "pages")
+        assert config["LOCATION"] == "/var/tmp/tm/pages"
+        assert config["OPTIONS"] == {"MAX_ENTRIES": 50}
+
+    def test_memcached_servers(self):
+        config = parse_cache_url("memcached://a:11211,b:11211")
+        assert config["LOCATION"] == ["a:11211", "b:11211"]
+
+    # Параметры строки запроса не попадают в адрес redis.
+    def test_redis_with_options(self):
+        config = parse_cache_url(
+            "redis://cache:6379/1?timeout=60&key_prefix=tm", KEY_PREFIX="x"
+        )
+        assert config == {
+            "BACKEND": "task_manager.caching.backends.RedisCache",
+            "LOCATION": "redis://cache:6379/1",
+            "TIMEOUT": 60,
+            "KEY_PREFIX": "x",
+        }
+
+    def test_unknown_scheme(self):
+        with pytest.raises(ImproperlyConfigured):
+            parse_cache_url("mongodb://localhost")
@@ -0,0 +1,181 @@
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Task
+
+
+@pytest.mark.django_db
+class TestBenchDbConnections:
+
+    # Замер проходит через полный WSGI-цикл и печатает сводку.
+    def test_reports_latency(self):
+        User.objects.create_user(username="bench")
+        out = StringIO()
+        call_command(
+            "bench_db_connections", requests=5, warmup=1, stdout=out
+        )
+        output = out.getvalue()
+        assert "Запросов: 5" in output
+        assert "p95" in output
+
+    def test_requires_ok_response(self):
+        with pytest.raises(CommandError):
+            call_command(
+                "bench_db_connections",
+                path="/no-such-page/",
+                requests=1,
+                warmup=0,
+                stdout=StringIO(),
+            )
+
+
+@pytest.mark.django_db
+class TestBenchConcurrency:
+
+    # Оба сервера проходят полный цикл Django и печатают сводку.
+    @pytest.mark.parametrize("server", ["wsgi", "asgi"])
+    def test_reports_throughput(self, server):
+        out = StringIO()
+        call_command(
+            "bench_concurrency", server=server, workers=2, concurrency=4,
+            requests=4, client_delay=1, stdout=out,
+        )
+        output = out.getvalue()
+        assert f"{server}, ASYNC_VIEWS=False, воркеров 2, клиентов 4" in output
+        assert "запросов/с" in output
+
+    def test_unknown_user(self):
+        with pytest.raises(CommandError):
+            call_command("bench_concurrency", user="nobody", stdout=StringIO())
+
+
+@pytest.mark.django_db
+class TestBenchCrud:
+
+    def run(self, tmp_path, **options):
+        out = StringIO()
+        call_command(
+            "bench_crud",
+            tasks=30, users=5, statuses=3, labels=4,
+            requests=3, warmup=1, stdout=out, **options,
+        )
+        return out.getvalue()
+
+    # Все сценарии проходят, результаты сохраняются в JSON,
+    # созданные замером задачи удаляются.
+    def test_saves_results(self, tmp_path):
+        output = tmp_path / "bench.json"
+        text = self.run(tmp_path, output=str(output))
+        data = json.loads(output.read_text())
+        assert set(data["scenarios"]) == {
+            "list", "detail", "create", "update", "delete"
+        }
+        stats = data["scenarios"]["list"]
+        assert stats["requests"] == 3
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+        assert stats["queries"] > 0
+        assert "p99" in text
+        assert Task.objects.count() == 30
+        assert not Task.objects.filter(name__startswith="bench-run").exists()
+
+    # Счётчики задач совпадают с реальными числами.
+    def test_dataset_counters(self, tmp_path):
+        self.run(tmp_path, scenario=["detail"])
+        for status in Status.objects.all():
+            assert status.task_count == status.task_set.count()
+        for label in Label.objects.all():
+            assert label.task_count == label.tasks.count()
+        # Повторный запуск не добавляет данные
+        self.run(tmp_path, scenario=["detail"])
+        assert Task.objects.count() == 30
+        assert User.objects.count() == 5
+
+    # Рост числа запросов относительно эталона — ошибка.
+    def test_baseline_regression(self, tmp_path):
+        baseline = tmp_path / "baseline.json"
+        self.run(tmp_path, scenario=["detail"], output=str(baseline))
+        data = json.loads(baseline.read_text())
+        assert "Регрессий нет" in self.run(
+            tmp_path, scenario=["detail"], baseline=str(baseline),
+            tolerance=100,
+        )
+
+        data["scenarios"]["detail"]["queries"] -= 1
+        baseline.write_text(json.dumps(data))
+        with pytest.raises(CommandError, match="detail: запросов к базе"):
+            self.run(
+                tmp_path, scenario=["detail"], baseline=str(baseline),
+                tolerance=100,
+            )
+
+    def test_missing_baseline(self, tmp_path):
+        with pytest.raises(CommandError):
+            self.run(tmp_path, baseline=str(tmp_path / "none.json"))
+
+
+@pytest.mark.django_db
+class TestGenerateDataset:
+
+    def generate(self, **options):
+        out = StringIO()
+        defaults = {"tasks": 200, "users": 10, "labels": 8, "statuses": 4}
+        call_command(
+            "generate_dataset", batch_size=64, stdout=out,
+            **{**defaults, **options},
+        )
+        return out.getvalue()
+
+    def snapshot(self):
+        return list(Task.objects.order_by("pk").values_list(
+            "name", "description", "status__name", "executor__username",
+        ))
+
+    # Счётчики после пакетной загрузки совпадают с реальными числами.
+    def test_counters(self):
+        assert "Создано задач: 200" in self.generate()
+        assert Task.objects.count() == 200
+        for status in Status.objects.all():
+            assert status.task_count == status.task_set.count()
+        for label in Label.objects.all():
+            assert label.task_count == label.tasks.count()
+        assert Task.labels.through.objects.count() > 200
+        user = User.objects.get(username="bench_user_0")
+        counters = {
+            (c.status_id, c.role): c.count for c in user.task_counters.all()
+        }
+        assert sum(
+            n for (_status, role), n in counters.items() if role == "executor"
+        ) == Task.objects.filter(executor=user).count()
+
+    # Первые исполнители получают заметно больше задач.
+    def test_skewed_executors(self):
+        self.generate(tasks=500)
+        counts = [
+            Task.objects.filter(executor__username=f"bench_user_{i}").count()
+            for i in range(10)
+        ]
+        assert counts[0] > 3 * counts[-1]
+        assert Task.objects.filter(executor=None).exists()
+
+    # Один seed — одинаковые данные; повторный запуск только дополняет.
+    def test_deterministic_and_top_up(self):
+        self.generate(seed=7)
+        first = self.snapshot()
+        Task.objects.all().delete()
+        self.generate(seed=7)
+        assert self.snapshot() == first
+
+        assert "Создано задач: 0" in self.generate(seed=7)
+        self.generate(tasks=250)
+        assert Task.objects.count() == 250
+        assert User.objects.count() == 10
+
+    def test_invalid_options(self):
+        with pytest.raises(CommandError):
+            self.generate(users=0)
@@ -0,0 +1,294 @@
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from task_manager.history.models import HistoryEntry
+from task_manager.history.writer import HistoryWriter, writer
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Task
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(
+        username="user1",
+        # NOSONAR
+        password="Password123"
+    )
+
+
+@pytest.fixture
+def status(db):
+    return Status.objects.create(name="Новый")
+
+
+@pytest.fixture
+def task(user, status):
+    return Task.objects.create(
+        name="Задача", description="Описание", author=user, status=status
+    )
+
+
+@pytest.fixture
+def client_logged(client, user):
+    client.force_login(user)
+    return client
+
+
+def entries(obj):
+    return list(
+        HistoryEntry.objects.filter(
+            model=obj._meta.label, object_id=obj.pk
+        ).order_by("id")
+    )
+
+
+@pytest.mark.django_db
+class TestHistoryRecording:
+
+    # При создании записываются заполненные поля формы.
+    def test_create(self, client_logged, user, status):
+        label = Label.objects.create(name="Срочно")
+        client_logged.post(reverse("tasks:tasks_create"), {
+            "name": "Новая",
+            "description": "Описание",
+            "status": status.pk,
+            "labels": [label.pk],
+        })
+        task = Task.objects.get(name="Новая")
+        [entry] = entries(task)
+        assert entry.action == HistoryEntry.Action.CREATE
+        assert entry.actor == user
+        assert entry.object_repr == "Новая"
+        assert entry.changes == {
+            "name": {"new": "Новая"},
+            "description": {"new": "Описание"},
+            "status": {"new": "Новый"},
+            "labels": {"added": ["Срочно"]},
+        }
+
+    # При изменении — только изменившиеся поля, старое и новое значение.
+    def test_update(self, client_logged, task):
+        label = Label.objects.create(name="Срочно")
+        done = Status.objects.create(name="Готово")
+        client_logged.post(reverse("tasks:tasks_update", args=[task.pk]), {
+            "name": "Задача",
+            "description": "Описание",
+            "status": done.pk,
+            "labels": [label.pk],
+        })
+        [entry] = entries(task)
+        assert entry.action == HistoryEntry.Action.UPDATE
+        assert entry.changes == {
+            "status": {"old": "Новый", "new": "Готово"},
+            "labels": {"added": ["Срочно"]},
+        }
+
+    # Сохранение без изменений в историю не попадает.
+    def test_update_without_changes(self, client_logged, task, status):
+        client_logged.post(reverse("tasks:tasks_update", args=[task.pk]), {
+            "name": "Задача",
+            "description": "Описание",
+            "status": status.pk,
+        })
+        assert entries(task) == []
+
+    def test_delete(self, client_logged, task):
+        pk = task.pk
+        client_logged.post(reverse("tasks:tasks_delete", args=[pk]))
+        [entry] = HistoryEntry.objects.filter(object_id=pk)
+        assert entry.action == HistoryEntry.Action.DELETE
+        assert entry.object_repr == "Задача"
+
+    # Удаление статуса записывается, неудачная попытка — нет.
+    def test_status_delete(self, client_logged, task, status):
+        client_logged.post(reverse("statuses:statuses_delete", args=[status.pk]))
+        assert entries(status) == []
+        unused = Status.objects.create(name="Лишний")
+        client_logged.post(reverse("statuses:statuses_delete", args=[unused.pk]))
+        [entry] = entries(unused)
+        assert entry.action == HistoryEntry.Action.DELETE
+
+    # Пароль при регистрации в историю не попадает.
+    def test_register(self, client):
+        client.post(reverse("users:users_create"), {
+            "first_name": "Иван",
+            "last_name": "Петров",
+            "username": "ivan",
+            "password1": "Password123",  # NOSONAR
+            "password2": "Password123",  # NOSONAR
+        })
+        [entry] = entries(User.objects.get(username="ivan"))
+        assert entry.actor is None
+        assert "password" not in str(entry.changes)
+        assert entry.changes["username"] == {"new": "ivan"}
+
+    # Удаление пользователя: автор записи — суперпользователь,
+    # удаливший другого; при удалении себя ссылаться не на кого.
+    def test_user_delete(self, client, user):
+        admin = User.objects.create_superuser(
+            username="admin",
+            # NOSONAR
+            password="Password123"
+        )
+        pk = user.pk
+        client.force_login(admin)
+        client.post(reverse("users:users_delete", args=[pk]))
+        [entry] = HistoryEntry.objects.filter(model="auth.User", object_id=pk)
+        assert entry.action == HistoryEntry.Action.DELETE
+        assert entry.actor == admin
+
+        client.post(reverse("users:users_delete", args=[admin.pk]))
+        [entry] = HistoryEntry.objects.filter(
+            model="auth.User", object_id=admin.pk
+        )
+        assert entry.actor is None
+
+    # Массовое действие — одна пакетная вставка на все задачи.
+    def test_bulk(self, client_logged, task, user, status):
+        other = Task.objects.create(
+            name="Другая", description="", author=user, status=status
+        )
+        label = Label.objects.create(name="Срочно")
+        task.labels.add(label)
+        url = reverse("tasks:tasks_bulk")
+        with CaptureQueriesContext(connection) as ctx:
+            client_logged.post(url, {
+                "tasks": [task.pk, other.pk],
+                "action": "add_label",
+                "label": label.pk,
+            })
+        inserts = [
+            q for q in ctx.captured_queries
+            if q["sql"].startswith('INSERT INTO "history_historyentry"')
+        ]
+        assert len(inserts) == 1
+        # У первой задачи метка уже была
+        assert entries(task) == []
+        [entry] = entries(other)
+        assert entry.changes == {"labels": {"added": ["Срочно"]}}
+
+        client_logged.post(url, {"tasks": [task.pk], "action": "delete"})
+        [entry] = entries(task)
+        assert entry.action == HistoryEntry.Action.DELETE
+
+    # Откаченное изменение в историю не попадает: запись ставится
+    # в очередь только после коммита транзакции.
+    def test_async_after_commit(
+        self, client_logged, task, settings, monkeypatch,
+        django_capture_on_commit_callbacks,
+    ):
+        settings.HISTORY_ASYNC = True
+        queued = []
+        monkeypatch.setattr(writer, "put", queued.extend)
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            client_logged.post(reverse("tasks:tasks_delete", args=[task.pk]))
+        assert queued == []
+        for callback in callbacks:
+            callback()
+        [entry] = queued
+        assert entry.action == HistoryEntry.Action.DELETE
+        assert entry.pk is None
+
+
+@pytest.mark.django_db
+class TestHistoryView:
+
+    # Записи задачи выводятся новыми первыми, с названиями полей.
+    def test_list(self, client_logged, task):
+        done = Status.objects.create(name="Готово")
+        client_logged.post(reverse("tasks:tasks_update", args=[task.pk]), {
+            "name": "Задача 2",
+            "description": "Описание",
+            "status": done.pk,
+        })
+        response = client_logged.get(reverse("tasks:tasks_history", args=[task.pk]))
+        assert response.status_code == 200
+        content = response.content.decode()
+        assert "Новый → Готово" in content
+        assert "Задача → Задача 2" in content
+
+    # История удалённой задачи остаётся доступной.
+    def test_deleted_task(self, client_logged, task):
+        pk = task.pk
+        client_logged.post(reverse("tasks:tasks_delete", args=[pk]))
+        response = client_logged.get(reverse("tasks:tasks_history", args=[pk]))
+        assert response.status_code == 200
+        assert "Задача" in response.content.decode()
+
+    def test_not_found(self, client_logged):
+        url = reverse("tasks:tasks_history", args=[999])
+        assert client_logged.get(url).status_code == 404
+
+    # Запрос страницы идёт по индексу (model, object_id, created_at).
+    def test_uses_index(self, task):
+        queryset = HistoryEntry.objects.filter(
+            model="tasks.Task", object_id=task.pk
+        ).order_by("-created_at", "-id")
+        assert "history_object_idx" in queryset.explain()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestHistoryWriter:
+
+    # Поток пишет накопленные записи пакетами не больше HISTORY_BATCH_SIZE.
+    def test_batches(self, user, settings, monkeypatch):
+        settings.HISTORY_BATCH_SIZE = 3
+        settings.HISTORY_FLUSH_SECONDS = 0.05
+        history = HistoryWriter()
+        batches = []
+        write = history.write
+        monkeypatch.setattr(
+            history, "write", lambda batch: batches.append(len(batch)) or write(batch)
+        )
+        history.put([
+            HistoryEntry(
+                actor=user, action=HistoryEntry.Action.UPDATE,
+                model="tasks.Task", object_id=i, object_repr=f"Задача {i}",
+            )
+            for i in range(7)
+        ])
+        history.stop()
+        assert sum(batches) == 7
+        assert max(batches) <= 3
+        assert HistoryEntry.objects.count() == 7
+
+    # Ошибка записи пакета не останавливает поток.
+    def test_write_error(self, settings, caplog):
+        settings.HISTORY_BATCH_SIZE = 1
+        history = HistoryWriter()
+        broken = HistoryEntry(action="update", model="tasks.Task", object_id=None)
+        with caplog.at_level("ERROR", logger="history"):
+            history.put([broken])
+            history.put([HistoryEntry(
+                action="update", model="tasks.Task", object_id=1,
+            )])
+            history.stop()
+        assert "Не удалось записать историю" in caplog.text
+        assert HistoryEntry.objects.count() == 1
+
+    # Из пакета с ошибочной записью теряется только она.
+    def test_write_error_in_batch(self, settings, caplog, monkeypatch):
+        settings.HISTORY_BATCH_SIZE = 10
+        settings.HISTORY_FLUSH_SECONDS = 1
+        history = HistoryWriter()
+        batches = []
+        write = history.write
+        monkeypatch.setattr(
+            history, "write", lambda batch: batches.append(len(batch)) or write(batch)
+        )
+        with caplog.at_level("ERROR", logger="history"):
+            history.put([
+                HistoryEntry(action="update", model="tasks.Task", object_id=1),
+                HistoryEntry(action="update", model="tasks.Task", object_id=None),
+                HistoryEntry(action="update", model="tasks.Task", object_id=3),
+            ])
+            history.stop()
+        assert batches == [3]
+        assert "tasks.Task None" in caplog.text
+        assert sorted(
+            HistoryEntry.objects.values_list("object_id", flat=True)
+        ) == [1, 3]
@@ -0,0 +1,144 @@
+import json
+import logging
+import logging.handlers
+import sys
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from task_manager.logs import (
+    JsonFormatter,
+    QueueHandler,
+    RequestContextFilter,
+)
+from task_manager.statuses.models import Status
+
+
+class Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(
+        username="user1",
+        # NOSONAR
+        password="Password123"
+    )
+
+
+@pytest.fixture
+def client_logged(client, user):
+    client.force_login(user)
+    return client
+
+
+# Очередь с фильтром контекста на логгере statuses: записи
+# доходят до Collect через поток QueueListener
+@pytest.fixture
+def collected():
+    collect = Collect()
+    handler = QueueHandler()
+    handler.addFilter(RequestContextFilter())
+    handler.start([collect])
+    logger = logging.getLogger("statuses")
+    logger.addHandler(handler)
+    yield handler, collect.records
+    logger.removeHandler(handler)
+    handler.close()
+
+
+@pytest.mark.django_db
+class TestRequestContext:
+
+    # id запроса возвращается в ответе, корректный входящий сохраняется.
+    def test_request_id_header(self, client):
+        response = client.get(reverse("home"))
+        assert len(response["X-Request-ID"]) == 32
+        response = client.get(reverse("home"), headers={"X-Request-ID": "abc-1"})
+        assert response["X-Request-ID"] == "abc-1"
+        response = client.get(
+            reverse("home"), headers={"X-Request-ID": "bad id\n"}
+        )
+        assert response["X-Request-ID"] != "bad id\n"
+
+    # Записи из представления получают id запроса и пользователя.
+    def test_record_context(self, client_logged, user, collected):
+        status = Status.objects.create(name="Лишний")
+        response = client_logged.post(
+            reverse("statuses:statuses_delete", args=[status.pk])
+        )
+        logging.getLogger("statuses").info("Вне запроса")
+        handler, records = collected
+        # Остановка дописывает очередь
+        handler.stop()
+
+        inside, outside = records
+        assert inside.getMessage() == f"Статус {status.pk} удален"
+        assert inside.request_id == response["X-Request-ID"]
+        assert inside.user_id == user.pk
+        assert outside.request_id is None and outside.user_id is None
+
+
+class TestQueueHandler:
+
+    # Сообщение собирается до постановки в очередь, исключение — текстом.
+    def test_prepare(self):
+        handler = QueueHandler()
+        items = ["a"]
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.getLogger("tasks").makeRecord(
+                "tasks", logging.ERROR, __file__, 1,
+                "Задачи: %s", (items,), sys.exc_info(),
+            )
+        prepared = handler.prepare(record)
+        items.append("b")
+        assert prepared.getMessage() == "Задачи: ['a']"
+        assert prepared.args is None and prepared.exc_info is None
+        assert "ValueError: boom" in prepared.exc_text
+        # Исходная запись не меняется для других обработчиков
+        assert record.args == (items,)
+
+    # Запись в файл и консоль — в потоке QueueListener (settings.LOGGING).
+    def test_settings(self):
+        [handler] = [
+            handler for handler in logging.getLogger().handlers
+            if isinstance(handler, QueueHandler)
+        ]
+        assert handler.listener is not None
+        targets = {type(target) for target in handler.listener.handlers}
+        assert logging.handlers.RotatingFileHandler in targets
+        assert logging.StreamHandler in targets
+
+
+class TestJsonFormatter:
+
+    def test_format(self):
+        record = logging.makeLogRecord({
+            "name": "tasks",
+            "levelno": logging.INFO,
+            "levelname": "INFO",
+            "msg": "Задача удалена: %s",
+            "args": ("Отчёт",),
+            "request_id": "abc",
+            "user_id": 7,
+            "status_code": 200,
+            "exc_text": "Traceback ...",
+        })
+        line = JsonFormatter().format(record)
+        assert "\n" not in line
+        data = json.loads(line)
+        assert data["message"] == "Задача удалена: Отчёт"
+        assert data["logger"] == "tasks" and data["level"] == "INFO"
+        assert data["request_id"] == "abc" and data["user_id"] == 7
+        assert data["status_code"] == 200
+        assert data["exc_info"] == "Traceback ..."
+        assert data["time"].endswith("+00:00")
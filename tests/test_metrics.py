@@ -0,0 +1,249 @@
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.db import connection
+from django.template.response import SimpleTemplateResponse
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from task_manager.labels.models import Label
+from task_manager.metrics import registry
+from task_manager.metrics.budget import (
+    QueryBudgetExceeded,
+    get_query_budget,
+    query_budget,
+)
+from task_manager.metrics.registry import Histogram
+from task_manager.routers import ReplicaReadMixin
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Task
+from task_manager.tasks.views import TaskListView
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    registry.clear()
+    yield
+    registry.clear()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(
+        username="user1",
+        # NOSONAR
+        password="Password123"
+    )
+
+
+@pytest.fixture
+def client_logged(client, user):
+    client.force_login(user)
+    return client
+
+
+def series(name, view):
+    return registry.histograms[name].series[(view,)]
+
+
+@pytest.mark.django_db
+class TestRequestMetrics:
+
+    # Число запросов в замере совпадает с тем, что видит Django.
+    def test_db_queries_and_header(self, client_logged):
+        Status.objects.create(name="Новый")
+        with CaptureQueriesContext(connection) as ctx:
+            response = client_logged.get(reverse("statuses:statuses_list"))
+        queries = len(ctx.captured_queries)
+        assert queries > 0
+        timing = response["Server-Timing"]
+        assert f'desc="{queries} queries"' in timing
+        assert "tpl;dur=" in timing and "total;dur=" in timing
+
+        counts = series("db_queries", "statuses:statuses_list")
+        assert counts[-1] == 1 and counts[-2] == queries
+        assert series("db_time", "statuses:statuses_list")[-2] > 0
+
+    # Время шаблона и размер ответа попадают в гистограммы.
+    def test_template_and_size(self, client_logged):
+        response = client_logged.get(reverse("tasks:tasks_list"))
+        assert series("template_time", "tasks:tasks_list")[-2] > 0
+        sizes = series("response_size", "tasks:tasks_list")
+        assert sizes[-2] == len(response.content)
+        duration = series("duration", "tasks:tasks_list")
+        assert duration[-2] >= series("template_time", "tasks:tasks_list")[-2]
+
+    # Страница с чтением с реплики рендерится внутри представления:
+    # время рендеринга всё равно попадает в замер.
+    def test_template_time_replica(self, client_logged, monkeypatch):
+        monkeypatch.setattr(ReplicaReadMixin, "use_replica", lambda self, request: True)
+        content = SimpleTemplateResponse.rendered_content
+        renders = []
+
+        def slow(response):
+            renders.append(response)
+            time.sleep(0.05)
+            return content.fget(response)
+
+        monkeypatch.setattr(
+            SimpleTemplateResponse, "rendered_content", property(slow)
+        )
+        client_logged.get(reverse("tasks:tasks_list"))
+        template_time = series("template_time", "tasks:tasks_list")[-2]
+        assert len(renders) == 1
+        assert template_time >= 0.05
+
+    # Потоковый ответ не учитывается в размере, неизвестный адрес
+    # записывается под общей меткой.
+    def test_streaming_and_unresolved(self, client_logged):
+        client_logged.get(reverse("tasks:tasks_export"))
+        assert ("tasks:tasks_export",) in registry.histograms["duration"].series
+        assert ("tasks:tasks_export",) not in registry.histograms["response_size"].series
+        client_logged.get("/no-such-page/")
+        assert registry.responses.series[("<unresolved>", "GET", "404")] == 1
+
+    # Вне запроса (manage.py, тесты) обёртка ничего не считает.
+    def test_no_metrics_outside_request(self, client_logged):
+        client_logged.get(reverse("home"))
+        Status.objects.create(name="Новый")
+        assert list(Status.objects.all())
+        assert series("db_queries", "home")[-1] == 1
+
+    def test_server_timing_disabled(self, client_logged, settings):
+        settings.METRICS_SERVER_TIMING = False
+        response = client_logged.get(reverse("home"))
+        assert "Server-Timing" not in response
+
+    # Под ASGI запросы к базе из sync_to_async попадают в замер.
+    def test_asgi(self, user):
+        client = AsyncClient()
+        client.force_login(user)
+        response = async_to_sync(client.get)(reverse("statuses:statuses_list"))
+        assert response.status_code == 200
+        assert series("db_queries", "statuses:statuses_list")[-2] > 0
+        assert "Server-Timing" in response
+
+
+@pytest.mark.django_db
+class TestMetricsView:
+
+    # Метрики доступны персоналу и по токену.
+    def test_access(self, client, client_logged, user, settings):
+        url = reverse("metrics")
+        assert client.get(url).status_code == 403
+        assert client_logged.get(url).status_code == 403
+
+        settings.METRICS_TOKEN = "secret"  # NOSONAR
+        headers = {"Authorization": "Bearer secret"}
+        assert client.get(url, headers=headers).status_code == 200
+        headers = {"Authorization": "Bearer wrong"}
+        assert client.get(url, headers=headers).status_code == 403
+
+        user.is_staff = True
+        user.save()
+        response = client_logged.get(url)
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+
+    def test_exposition(self, client_logged, user):
+        user.is_staff = True
+        user.save()
+        client_logged.get(reverse("statuses:statuses_list"))
+        text = client_logged.get(reverse("metrics")).content.decode()
+        assert "# TYPE task_manager_request_duration_seconds histogram" in text
+        assert (
+            'task_manager_request_duration_seconds_bucket'
+            '{view="statuses:statuses_list",le="+Inf"} 1'
+        ) in text
+        assert (
+            'task_manager_http_responses_total'
+            '{view="statuses:statuses_list",method="GET",status="200"} 1'
+        ) in text
+        assert 'task_manager_cache_hits_total{cache="default"}' in text
+
+
+class TestHistogram:
+
+    # Корзины накопительные, значение на границе попадает в неё.
+    def test_buckets(self):
+        histogram = Histogram("sample", "Пример.", (1, 5))
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(("v",), value)
+        lines = list(histogram.render())
+        assert 'task_manager_sample_bucket{view="v",le="1"} 2' in lines
+        assert 'task_manager_sample_bucket{view="v",le="5"} 3' in lines
+        assert 'task_manager_sample_bucket{view="v",le="+Inf"} 4' in lines
+        assert 'task_manager_sample_sum{view="v"} 14.5' in lines
+        assert 'task_manager_sample_count{view="v"} 4' in lines
+
+
+@pytest.fixture
+def tasks(user):
+    status = Status.objects.create(name="Новый")
+    label = Label.objects.create(name="Срочно")
+    for i in range(4):
+        task = Task.objects.create(
+            name=f"Задача {i}", description="", author=user, status=status
+        )
+        task.labels.add(label)
+
+
+# Список без select_related: статус и автор читаются отдельными
+# запросами на каждую строку таблицы
+@pytest.fixture
+def n_plus_one(monkeypatch):
+    monkeypatch.setattr(TaskListView, "queryset", Task.objects.all())
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+
+    # В тестах превышение бюджета — исключение (tests/conftest.py).
+    def test_raises(self, client_logged, tasks, n_plus_one):
+        with pytest.raises(QueryBudgetExceeded, match="tasks:tasks_list"):
+            client_logged.get(reverse("tasks:tasks_list"))
+
+    # В режиме warn — предупреждение со стеками повторяющихся запросов.
+    def test_warns_with_duplicates(
+        self, client_logged, tasks, n_plus_one, settings, caplog
+    ):
+        settings.QUERY_BUDGET = "warn"
+        with caplog.at_level("WARNING", logger="metrics"):
+            response = client_logged.get(reverse("tasks:tasks_list"))
+        assert response.status_code == 200
+        message = caplog.records[-1].getMessage()
+        assert "при бюджете 8" in message
+        assert "4 раз: SELECT" in message
+        assert "statuses_status" in message
+        # Стек показывает строку шаблона, где выполняется запрос
+        assert "tasks/list.html" in message
+        assert "{{ task.status }}" in message
+
+    def test_within_budget(self, client_logged, tasks, settings, caplog):
+        settings.QUERY_BUDGET = "warn"
+        with caplog.at_level("WARNING", logger="metrics"):
+            client_logged.get(reverse("tasks:tasks_list"))
+        assert not caplog.records
+
+    # Без проверки стеки запросов не собираются.
+    def test_off(self, client_logged, tasks, n_plus_one, settings, monkeypatch):
+        settings.QUERY_BUDGET = "off"
+        calls = []
+        monkeypatch.setattr(
+            "task_manager.metrics.middleware.capture_stack",
+            lambda: calls.append(1),
+        )
+        assert client_logged.get(reverse("tasks:tasks_list")).status_code == 200
+        assert not calls
+
+    def test_declaration(self):
+        @query_budget(2)
+        def view(request):
+            pass
+
+        assert get_query_budget(view) == 2
+        assert get_query_budget(TaskListView.as_view()) == TaskListView.query_budget
+        assert get_query_budget(lambda request: None) is None
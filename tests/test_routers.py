@@ -0,0 +1,88 @@
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory
+from django.urls import reverse
+
+from task_manager.routers import (
+    PINNED_SESSION_KEY,
+    ReplicaReadMixin,
+    ReplicaRouter,
+    replica_reads,
+)
+from task_manager.versioning import bump_version, version_key
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ["replica"]
+    settings.DATABASE_REPLICA_PIN_SECONDS = 5
+
+
+class TestReplicaRouter:
+
+    # Без явного разрешения чтения идут на основную базу.
+    def test_reads(self, replicas):
+        router = ReplicaRouter()
+        assert router.db_for_read(User) == "default"
+        with replica_reads():
+            assert router.db_for_read(User) == "replica"
+            assert router.db_for_write(User) == "default"
+        assert router.db_for_read(User) == "default"
+
+    def test_no_replicas_configured(self):
+        with replica_reads():
+            assert ReplicaRouter().db_for_read(User) == "default"
+
+    def test_migrate_only_primary(self):
+        router = ReplicaRouter()
+        assert router.allow_migrate("default", "tasks")
+        assert not router.allow_migrate("replica", "tasks")
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("replicas")
+class TestReplicaReadMixin:
+
+    def request(self, method="get", session=None):
+        request = getattr(RequestFactory(), method)("/")
+        request.session = session or {}
+        return request
+
+    def view(self):
+        view = ReplicaReadMixin()
+        view.replica_namespaces = ("users",)
+        return view
+
+    def age_version(self, namespace, seconds):
+        cache.set(version_key(namespace), time.time_ns() - int(seconds * 1e9))
+
+    # Старые данные читаются с реплики, недавно изменённые — с основной базы.
+    def test_recent_changes_use_primary(self):
+        self.age_version("users", 60)
+        assert self.view().use_replica(self.request())
+        bump_version("users")
+        assert not self.view().use_replica(self.request())
+
+    def test_unsafe_method_uses_primary(self):
+        self.age_version("users", 60)
+        assert not self.view().use_replica(self.request("post"))
+
+    # После POST сеанс закреплён за основной базой.
+    def test_pinned_session(self, client):
+        self.age_version("users", 60)
+        client.post(reverse("login"), {"username": "x", "password": "y"})  # NOSONAR
+        session = client.session
+        assert session[PINNED_SESSION_KEY] > time.time()
+        assert not self.view().use_replica(self.request(session=session))
+        session[PINNED_SESSION_KEY] = time.time() - 1
+        assert self.view().use_replica(self.request(session=session))
+
+    def test_disabled_without_replicas(self, client, settings):
+        settings.DATABASE_REPLICAS = []
+        self.age_version("users", 60)
+        assert not self.view().use_replica(self.request())
+        client.post(reverse("login"), {"username": "x", "password": "y"})  # NOSONAR
+        assert PINNED_SESSION_KEY not in client.session
@@ -0,0 +1,72 @@
+import runpy
+import sys
+import types
+
+import pytest
+from django.db.backends.postgresql.base import DatabaseWrapper
+
+from task_manager import settings as project_settings
+
+
+class ConnectionPool:
+    """Замена psycopg_pool.ConnectionPool: запоминает параметры пула."""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    @staticmethod
+    def check_connection(connection):
+        pass
+
+
+def load_settings(monkeypatch, **env):
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(project_settings.__file__)
+
+
+# psycopg 3 и psycopg_pool в окружении тестов нет: подменяем модуль пула,
+# параметры подключения (их собирает psycopg 3) не нужны
+@pytest.fixture
+def psycopg_pool(monkeypatch):
+    monkeypatch.setattr(DatabaseWrapper, "get_connection_params", lambda self: {})
+    module = types.ModuleType("psycopg_pool")
+    module.ConnectionPool = ConnectionPool
+    monkeypatch.setitem(sys.modules, "psycopg_pool", module)
+    monkeypatch.setattr(DatabaseWrapper, "_connection_pools", {})
+    return module
+
+
+class TestDatabasePool:
+
+    # Бэкенд Django собирает пул из опций настроек; проверку соединения
+    # задаёт CONN_HEALTH_CHECKS, а не опции пула.
+    @pytest.mark.parametrize("health_checks", ["True", "False"])
+    def test_pool_options(self, monkeypatch, psycopg_pool, health_checks):
+        config = load_settings(
+            monkeypatch,
+            DATABASE_URL="postgres://user:secret@db:5432/tasks",  # NOSONAR
+            DB_POOL="True",
+            DB_POOL_MAX_SIZE="4",
+            DB_CONN_HEALTH_CHECKS=health_checks,
+        )
+        database = config["DATABASES"]["default"]
+        assert database["CONN_MAX_AGE"] == 0
+        assert "check" not in database["OPTIONS"]["pool"]
+
+        pool = DatabaseWrapper(database, alias="default").pool
+        assert pool.kwargs["max_size"] == 4
+        assert pool.kwargs["open"] is False
+        if health_checks == "True":
+            assert pool.kwargs["check"] is ConnectionPool.check_connection
+        else:
+            assert pool.kwargs["check"] is None
+
+    # Без DB_POOL пула нет, постоянные соединения по DB_CONN_MAX_AGE.
+    def test_without_pool(self, monkeypatch):
+        config = load_settings(
+            monkeypatch,
+            DATABASE_URL="postgres://user:secret@db:5432/tasks",  # NOSONAR
+            DB_POOL="False",
+        )
+        assert "pool" not in config["DATABASES"]["default"].get("OPTIONS", {})
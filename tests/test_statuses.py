@@ -1,9 +1,13 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth.models import User
 from django.contrib.messages import get_messages
 
+from task_manager.deletion import usage_counts
 from task_manager.statuses.models import Status
+from task_manager.tasks.models import Task
 
 
 @pytest.mark.django_db
@@ -74,3 +78,20 @@ class TestStatusCRUD:
         assert response.status_code == 200
         assert not Status.objects.filter(pk=status.pk).exists()
 
+
+    #  Используемый статус не удаляется, счётчики ссылок — одним запросом.
+    def test_delete_used_status(self, client_logged, user):
+        status = Status.objects.create(name="Занятый")
+        for i in range(2):
+            Task.objects.create(
+                name=f"Задача {i}", description="", author=user, status=status
+            )
+        with CaptureQueriesContext(connection) as ctx:
+            assert usage_counts(status) == {"task_set": 2}
+        assert len(ctx.captured_queries) == 1
+
+        url = reverse("statuses:statuses_delete", args=[status.pk])
+        response = client_logged.post(url, follow=True)
+        assert Status.objects.filter(pk=status.pk).exists()
+        messages = [str(m) for m in get_messages(response.wsgi_request)]
+        assert any("используется" in m for m in messages)
@@ -1,10 +1,25 @@
+import base64
+import csv
+import json
+import re
+from io import StringIO
+
 import pytest
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth.models import User
 from django.contrib.messages import get_messages
 
+from task_manager.labels.models import Label
 from task_manager.statuses.models import Status
-from task_manager.tasks.models import Task
+from task_manager.tasks import search
+from task_manager.tasks.models import Task, TaskCounter
+from task_manager.tasks.views import TaskListView
 
 
 @pytest.fixture
@@ -98,3 +113,879 @@ class TestTaskCRUD:
         assert response.status_code == 200
         assert not Task.objects.filter(pk=task.pk).exists()
 
+
+
+#  Создаёт n задач с исполнителем и метками,
+#  чтобы шаблон обращался ко всем связям.
+def make_tasks(n, user, status):
+    label = Label.objects.create(name=f"Метка {n}")
+    for i in range(n):
+        task = Task.objects.create(
+            name=f"Задача {i}",
+            description="Описание",
+            author=user,
+            executor=user,
+            status=status
+        )
+        task.labels.add(label)
+
+
+#  Первый запрос прогревает кеш вариантов фильтра,
+#  считаем запросы в установившемся режиме.
+def count_queries(client, url):
+    client.get(url)
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+class TestTaskQueryCount:
+    #  Число запросов списка задач не должно зависеть от количества строк.
+    def test_list_queries_do_not_grow(self, client_logged, user, status):
+        url = reverse("tasks:tasks_list")
+        make_tasks(1, user, status)
+        baseline = count_queries(client_logged, url)
+        make_tasks(20, user, status)
+        assert count_queries(client_logged, url) == baseline
+
+    #  Карточка задачи загружает связи фиксированным числом запросов.
+    def test_detail_queries_do_not_grow(self, client_logged, user, status):
+        make_tasks(1, user, status)
+        task = Task.objects.get()
+        url = reverse("tasks:tasks_detail", args=[task.pk])
+        baseline = count_queries(client_logged, url)
+        task.labels.add(*[Label.objects.create(name=f"Ещё {i}") for i in range(5)])
+        assert count_queries(client_logged, url) == baseline
+
+
+@pytest.mark.django_db
+class TestTaskPagination:
+
+    @pytest.fixture(autouse=True)
+    def small_pages(self, monkeypatch):
+        monkeypatch.setattr(TaskListView, "paginate_by", 2)
+
+    #  Проходит все страницы по курсорам next и собирает id задач.
+    def walk(self, client, params=None):
+        url = reverse("tasks:tasks_list")
+        params = dict(params or {})
+        seen = []
+        while True:
+            response = client.get(url, params)
+            assert response.status_code == 200
+            page = response.context["page_obj"]
+            seen.extend(task.id for task in page)
+            if not page.has_next():
+                return seen
+            params["cursor"] = page.next_cursor
+
+    def test_pages_cover_all_tasks_in_order(self, client_logged, user, status):
+        make_tasks(5, user, status)
+        expected = list(
+            Task.objects.order_by("created_at", "id").values_list("id", flat=True)
+        )
+        assert self.walk(client_logged) == expected
+
+    def test_pagination_keeps_filter(self, client_logged, user, status):
+        other = Status.objects.create(name="Другой")
+        make_tasks(3, user, status)
+        make_tasks(3, user, other)
+        seen = self.walk(client_logged, {"status": other.pk})
+        assert set(seen) == set(
+            Task.objects.filter(status=other).values_list("id", flat=True)
+        )
+
+    #  Вставка новой задачи не сдвигает уже выданную страницу.
+    def test_stable_under_inserts(self, client_logged, user, status):
+        make_tasks(4, user, status)
+        url = reverse("tasks:tasks_list")
+        first = client_logged.get(url).context["page_obj"]
+        make_tasks(1, user, status)
+        second = client_logged.get(
+            url, {"cursor": first.next_cursor}
+        ).context["page_obj"]
+        assert not {t.id for t in first} & {t.id for t in second}
+
+        previous = client_logged.get(
+            url, {"cursor": second.previous_cursor}
+        ).context["page_obj"]
+        assert [t.id for t in previous] == [t.id for t in first]
+
+    def test_invalid_cursor(self, client_logged):
+        url = reverse("tasks:tasks_list")
+        response = client_logged.get(url, {"cursor": "мусор"})
+        assert response.status_code == 404
+
+    # Курсор читается, но значения ключей подделаны.
+    @pytest.mark.parametrize("values", [
+        ["не дата", 1], ["2024-01-01T00:00:00+00:00", "x"],
+        [None, 1], [[], {}],
+    ])
+    def test_tampered_cursor(self, client_logged, values):
+        payload = json.dumps({"d": "next", "v": values}).encode()
+        cursor = base64.urlsafe_b64encode(payload).decode()
+        url = reverse("tasks:tasks_list")
+        response = client_logged.get(url, {"cursor": cursor})
+        assert response.status_code == 404
+        response = client_logged.get(reverse("api:tasks"), {"cursor": cursor})
+        assert response.status_code == 400
+
+
+#  Каждая комбинация фильтров TaskFilter должна идти по индексу.
+@pytest.mark.django_db
+def test_explain_task_filters_uses_indexes(user, status):
+    make_tasks(3, user, status)
+    out = StringIO()
+    call_command("explain_task_filters", "--fail-on-scan", stdout=out)
+    output = out.getvalue()
+    assert "status+executor+labels+own_task" in output
+    assert "tasks_task_labels_label_task_idx" in output
+
+
+@pytest.mark.django_db
+class TestTaskChoicesCache:
+    #  Повторный рендер формы не читает статусы, метки и пользователей.
+    def test_form_choices_are_cached(self, client_logged, user, status):
+        url = reverse("tasks:tasks_create")
+        client_logged.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = client_logged.get(url)
+        sql = " ".join(q["sql"] for q in ctx.captured_queries)
+        assert "statuses_status" not in sql
+        assert "labels_label" not in sql
+        assert status.name in response.content.decode()
+
+    #  Новый статус и переименованный пользователь сразу видны в списках.
+    def test_choices_invalidated_on_save(self, client_logged, user):
+        url = reverse("tasks:tasks_list")
+        client_logged.get(url)
+        Status.objects.create(name="Свежий статус")
+        user.first_name = "Иван"
+        user.save()
+        content = client_logged.get(url).content.decode()
+        assert "Свежий статус" in content
+        assert "Иван" in content
+
+    #  Выбранное значение отмечено и в закешированном списке.
+    def test_selected_choice_rendered(self, client_logged, task):
+        url = reverse("tasks:tasks_update", args=[task.pk])
+        content = client_logged.get(url).content.decode()
+        assert f'value="{task.status.pk}" selected' in content
+
+
+@pytest.mark.django_db
+class TestAutocomplete:
+
+    @pytest.fixture
+    def people(self, db):
+        return [
+            User.objects.create_user(
+                username=username, first_name=first, last_name=last
+            )
+            for username, first, last in [
+                ("ivanov", "Иван", "Иванов"),
+                ("petrov", "Пётр", "Петров"),
+                ("ivashka", "Ваня", "Сидоров"),
+            ]
+        ]
+
+    def test_requires_login(self, client):
+        url = reverse("tasks:autocomplete_executors")
+        assert client.get(url, {"q": "iv"}).status_code == 401
+
+    def test_executor_prefix_search(self, client_logged, people):
+        url = reverse("tasks:autocomplete_executors")
+        response = client_logged.get(url, {"q": "iva"})
+        results = response.json()["results"]
+        assert [r["username"] for r in results] == ["ivanov", "ivashka"]
+        assert results[0]["text"] == "Иван Иванов"
+
+    #  Несколько слов сужают поиск: каждое — префикс одного из полей.
+    def test_executor_search_by_full_name(self, client_logged, people):
+        url = reverse("tasks:autocomplete_executors")
+        response = client_logged.get(url, {"q": "Пётр Пет"})
+        assert [r["username"] for r in response.json()["results"]] == ["petrov"]
+
+    def test_limit(self, client_logged, people):
+        url = reverse("tasks:autocomplete_executors")
+        response = client_logged.get(url, {"limit": "2"})
+        assert len(response.json()["results"]) == 2
+
+    def test_label_search(self, client_logged):
+        Label.objects.create(name="bug")
+        Label.objects.create(name="feature")
+        url = reverse("tasks:autocomplete_labels")
+        response = client_logged.get(url, {"q": "BU"})
+        assert [r["text"] for r in response.json()["results"]] == ["bug"]
+
+    #  В режиме подсказок форма рендерит только выбранного исполнителя.
+    def test_form_renders_only_selected(
+        self, client_logged, settings, people, task
+    ):
+        settings.TASK_AUTOCOMPLETE_FIELDS = ["executor", "labels"]
+        task.executor = people[0]
+        task.save()
+        url = reverse("tasks:tasks_update", args=[task.pk])
+        content = client_logged.get(url).content.decode()
+        assert 'data-autocomplete-url="/tasks/autocomplete/executors/"' in content
+        assert "Иван Иванов" in content
+        assert "Пётр Петров" not in content
+
+
+@pytest.mark.django_db
+class TestTaskSearch:
+
+    @pytest.fixture
+    def tasks(self, user, status):
+        data = [
+            ("Починить отчёт", "Отчёт падает при экспорте"),
+            ("Обновить зависимости", "Заодно проверить отчёт"),
+            ("Написать тесты", "Покрыть модуль задач"),
+        ]
+        return [
+            Task.objects.create(
+                name=name, description=description, author=user, status=status
+            )
+            for name, description in data
+        ]
+
+    def search(self, client, **params):
+        response = client.get(reverse("tasks:tasks_list"), params)
+        assert response.status_code == 200
+        return [task.name for task in response.context["tasks"]]
+
+    #  Совпадение в имени ранжируется выше совпадения в описании.
+    def test_search_ranks_name_first(self, client_logged, tasks):
+        assert self.search(client_logged, q="отчёт") == [
+            "Починить отчёт", "Обновить зависимости"
+        ]
+
+    def test_search_by_prefix(self, client_logged, tasks):
+        assert self.search(client_logged, q="тест") == ["Написать тесты"]
+
+    def test_search_index_follows_updates(self, client_logged, tasks):
+        task = tasks[2]
+        task.name = "Переименованная"
+        task.save()
+        assert self.search(client_logged, q="переименованная") == ["Переименованная"]
+        task.delete()
+        assert self.search(client_logged, q="переименованная") == []
+
+    def test_search_with_filter_and_pages(
+        self, client_logged, monkeypatch, tasks, user
+    ):
+        monkeypatch.setattr(TaskListView, "paginate_by", 1)
+        url = reverse("tasks:tasks_list")
+        first = client_logged.get(url, {"q": "отчёт", "executor": ""})
+        page = first.context["page_obj"]
+        second = client_logged.get(
+            url, {"q": "отчёт", "cursor": page.next_cursor}
+        ).context["page_obj"]
+        assert [t.name for t in page] == ["Починить отчёт"]
+        assert [t.name for t in second] == ["Обновить зависимости"]
+        assert not second.has_next()
+
+    #  Задачи с одинаковым рангом не повторяются и не теряются
+    #  между страницами: при равенстве ранга сравнивается id.
+    def test_equal_rank_pages(self, client_logged, monkeypatch, user, status):
+        monkeypatch.setattr(TaskListView, "paginate_by", 2)
+        for _ in range(5):
+            Task.objects.create(
+                name="Отчёт", description="Квартальный",
+                author=user, status=status,
+            )
+        url = reverse("tasks:tasks_list")
+        params = {"q": "отчёт"}
+        seen = []
+        while True:
+            page = client_logged.get(url, params).context["page_obj"]
+            seen.extend(task.id for task in page)
+            if not page.has_next():
+                break
+            params["cursor"] = page.next_cursor
+        assert seen == sorted(Task.objects.values_list("id", flat=True))
+
+    #  На PostgreSQL ранг — double precision, а не real ts_rank().
+    def test_postgresql_rank_is_double(self):
+        queryset = search._search_postgresql(Task.objects.all(), "отчёт")
+        rank = queryset.query.annotations["search_rank"]
+        assert isinstance(rank, Cast)
+        assert isinstance(rank.output_field, FloatField)
+
+    def test_quotes_in_query(self, client_logged, tasks):
+        assert self.search(client_logged, q='"отчёт') == [
+            "Починить отчёт", "Обновить зависимости"
+        ]
+
+    def test_admin_search(self, client, tasks):
+        User.objects.create_superuser(
+            "admin",
+            # NOSONAR
+            password="admin"
+        )
+        client.login(
+            username="admin",
+            # NOSONAR
+            password="admin"
+        )
+        response = client.get("/admin/tasks/task/", {"q": "тесты"})
+        assert response.status_code == 200
+
+
+@pytest.mark.django_db
+class TestTaskExport:
+
+    def export(self, client, **params):
+        response = client.get(reverse("tasks:tasks_export"), params)
+        assert response.status_code == 200
+        assert response.streaming
+        return b"".join(response.streaming_content).decode()
+
+    def test_requires_login(self, client):
+        response = client.get(reverse("tasks:tasks_export"))
+        assert response.status_code == 302
+
+    def test_export_csv(self, client_logged, user, status):
+        make_tasks(3, user, status)
+        rows = list(csv.DictReader(StringIO(self.export(client_logged))))
+        assert [row["name"] for row in rows] == [
+            "Задача 0", "Задача 1", "Задача 2"
+        ]
+        assert rows[0]["status"] == status.name
+        assert rows[0]["labels"] == "Метка 3"
+
+    def test_export_jsonl_with_filter(self, client_logged, user, status):
+        other = Status.objects.create(name="Другой")
+        make_tasks(2, user, status)
+        make_tasks(1, user, other)
+        content = self.export(client_logged, format="jsonl", status=other.pk)
+        rows = [json.loads(line) for line in content.splitlines()]
+        assert len(rows) == 1
+        assert rows[0]["status"] == "Другой"
+        assert rows[0]["labels"] == ["Метка 1"]
+
+    def test_unknown_format(self, client_logged):
+        response = client_logged.get(
+            reverse("tasks:tasks_export"), {"format": "xml"}
+        )
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestImportTasks:
+
+    def write_csv(self, path, rows):
+        with path.open("w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["name", "description", "status", "author", "executor", "labels"])
+            writer.writerows(rows)
+        return path
+
+    def test_import_csv(self, tmp_path, user, status):
+        path = self.write_csv(tmp_path / "tasks.csv", [
+            ["Первая", "Описание", status.name, user.username, "", "bug;ui"],
+            ["Вторая", "Описание", status.name, user.username, user.username, ""],
+        ])
+        out = StringIO()
+        call_command(
+            "import_tasks", str(path), "--create-missing", stdout=out
+        )
+        assert "строк/с" in out.getvalue()
+        first = Task.objects.get(name="Первая")
+        assert sorted(first.labels.values_list("name", flat=True)) == ["bug", "ui"]
+        assert Task.objects.get(name="Вторая").executor == user
+        assert not (tmp_path / "tasks.csv.checkpoint").exists()
+
+    #  Выгрузка и загрузка используют один формат.
+    def test_import_export_roundtrip(self, tmp_path, client_logged, user, status):
+        make_tasks(3, user, status)
+        response = client_logged.get(reverse("tasks:tasks_export"), {"format": "jsonl"})
+        path = tmp_path / "tasks.jsonl"
+        path.write_bytes(b"".join(response.streaming_content))
+        call_command("import_tasks", str(path), stdout=StringIO())
+        assert Task.objects.count() == 6
+        assert Task.objects.filter(labels__name="Метка 3").count() == 6
+
+    #  После ошибки повторный запуск продолжает с последнего пакета.
+    def test_resume_after_failure(self, tmp_path, user, status):
+        rows = [
+            [f"Задача {i}", "", status.name, user.username, "", ""]
+            for i in range(5)
+        ]
+        rows[3][2] = "Нет такого"
+        path = self.write_csv(tmp_path / "tasks.csv", rows)
+        with pytest.raises(CommandError, match="Строка 4"):
+            call_command(
+                "import_tasks", str(path), "--batch-size", "2", stdout=StringIO()
+            )
+        assert Task.objects.count() == 2
+
+        rows[3][2] = status.name
+        self.write_csv(path, rows)
+        call_command(
+            "import_tasks", str(path), "--batch-size", "2", stdout=StringIO()
+        )
+        assert sorted(Task.objects.values_list("name", flat=True)) == [
+            f"Задача {i}" for i in range(5)
+        ]
+
+    #  Статусы и метки из пакета с ошибкой откатываются вместе с ним.
+    def test_create_missing_rolled_back(self, tmp_path, user, status):
+        path = self.write_csv(tmp_path / "tasks.csv", [
+            ["Первая", "", "Новый статус", user.username, "", "новая"],
+            ["", "", status.name, user.username, "", ""],
+        ])
+        with pytest.raises(CommandError, match="Строка 2"):
+            call_command(
+                "import_tasks", str(path), "--create-missing", stdout=StringIO()
+            )
+        assert not Status.objects.filter(name="Новый статус").exists()
+        assert not Label.objects.filter(name="новая").exists()
+        assert not Task.objects.exists()
+
+
+@pytest.mark.django_db
+class TestTaskBulkActions:
+
+    @pytest.fixture
+    def tasks(self, user, status):
+        make_tasks(5, user, status)
+        return list(Task.objects.order_by("id"))
+
+    def bulk(self, client, tasks, **data):
+        data["tasks"] = [task.pk for task in tasks]
+        return client.post(reverse("tasks:tasks_bulk"), data, follow=True)
+
+    # Статус всех выбранных задач меняется одним UPDATE.
+    def test_set_status_single_update(self, client_logged, tasks):
+        done = Status.objects.create(name="Готово")
+        with CaptureQueriesContext(connection) as ctx:
+            self.bulk(client_logged, tasks, action="set_status", status=done.pk)
+        updates = [
+            q for q in ctx.captured_queries
+            if q["sql"].startswith('UPDATE "tasks_task" ')
+        ]
+        assert len(updates) == 1
+        assert Task.objects.filter(status=done).count() == 5
+
+    # Исполнитель назначается только выбранным задачам.
+    def test_set_executor(self, client_logged, tasks):
+        other = User.objects.create_user(username="other")
+        self.bulk(client_logged, tasks[:2], action="set_executor", executor=other.pk)
+        assert Task.objects.filter(executor=other).count() == 2
+
+    # Повторное добавление метки не дублирует связь.
+    def test_add_and_remove_label(self, client_logged, tasks):
+        label = Label.objects.create(name="Срочно")
+        tasks[0].labels.add(label)
+        self.bulk(client_logged, tasks, action="add_label", label=label.pk)
+        assert label.tasks.count() == 5
+        self.bulk(client_logged, tasks[:3], action="remove_label", label=label.pk)
+        assert set(label.tasks.all()) == set(tasks[3:])
+
+    # Чужие задачи массовое удаление пропускает.
+    def test_delete_only_own(self, client_logged, tasks, status):
+        other = User.objects.create_user(username="other")
+        foreign = Task.objects.create(
+            name="Чужая", description="", author=other, status=status
+        )
+        response = self.bulk(client_logged, tasks + [foreign], action="delete")
+        assert list(Task.objects.all()) == [foreign]
+        messages = [str(m) for m in get_messages(response.wsgi_request)]
+        assert any("только ее автор" in m for m in messages)
+
+    # Без статуса действие не выполняется.
+    def test_missing_required_field(self, client_logged, tasks, status):
+        self.bulk(client_logged, tasks, action="set_status")
+        assert Task.objects.filter(status=status).count() == 5
+
+    # В журнал пишется одна строка на всю операцию.
+    def test_single_log_line(self, client_logged, tasks, caplog):
+        with caplog.at_level("INFO", logger="tasks"):
+            self.bulk(client_logged, tasks, action="delete")
+        assert len(caplog.records) == 1
+        assert "задач 5 из 5" in caplog.text
+
+
+def counters(user):
+    return {
+        (row.status_id, row.role): row.count
+        for row in TaskCounter.objects.filter(user=user, count__gt=0)
+    }
+
+
+@pytest.mark.django_db
+class TestTaskCounters:
+
+    @pytest.fixture
+    def other(self, db):
+        return User.objects.create_user(username="other")
+
+    # Создание задачи увеличивает счётчики автора и исполнителя.
+    def test_create(self, user, other, status):
+        Task.objects.create(
+            name="Задача", description="", author=user, executor=other,
+            status=status,
+        )
+        assert counters(user) == {(status.pk, "author"): 1}
+        assert counters(other) == {(status.pk, "executor"): 1}
+
+    # Смена статуса и исполнителя переносит задачу между счётчиками.
+    def test_update(self, task, user, other):
+        done = Status.objects.create(name="Готово")
+        task.status = done
+        task.executor = other
+        task.save()
+        assert counters(user) == {(done.pk, "author"): 1}
+        assert counters(other) == {(done.pk, "executor"): 1}
+
+    # Сохранение без изменения связей счётчики не трогает.
+    def test_update_name_only(self, task, user, status):
+        with CaptureQueriesContext(connection) as ctx:
+            task.name = "Новое имя"
+            task.save(update_fields=["name"])
+        assert len(ctx.captured_queries) == 1
+        assert counters(user) == {(status.pk, "author"): 1}
+
+    def test_delete(self, task, user):
+        task.delete()
+        assert counters(user) == {}
+
+    # Строки счётчиков и статусов обновляются по возрастанию ключа,
+    # в каком бы направлении ни переносилась задача: встречные
+    # переносы s1 -> s2 и s2 -> s1 блокируют строки в одном порядке.
+    def test_update_order(self, task, user, status):
+        first = Status.objects.create(name="Первый")
+        task.status = first
+        task.save()
+        with CaptureQueriesContext(connection) as ctx:
+            task.status = status
+            task.save()
+        counter_ids = [
+            int(re.search(r'"status_id" = (\d+)', q["sql"]).group(1))
+            for q in ctx.captured_queries
+            if q["sql"].startswith('UPDATE "tasks_taskcounter"')
+        ]
+        assert counter_ids == sorted(counter_ids) and len(counter_ids) == 2
+        [lock] = [
+            q["sql"] for q in ctx.captured_queries
+            if 'FROM "statuses_status"' in q["sql"]
+        ]
+        assert "ORDER BY" in lock
+
+    # Массовые действия и импорт обходят Task.save(), но счётчики сходятся.
+    def test_bulk_and_import_match_rebuild(
+        self, client_logged, user, other, status, tmp_path
+    ):
+        make_tasks(4, user, status)
+        done = Status.objects.create(name="Готово")
+        ids = list(Task.objects.values_list("pk", flat=True))
+        url = reverse("tasks:tasks_bulk")
+        client_logged.post(url, {"tasks": ids[:3], "action": "set_status",
+                                 "status": done.pk})
+        client_logged.post(url, {"tasks": ids[1:], "action": "set_executor",
+                                 "executor": other.pk})
+        client_logged.post(url, {"tasks": ids[:1], "action": "delete"})
+        path = tmp_path / "tasks.jsonl"
+        path.write_text(json.dumps({
+            "name": "Импорт", "status": "Готово", "author": "other",
+            "executor": "user1",
+        }, ensure_ascii=False) + "\n", encoding="utf-8")
+        call_command("import_tasks", str(path), stdout=StringIO())
+
+        maintained = counters(user), counters(other)
+        TaskCounter.objects.rebuild()
+        assert (counters(user), counters(other)) == maintained
+        assert maintained[0] == {
+            (done.pk, "author"): 2, (status.pk, "author"): 1,
+            (done.pk, "executor"): 1,
+        }
+
+    # Главная страница показывает сводку без COUNT(*) по задачам.
+    def test_dashboard(self, client_logged, task, status):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client_logged.get(reverse("home"))
+        assert not any(
+            "tasks_task" in q["sql"] and "COUNT" in q["sql"]
+            for q in ctx.captured_queries
+        )
+        assert response.context["dashboard"] == [{
+            "status_id": status.pk, "status": status.name,
+            "author": 1, "executor": 0,
+        }]
+
+
+def task_counts(*objects):
+    return [
+        type(obj).objects.values_list("task_count", flat=True).get(pk=obj.pk)
+        for obj in objects
+    ]
+
+
+@pytest.mark.django_db
+class TestTaskCountColumns:
+
+    @pytest.fixture
+    def labels(self, db):
+        return [Label.objects.create(name=name) for name in ("А", "Б", "В")]
+
+    # Создание, смена статуса и удаление задачи сдвигают счётчик статуса.
+    def test_status_count(self, task, status):
+        done = Status.objects.create(name="Готово")
+        assert task_counts(status, done) == [1, 0]
+        task.status = done
+        task.save()
+        assert task_counts(status, done) == [0, 1]
+        task.delete()
+        assert task_counts(status, done) == [0, 0]
+
+    # add/remove/set/clear с обеих сторон связи и удаление задачи.
+    def test_label_count(self, task, labels):
+        first, second, third = labels
+        task.labels.add(first, second)
+        task.labels.add(first)
+        assert task_counts(*labels) == [1, 1, 0]
+        task.labels.set([second, third])
+        assert task_counts(*labels) == [0, 1, 1]
+        task.labels.remove(first, second)
+        assert task_counts(*labels) == [0, 0, 1]
+        third.tasks.clear()
+        assert task_counts(*labels) == [0, 0, 0]
+        first.tasks.add(task)
+        task.delete()
+        assert task_counts(*labels) == [0, 0, 0]
+
+    # Форма задачи меняет метки через save_m2m.
+    def test_form_updates_label_count(self, client_logged, task, labels):
+        client_logged.post(reverse("tasks:tasks_update", args=[task.pk]), {
+            "name": task.name, "description": "Описание", "status": task.status_id,
+            "labels": [labels[0].pk, labels[1].pk],
+        })
+        assert task_counts(*labels) == [1, 1, 0]
+
+    # Массовые действия и импорт обходят сигналы, но счётчики сходятся.
+    def test_bulk_and_import(self, client_logged, user, status, labels, tmp_path):
+        make_tasks(3, user, status)
+        ids = list(Task.objects.values_list("pk", flat=True))
+        url = reverse("tasks:tasks_bulk")
+        Task.objects.get(pk=ids[0]).labels.add(labels[0])
+        client_logged.post(url, {"tasks": ids, "action": "add_label",
+                                 "label": labels[0].pk})
+        client_logged.post(url, {"tasks": ids[:2], "action": "add_label",
+                                 "label": labels[1].pk})
+        client_logged.post(url, {"tasks": ids[1:], "action": "remove_label",
+                                 "label": labels[1].pk})
+        client_logged.post(url, {"tasks": ids[:1], "action": "delete"})
+        assert task_counts(status, *labels) == [2, 2, 0, 0]
+
+        path = tmp_path / "tasks.jsonl"
+        path.write_text(json.dumps({
+            "name": "Импорт", "status": status.name, "author": "user1",
+            "labels": ["В", "В", "А"],
+        }, ensure_ascii=False) + "\n", encoding="utf-8")
+        call_command("import_tasks", str(path), stdout=StringIO())
+        assert task_counts(status, *labels) == [3, 3, 0, 1]
+
+    # Переименование статуса или метки, загруженных до появления задач,
+    # не затирает счётчик значением из памяти.
+    def test_rename_keeps_count(self, client_logged, user, status, labels):
+        stale_status = Status.objects.get(pk=status.pk)
+        stale_label = Label.objects.get(pk=labels[0].pk)
+        task = Task.objects.create(
+            name="Задача", description="", author=user, status=status
+        )
+        task.labels.add(labels[0])
+        stale_status.name = "Переименован"
+        stale_status.save()
+        stale_label.name = "Переименована"
+        stale_label.save()
+        assert task_counts(status, labels[0]) == [1, 1]
+
+        client_logged.post(
+            reverse("statuses:statuses_update", args=[status.pk]),
+            {"name": "Ещё раз"},
+        )
+        status.refresh_from_db()
+        assert status.name == "Ещё раз" and status.task_count == 1
+
+    # Команда восстанавливает разошедшиеся счётчики одним UPDATE на модель.
+    def test_repair_command(self, task, status, labels):
+        task.labels.add(labels[0])
+        Status.objects.update(task_count=7)
+        Label.objects.update(task_count=0)
+        TaskCounter.objects.all().delete()
+        out = StringIO()
+        call_command("repair_task_counts", "--dry-run", stdout=out)
+        assert "statuses.Status.task_count: расхождений 1" in out.getvalue()
+        assert task_counts(status) == [7]
+
+        call_command("repair_task_counts", stdout=StringIO())
+        assert task_counts(status, *labels) == [1, 1, 0, 0]
+        assert counters(task.author) == {(status.pk, "author"): 1}
+
+    # Проверка занятой метки читает счётчик, без подсчёта по задачам.
+    def test_delete_check_reads_counter(self, client_logged, task, labels):
+        task.labels.add(labels[0])
+        url = reverse("labels:labels_delete", args=[labels[0].pk])
+        with CaptureQueriesContext(connection) as ctx:
+            client_logged.post(url)
+        assert not any(
+            "COUNT" in q["sql"] and "tasks_task_labels" in q["sql"]
+            for q in ctx.captured_queries
+        )
+        assert Label.objects.filter(pk=labels[0].pk).exists()
+
+    # Нулевой счётчик перед удалением сверяется точным подсчётом.
+    def test_delete_with_drifted_counter(self, client_logged, task, labels):
+        task.labels.add(labels[0])
+        Label.objects.update(task_count=0)
+        client_logged.post(reverse("labels:labels_delete", args=[labels[0].pk]))
+        assert Label.objects.filter(pk=labels[0].pk).exists()
+        assert task.labels.count() == 1
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def revalidate(self, client, url):
+        # Первый ответ выставляет CSRF-cookie, она входит в ETag
+        client.get(url)
+        etag = client.get(url)["ETag"]
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        return response, ctx.captured_queries
+
+    # Повторный запрос с тем же ETag получает 304 без выборки задач.
+    def test_list_not_modified(self, client_logged, task):
+        url = reverse("tasks:tasks_list")
+        assert client_logged.get(url).has_header("Last-Modified")
+        response, queries = self.revalidate(client_logged, url)
+        assert response.status_code == 304
+        assert not any("tasks_task" in q["sql"] for q in queries)
+
+    def test_detail_not_modified(self, client_logged, task):
+        url = reverse("tasks:tasks_detail", args=[task.pk])
+        response, _queries = self.revalidate(client_logged, url)
+        assert response.status_code == 304
+
+    # Изменение задачи, статуса или меток задачи меняет ETag.
+    def test_changes_invalidate(self, client_logged, task, status):
+        url = reverse("tasks:tasks_list")
+        client_logged.get(url)
+        etag = client_logged.get(url)["ETag"]
+        task.labels.add(Label.objects.create(name="Срочно"))
+        assert client_logged.get(url)["ETag"] != etag
+        etag = client_logged.get(url)["ETag"]
+        status.name = "В работе"
+        status.save()
+        response = client_logged.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+    # Массовые действия обходят сигналы, но версию тоже меняют.
+    def test_bulk_invalidates(self, client_logged, task):
+        url = reverse("tasks:tasks_list")
+        other = Status.objects.create(name="Готово")
+        client_logged.get(url)
+        etag = client_logged.get(url)["ETag"]
+        client_logged.post(reverse("tasks:tasks_bulk"), {
+            "tasks": [task.pk], "action": "set_status", "status": other.pk,
+        })
+        response = client_logged.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+    # Фильтр в строке запроса и другой пользователь дают другой ETag.
+    def test_etag_varies(self, client_logged, client, task, status):
+        url = reverse("tasks:tasks_list")
+        client_logged.get(url)
+        etag = client_logged.get(url)["ETag"]
+        assert client_logged.get(url, {"status": status.pk})["ETag"] != etag
+        User.objects.create_user(username="other", password="Password123")  # NOSONAR
+        client_logged.logout()
+        client.login(username="other", password="Password123")  # NOSONAR
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    # Неотданные сообщения нужно показать, поэтому 304 не отдаётся.
+    def test_pending_messages_skip_304(self, client_logged, task):
+        url = reverse("tasks:tasks_list")
+        client_logged.get(url)
+        etag = client_logged.get(url)["ETag"]
+        client_logged.post(reverse("tasks:tasks_bulk"), {"action": "delete"})
+        response = client_logged.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+    def test_statuses_and_labels(self, client_logged, status):
+        urls = [reverse("statuses:statuses_list"), reverse("labels:labels_list")]
+        for url in urls:
+            response, _queries = self.revalidate(client_logged, url)
+            assert response.status_code == 304
+
+
+@pytest.mark.django_db
+class TestTaskRowCache:
+
+    def fragment_stats(self):
+        return caches["template_fragments"].stats.as_dict()
+
+    def render(self, client):
+        # Без ETag: каждая загрузка рендерит шаблон
+        return client.get(reverse("tasks:tasks_list")).content.decode()
+
+    # Повторный рендеринг берёт строки из кеша.
+    def test_rows_cached(self, client_logged, user, status):
+        make_tasks(3, user, status)
+        self.render(client_logged)
+        before = self.fragment_stats()
+        self.render(client_logged)
+        after = self.fragment_stats()
+        assert after["hits"] - before["hits"] == 3
+        assert after["misses"] == before["misses"]
+
+    # Сохранение задачи и переименование связей меняют версию строки.
+    def test_row_version_changes(self, task, user, status):
+        versions = [task.row_version]
+        task.name = "Новое имя"
+        task.save(update_fields=["name"])
+        versions.append(Task.objects.get().row_version)
+        status.name = "В работе"
+        status.save()
+        versions.append(Task.objects.get().row_version)
+        user.first_name = "Пётр"
+        user.save()
+        versions.append(Task.objects.get().row_version)
+        assert len(set(versions)) == 4
+
+    # Вход пользователя строки не сбрасывает.
+    def test_login_keeps_row_version(self, client, task, user):
+        client.login(username=user.username, password="Password123")  # NOSONAR
+        assert Task.objects.get().row_version == task.row_version
+
+    # Сохранение без изменений выведенных полей, смена пароля
+    # и переименование метки задачи не обновляют.
+    def test_unchanged_keeps_row_version(self, task, user, status):
+        label = Label.objects.create(name="Срочно")
+        task.labels.add(label)
+        status.save()
+        user.set_password("Password456")  # NOSONAR
+        user.save()
+        user.first_name = user.first_name
+        user.save(update_fields=["first_name"])
+        label.name = "Важно"
+        label.save()
+        assert Task.objects.get().row_version == task.row_version
+
+    def test_renamed_status_rendered(self, client_logged, task, status):
+        self.render(client_logged)
+        status.name = "В работе"
+        status.save()
+        assert "В работе" in self.render(client_logged)
+
+    # Статистика кешей доступна только персоналу.
+    def test_cache_stats_view(self, client_logged, user):
+        url = reverse("cache_stats")
+        assert client_logged.get(url).status_code == 403
+        user.is_staff = True
+        user.save()
+        data = client_logged.get(url).json()
+        assert set(data["template_fragments"]) == {"hits", "misses", "hit_ratio"}
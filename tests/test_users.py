@@ -1,9 +1,14 @@
 import pytest
 from django.contrib.messages import get_messages
-from django.test import TestCase
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth.models import User
 
+from task_manager.caching.mixins import CSRF_INPUT_RE, CSRF_PLACEHOLDER
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Task
 from task_manager.users.forms import RegisterForm, CustomUserChangeForm
 
 
@@ -76,6 +81,23 @@ class UsersViewsTest(TestCase):
         self.assertRedirects(response, reverse("users:users_list"))
         self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
 
+    #  Исполнителя задач удалить нельзя: сообщение вместо ошибки 500
+    def test_users_delete_view_executor(self):
+        author = User.objects.create_user(username="author")
+        Task.objects.create(
+            name="Задача",
+            description="",
+            author=author,
+            executor=self.user,
+            status=Status.objects.create(name="Новый"),
+        )
+        url = reverse("users:users_delete", args=[self.user.pk])
+        response = self.client.post(url)
+        self.assertRedirects(response, reverse("users:users_list"))
+        self.assertTrue(User.objects.filter(pk=self.user.pk).exists())
+        messages = list(get_messages(response.wsgi_request))
+        self.assertTrue(any("используется" in str(m) for m in messages))
+
     #  Защита от несанкционированного доступа к профилям других пользователей
     def test_users_delete_view_forbidden(self):
         other_user = User.objects.create_user(username="other", password="pass")
@@ -215,3 +237,53 @@ def test_user_create_logging(client, caplog):
         response = client.post(url, data)
         assert "Создать пользователя: loguser" in caplog.text
         assert response.status_code == 302
+
+
+# -------------------------
+#  Кеш страниц для анонимных посетителей
+# -------------------------
+@pytest.mark.django_db
+class TestAnonymousPageCache:
+
+    # Повторный запрос отдаётся из кеша без обращений к базе.
+    def test_users_list_cached(self, client):
+        User.objects.create_user(username="cached", first_name="Кеш")
+        url = reverse("users:users_list")
+        client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        assert len(ctx.captured_queries) == 0
+        assert "Кеш" in response.content.decode()
+
+    # В закешированную страницу подставляется токен текущего посетителя.
+    def test_csrf_token_per_visitor(self, client):
+        url = reverse("home")
+        client.get(url)
+        other = Client(enforce_csrf_checks=True)
+        content = other.get(url).content.decode()
+        assert CSRF_PLACEHOLDER not in content
+        token = CSRF_INPUT_RE.search(content).group(1)
+        response = other.post(
+            reverse("login"), {"csrfmiddlewaretoken": token}
+        )
+        assert response.status_code == 200
+
+    # Создание, изменение и удаление пользователя сбрасывают кеш.
+    def test_user_changes_invalidate(self, client):
+        url = reverse("users:users_list")
+        client.get(url)
+        user = User.objects.create_user(username="fresh")
+        assert "fresh" in client.get(url).content.decode()
+        user.username = "renamed"
+        user.save()
+        assert "renamed" in client.get(url).content.decode()
+        user.delete()
+        assert "renamed" not in client.get(url).content.decode()
+
+    # Вошедшие пользователи получают обычный рендеринг.
+    def test_authenticated_not_cached(self, client):
+        User.objects.create_user(username="member", password="Password123")  # NOSONAR
+        client.get(reverse("home"))
+        client.login(username="member", password="Password123")  # NOSONAR
+        response = client.get(reverse("home"))
+        assert response.context["dashboard"] == []